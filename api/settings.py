@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.1/ref/settings/
 """
 
+from datetime import timedelta
 from pathlib import Path
 import os
 from dotenv import load_dotenv
@@ -151,6 +152,128 @@ REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
 
+# CV analysis job pipeline: number of background threads running PDF analysis jobs
+CV_ANALYSIS_WORKERS = int(os.getenv('CV_ANALYSIS_WORKERS', '2'))
+# A processing job whose row has not been touched for this long is assumed to have died
+# with its worker and may be claimed again
+CV_ANALYSIS_STALE_AFTER = timedelta(minutes=int(os.getenv('CV_ANALYSIS_STALE_AFTER_MINUTES', '15')))
+
+# PDF text extraction: documents with at least PDF_PARALLEL_PAGE_THRESHOLD pages are
+# extracted across a process pool, PDF_PAGES_PER_TASK pages per task
+PDF_EXTRACT_WORKERS = int(os.getenv('PDF_EXTRACT_WORKERS', str(min(4, os.cpu_count() or 1))))
+PDF_PARALLEL_PAGE_THRESHOLD = int(os.getenv('PDF_PARALLEL_PAGE_THRESHOLD', '16'))
+PDF_PAGES_PER_TASK = int(os.getenv('PDF_PAGES_PER_TASK', '4'))
+PDF_MAX_PAGES = int(os.getenv('PDF_MAX_PAGES', '200'))
+PDF_MAX_BYTES = int(os.getenv('PDF_MAX_BYTES', str(20 * 1024 * 1024)))
+
+# OCR fallback for pages without a text layer (scanned CVs). OCR_MAX_CONCURRENT_PAGES
+# caps pages in flight per process; OCR_PAGE_TIMEOUT is in seconds. Per document, at most
+# OCR_MAX_PAGES pages are OCRed within OCR_DOCUMENT_TIMEOUT seconds, the rest are skipped
+OCR_ENABLED = os.getenv('OCR_ENABLED', 'True') == 'True'
+OCR_WORKERS = int(os.getenv('OCR_WORKERS', '2'))
+OCR_MAX_CONCURRENT_PAGES = int(os.getenv('OCR_MAX_CONCURRENT_PAGES', '4'))
+OCR_PAGE_TIMEOUT = int(os.getenv('OCR_PAGE_TIMEOUT', '30'))
+OCR_MAX_PAGES = int(os.getenv('OCR_MAX_PAGES', '10'))
+OCR_DOCUMENT_TIMEOUT = int(os.getenv('OCR_DOCUMENT_TIMEOUT', '60'))
+OCR_LANG = os.getenv('OCR_LANG', 'eng')
+
+# CV summarisation: texts above CV_SUMMARY_CHUNK_TOKENS (estimated) are split into chunks
+# summarised concurrently, at most CV_SUMMARY_MAX_CONCURRENCY requests at a time
+CV_SUMMARY_CHUNK_TOKENS = int(os.getenv('CV_SUMMARY_CHUNK_TOKENS', '6000'))
+CV_SUMMARY_MAX_CONCURRENCY = int(os.getenv('CV_SUMMARY_MAX_CONCURRENCY', '4'))
+
+# Shared OpenAI client: per-process rate limit (requests/second, burst), concurrent
+# request cap, and retries with exponential backoff (seconds) on 429/5xx/timeouts
+LLM_TIMEOUT = float(os.getenv('LLM_TIMEOUT', '60'))
+LLM_RATE_LIMIT_RPS = float(os.getenv('LLM_RATE_LIMIT_RPS', '2'))
+LLM_RATE_LIMIT_BURST = int(os.getenv('LLM_RATE_LIMIT_BURST', '5'))
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', '8'))
+LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', '4'))
+LLM_BACKOFF_BASE = float(os.getenv('LLM_BACKOFF_BASE', '1'))
+LLM_BACKOFF_MAX = float(os.getenv('LLM_BACKOFF_MAX', '30'))
+
+# Calendar sync: events from 7 days ago up to CALENDAR_SYNC_LOOKAHEAD ahead are stored, so an
+# unchanged feed (304 or identical body) can be skipped until that horizon is reached
+CALENDAR_SYNC_TIMEOUT = int(os.getenv('CALENDAR_SYNC_TIMEOUT', '30'))
+CALENDAR_SYNC_LOOKAHEAD = timedelta(hours=int(os.getenv('CALENDAR_SYNC_LOOKAHEAD_HOURS', '24')))
+CALENDAR_SYNC_BATCH_SIZE = int(os.getenv('CALENDAR_SYNC_BATCH_SIZE', '500'))
+CALENDAR_SYNC_CHUNK_SIZE = int(os.getenv('CALENDAR_SYNC_CHUNK_SIZE', str(64 * 1024)))
+# Async views spool the downloaded feed to a temporary file, in memory up to this size
+CALENDAR_SYNC_SPOOL_SIZE = int(os.getenv('CALENDAR_SYNC_SPOOL_SIZE', str(1024 * 1024)))
+
+# The calendar-events date filter matches events that started up to this long before the
+# requested range on the start_time index; longer ones still overlapping it go through the
+# end_time index
+CALENDAR_EVENT_MAX_SPAN = timedelta(days=int(os.getenv('CALENDAR_EVENT_MAX_SPAN_DAYS', '31')))
+
+# Background calendar sync (manage.py sync_calendars): feeds are re-synced every
+# CALENDAR_SYNC_INTERVAL +/- CALENDAR_SYNC_JITTER, failing feeds back off exponentially
+# up to CALENDAR_SYNC_MAX_BACKOFF. Per host, at most CALENDAR_SYNC_PER_HOST requests run
+# at once and requests start at least CALENDAR_SYNC_HOST_DELAY seconds apart.
+CALENDAR_SYNC_INTERVAL = timedelta(minutes=int(os.getenv('CALENDAR_SYNC_INTERVAL_MINUTES', '30')))
+CALENDAR_SYNC_JITTER = float(os.getenv('CALENDAR_SYNC_JITTER', '0.2'))
+CALENDAR_SYNC_MAX_BACKOFF = timedelta(hours=int(os.getenv('CALENDAR_SYNC_MAX_BACKOFF_HOURS', '24')))
+CALENDAR_SYNC_WORKERS = int(os.getenv('CALENDAR_SYNC_WORKERS', '4'))
+CALENDAR_SYNC_PER_HOST = int(os.getenv('CALENDAR_SYNC_PER_HOST', '2'))
+CALENDAR_SYNC_HOST_DELAY = float(os.getenv('CALENDAR_SYNC_HOST_DELAY', '1'))
+
+# In-process LRU cache of CV summaries keyed on content hashes (entries, seconds)
+CV_CACHE_MAX_ENTRIES = int(os.getenv('CV_CACHE_MAX_ENTRIES', '256'))
+CV_CACHE_TTL = int(os.getenv('CV_CACHE_TTL', str(60 * 60 * 24)))
+
+# Upper bound for the opt-in page_size query parameter of keyset-paginated list endpoints
+MAX_PAGE_SIZE = int(os.getenv('MAX_PAGE_SIZE', '100'))
+
+# Maximum number of items per request to the notes/bulk/ and conversations/bulk/ endpoints
+BULK_MAX_ITEMS = int(os.getenv('BULK_MAX_ITEMS', '100'))
+
+# Per-user cache of read-heavy GET responses, invalidated on every write (seconds).
+# Local memory by default; point CACHE_BACKEND/CACHE_LOCATION at e.g. Redis to share it between workers.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+RESPONSE_CACHE_TTL = int(os.getenv('RESPONSE_CACHE_TTL', '300'))
+# Each process keeps the system notes in memory and reloads them when the cache reports a
+# change; with a per-process cache it cannot see other workers' changes, so they are also
+# reloaded at least every SYSTEM_NOTES_TTL seconds
+SYSTEM_NOTES_TTL = int(os.getenv('SYSTEM_NOTES_TTL', '60'))
+
+# Text search configuration for search/ queries on PostgreSQL. Not configurable per deployment:
+# it must match the configuration the search_vector triggers were created with (migration 0014)
+SEARCH_CONFIG = 'english'
+
+# Semantic retrieval (context/search/). EMBEDDER is the dotted path of the embedder class:
+# example.embeddings.HashingEmbedder is a deterministic local stub, example.embeddings.OpenAIEmbedder
+# uses EMBEDDING_MODEL. Texts are truncated to EMBEDDING_MAX_CHARS before embedding, and at most
+# EMBEDDING_INDEX_MAX_USERS per-user vector indexes are kept in memory.
+EMBEDDER = os.getenv('EMBEDDER', 'example.embeddings.HashingEmbedder')
+EMBEDDING_MODEL = os.getenv('EMBEDDING_MODEL', 'text-embedding-3-small')
+EMBEDDING_DIMENSIONS = int(os.getenv('EMBEDDING_DIMENSIONS', '256'))
+EMBEDDING_MAX_CHARS = int(os.getenv('EMBEDDING_MAX_CHARS', '8000'))
+EMBEDDING_BATCH_SIZE = int(os.getenv('EMBEDDING_BATCH_SIZE', '64'))
+EMBEDDING_WORKERS = int(os.getenv('EMBEDDING_WORKERS', '2'))
+EMBEDDING_INDEX_MAX_USERS = int(os.getenv('EMBEDDING_INDEX_MAX_USERS', '256'))
+EMBEDDING_TOP_K = int(os.getenv('EMBEDDING_TOP_K', '5'))
+
+# Rolling conversation summaries: a conversation is re-summarised in the background once
+# COMPACTION_MIN_MESSAGES new messages have been added since its last checkpoint
+COMPACTION_MIN_MESSAGES = int(os.getenv('COMPACTION_MIN_MESSAGES', '8'))
+COMPACTION_WORKERS = int(os.getenv('COMPACTION_WORKERS', '1'))
+
+# Default per-section limits of the context/ bundle (capped at MAX_PAGE_SIZE) and the
+# window of calendar events it includes around the current time
+CONTEXT_NOTES_LIMIT = int(os.getenv('CONTEXT_NOTES_LIMIT', '20'))
+CONTEXT_CONVERSATIONS_LIMIT = int(os.getenv('CONTEXT_CONVERSATIONS_LIMIT', '5'))
+CONTEXT_EVENTS_LIMIT = int(os.getenv('CONTEXT_EVENTS_LIMIT', '20'))
+CONTEXT_EVENTS_PAST = timedelta(days=int(os.getenv('CONTEXT_EVENTS_PAST_DAYS', '1')))
+CONTEXT_EVENTS_AHEAD = timedelta(days=int(os.getenv('CONTEXT_EVENTS_AHEAD_DAYS', '7')))
+
+# Import-time budget for a cold start on the notes/conversations path (manage.py bench_imports)
+STARTUP_IMPORT_BUDGET_MS = float(os.getenv('STARTUP_IMPORT_BUDGET_MS', '1000'))
+
 # Spectacular settings
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Elevelabs AI API',
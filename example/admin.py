@@ -1,16 +1,47 @@
 from django.contrib import admin
-from .models import Note, Conversation, CVAnalysis, CalendarEvent
+from . import response_cache, system_notes
+from .models import Note, Conversation, ConversationMessage, CVAnalysis, CalendarEvent
 
 @admin.register(Note)
 class NoteAdmin(admin.ModelAdmin):
-    list_display = ('id', 'user_id', 'content', 'created_at', 'updated_at')
-    list_filter = ('user_id', 'created_at')
+    list_display = ('id', 'user_id', 'content', 'is_system', 'created_at', 'updated_at')
+    list_filter = ('is_system', 'user_id', 'created_at')
     search_fields = ('user_id', 'content')
     readonly_fields = ('created_at', 'updated_at')
     ordering = ('-created_at',)
 
+    def invalidate_cache(self, notes):
+        if any(note.is_system for note in notes):
+            system_notes.invalidate()
+        for user_id in {note.user_id for note in notes}:
+            response_cache.invalidate(response_cache.NOTES, user_id)
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        # A note that stopped being a system note has to leave everyone's list as well
+        if 'is_system' in form.changed_data:
+            system_notes.invalidate()
+        self.invalidate_cache([obj])
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        self.invalidate_cache([obj])
+
+    def delete_queryset(self, request, queryset):
+        notes = list(queryset)
+        super().delete_queryset(request, queryset)
+        self.invalidate_cache(notes)
+
+class ConversationMessageInline(admin.TabularInline):
+    model = ConversationMessage
+    fields = ('position', 'role', 'content', 'created_at')
+    readonly_fields = ('created_at',)
+    ordering = ('position',)
+    extra = 0
+
 @admin.register(Conversation)
 class ConversationAdmin(admin.ModelAdmin):
+    inlines = [ConversationMessageInline]
     list_display = ('id', 'user_id', 'created_at', 'updated_at')
     list_filter = ('user_id', 'created_at')
     search_fields = ('user_id', 'content')
@@ -19,10 +50,10 @@ class ConversationAdmin(admin.ModelAdmin):
 
 @admin.register(CVAnalysis)
 class CVAnalysisAdmin(admin.ModelAdmin):
-    list_display = ('id', 'user_id', 'created_at')
-    list_filter = ('user_id', 'created_at')
+    list_display = ('id', 'user_id', 'status', 'progress', 'created_at')
+    list_filter = ('user_id', 'status', 'created_at')
     search_fields = ('user_id',)
-    readonly_fields = ('created_at',)
+    readonly_fields = ('created_at', 'updated_at')
     ordering = ('-created_at',)
     
 @admin.register(CalendarEvent)
@@ -0,0 +1,129 @@
+# example/async_views.py
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from django.views import View
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+
+from . import cv_cache, jobs, llm, response_cache
+from .calendar_sync import async_sync_calendar_events, record_failure, subscribe, subscription_error
+from .context import abuild_context, default_limits
+from .cv_analysis import aanalyze_pdf, file_digest, is_set, save_analysis, upload_error
+from .pdf import PDFError
+from .response_cache import async_cached_response
+from .serializers import ContextSerializer
+
+# Native async counterparts of the I/O-bound endpoints in views.py, for the ASGI entry point
+# (api/asgi.py). DRF views are sync only, so these are plain Django views that answer with
+# the same JSON bodies; while one waits on Postgres, an iCal feed or OpenAI, the worker's
+# event loop serves other requests instead of holding a thread.
+
+
+def json_response(data, status=status.HTTP_200_OK):
+    return HttpResponse(JSONRenderer().render(data), status=status, content_type='application/json')
+
+
+def request_data(request):
+    if request.content_type == 'application/json':
+        try:
+            return json.loads(request.body or b'{}')
+        except ValueError:
+            return {}
+    return request.POST
+
+
+class AsyncAPIView(View):
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Like APIView, exempt from CSRF: clients authenticate per request, not with cookies
+        view = super().as_view(**initkwargs)
+        view.csrf_exempt = True
+        return view
+
+
+class AsyncCalendarSyncView(AsyncAPIView):
+    async def post(self, request):
+        data = request_data(request)
+        user_id = data.get('user_id')
+        webcal_url = data.get('webcal_url')
+
+        error = subscription_error(user_id, webcal_url)
+        if error:
+            return json_response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+
+        subscription = None
+        try:
+            subscription = await sync_to_async(subscribe)(user_id, webcal_url)
+            result = await async_sync_calendar_events(subscription)
+
+            return json_response({
+                'status': 'success',
+                **result
+            }, status=status.HTTP_201_CREATED)
+
+        except Exception as e:
+            if subscription is not None:
+                await sync_to_async(record_failure)(subscription, e)
+            return json_response(
+                {'error': str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+class AsyncPDFAnalysisView(AsyncAPIView):
+    async def post(self, request):
+        error = upload_error(request.FILES, request.POST)
+        if error:
+            return json_response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+
+        user_id = request.POST['user_id']
+        data = request.FILES['file'].read()
+
+        # Identical uploads are answered straight from the content-hash cache, even in async mode
+        if is_set(request.POST, 'async') and await sync_to_async(cv_cache.lookup_by_file_hash)(file_digest(data)) is None:
+            return json_response(await sync_to_async(jobs.submit)(user_id, data), status=status.HTTP_202_ACCEPTED)
+
+        try:
+            try:
+                result = await aanalyze_pdf(data, llm.get_async_client())
+            except PDFError as e:
+                return json_response(
+                    {'error': str(e)},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            cv_analysis = await sync_to_async(save_analysis)(user_id, result)
+
+            return json_response({
+                'id': cv_analysis.id,
+                'user_id': cv_analysis.user_id
+            }, status=status.HTTP_201_CREATED)
+
+        except Exception as e:
+            return json_response(
+                {'error': str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+class AsyncContextView(AsyncAPIView):
+    @async_cached_response(response_cache.NOTES, response_cache.CONVERSATIONS, response_cache.CV_ANALYSIS, response_cache.CALENDAR_EVENTS)
+    async def get(self, request):
+        user_id = request.GET.get('user_id')
+        if not user_id:
+            return json_response({'error': 'user_id is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        limits = default_limits()
+        try:
+            for section in limits:
+                if section in request.GET:
+                    limits[section] = int(request.GET[section])
+        except ValueError:
+            return json_response({'error': 'Limits must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+        limits = {section: max(0, min(limit, settings.MAX_PAGE_SIZE)) for section, limit in limits.items()}
+
+        serializer = ContextSerializer(await abuild_context(user_id, limits))
+        return json_response(serializer.data)
@@ -0,0 +1,338 @@
+# example/calendar_sync.py
+import asyncio
+import hashlib
+import json
+import random
+import tempfile
+import weakref
+from datetime import datetime, time, timedelta
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import response_cache
+from .ical_stream import FeedReader
+from .models import CalendarEvent, CalendarSubscription
+
+MEETING_LINK_HOSTS = ['meet.google.com', 'teams.microsoft.com', 'zoom.us']
+# CalendarSubscription fields written by a sync: its schedule, and what it learnt about the feed
+SCHEDULE_FIELDS = ['last_sync', 'failure_count', 'last_error', 'next_sync_at']
+FEED_FIELDS = ['etag', 'last_modified', 'content_hash', 'synced_until']
+
+UPSERT_FIELDS = [
+    'summary', 'description', 'start_time', 'end_time', 'location', 'organizer',
+    'attendees', 'status', 'meeting_link', 'notes', 'content_hash'
+]
+
+
+def subscription_error(user_id, webcal_url):
+    """Why a calendar-sync request is invalid, or None if it is valid."""
+    if not user_id or not webcal_url:
+        return 'Both user_id and webcal_url are required'
+    if not webcal_url.startswith('webcal://'):
+        return 'URL must be a webcal:// URL'
+    return None
+
+
+def subscribe(user_id, webcal_url):
+    """The user's subscription, pointed at webcal_url (saved before any sync is attempted)."""
+    subscription, _ = CalendarSubscription.objects.get_or_create(
+        user_id=user_id,
+        defaults={'webcal_url': webcal_url}
+    )
+    if subscription.webcal_url != webcal_url:
+        # A different feed: cached validators and hashes no longer apply
+        subscription.webcal_url = webcal_url
+        subscription.etag = subscription.last_modified = subscription.content_hash = ''
+        subscription.synced_until = None
+        subscription.save(update_fields=['webcal_url', 'etag', 'last_modified', 'content_hash', 'synced_until'])
+    return subscription
+
+
+def to_https(webcal_url):
+    return webcal_url.replace('webcal://', 'https://')
+
+
+def content_hash(value):
+    payload = json.dumps(value, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def event_fields(component):
+    # Extract attendees information
+    attendees = []
+    raw_attendees = component.get('attendee', [])
+    # A single ATTENDEE comes back as a bare value rather than a list
+    if not isinstance(raw_attendees, list):
+        raw_attendees = [raw_attendees]
+    for attendee in raw_attendees:
+        attendee_params = dict(attendee.params)
+        attendee_data = {
+            'email': str(attendee).replace('mailto:', ''),
+            'name': attendee_params.get('CN', ''),
+            'role': attendee_params.get('ROLE', ''),
+            'status': attendee_params.get('PARTSTAT', '')
+        }
+        attendees.append(attendee_data)
+
+    # Extract location and meeting link
+    location = str(component.get('location', ''))
+    meeting_link = ''
+
+    # Look for virtual meeting links in description or location
+    description = str(component.get('description', ''))
+    for line in description.split('\n'):
+        if any(link in line.lower() for link in MEETING_LINK_HOSTS):
+            meeting_link = line.strip()
+            break
+
+    return {
+        'summary': str(component.get('summary', '')),
+        'description': description,
+        'start_time': as_datetime(component.get('dtstart').dt),
+        'end_time': as_datetime(component.get('dtend').dt if component.get('dtend') else component.get('dtstart').dt),
+        'location': location,
+        'organizer': str(component.get('organizer', '')).replace('mailto:', ''),
+        'attendees': attendees,
+        'status': str(component.get('status', 'confirmed')).lower(),
+        'meeting_link': meeting_link,
+        'notes': str(component.get('x-alt-desc', ''))  # Some calendars use this for rich text notes
+    }
+
+
+def as_datetime(value):
+    # All-day events carry a date and floating times are naive; store both as aware datetimes
+    if not isinstance(value, datetime):
+        value = datetime.combine(value, time.min)
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+def iter_events(components, start_date, end_date):
+    for component in components:
+        event_start = as_datetime(component.get('dtstart').dt)
+
+        if event_start < start_date or event_start > end_date:
+            continue
+
+        yield str(component.get('uid')), event_fields(component)
+
+
+def conditional_headers(subscription, conditional=True):
+    # Conditional GET: the feed is only downloaded when the server says it changed
+    headers = {}
+    if conditional and subscription.etag:
+        headers['If-None-Match'] = subscription.etag
+    if conditional and subscription.last_modified:
+        headers['If-Modified-Since'] = subscription.last_modified
+    return headers
+
+
+def open_feed(subscription, conditional=True):
+    import requests
+
+    response = requests.get(
+        to_https(subscription.webcal_url),
+        headers=conditional_headers(subscription, conditional),
+        timeout=settings.CALENDAR_SYNC_TIMEOUT,
+        stream=True
+    )
+    if response.status_code == 304:
+        response.close()
+        return None
+    try:
+        response.raise_for_status()
+    except requests.HTTPError:
+        response.close()
+        raise
+
+    subscription.etag = response.headers.get('ETag', '')
+    subscription.last_modified = response.headers.get('Last-Modified', '')
+    return response
+
+
+# Building a client (and its TLS context) blocks for tens of milliseconds, so each event
+# loop keeps one and shares its connection pool
+_http_clients = weakref.WeakKeyDictionary()
+
+
+def get_http_client():
+    loop = asyncio.get_running_loop()
+    client = _http_clients.get(loop)
+    if client is None:
+        import httpx
+
+        client = _http_clients[loop] = httpx.AsyncClient(timeout=settings.CALENDAR_SYNC_TIMEOUT, follow_redirects=True)
+    return client
+
+
+async def async_download_feed(subscription, conditional=True):
+    """
+    Like open_feed, but over an async HTTP client: returns None on 304, otherwise the body
+    spooled to a temporary file (in memory up to CALENDAR_SYNC_SPOOL_SIZE bytes).
+    """
+    body = tempfile.SpooledTemporaryFile(max_size=settings.CALENDAR_SYNC_SPOOL_SIZE)
+    try:
+        async with get_http_client().stream(
+            'GET', to_https(subscription.webcal_url), headers=conditional_headers(subscription, conditional)
+        ) as response:
+            if response.status_code == 304:
+                body.close()
+                return None
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes(settings.CALENDAR_SYNC_CHUNK_SIZE):
+                body.write(chunk)
+    except BaseException:
+        body.close()
+        raise
+
+    subscription.etag = response.headers.get('ETag', '')
+    subscription.last_modified = response.headers.get('Last-Modified', '')
+    body.seek(0)
+    return body
+
+
+def batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def upsert_events(user_id, events, batch_size=None):
+    """
+    Insert or update (event_id, fields) pairs for a user in batches: one SELECT for the
+    existing hashes and one INSERT ... ON CONFLICT DO UPDATE per batch.
+    """
+    batch_size = batch_size or settings.CALENDAR_SYNC_BATCH_SIZE
+    counts = {'events_added': 0, 'events_updated': 0, 'events_skipped': 0}
+
+    for batch in batched(events, batch_size):
+        # Recurring events repeat their UID; the last occurrence wins, as with update_or_create
+        batch = dict(batch)
+        existing = dict(
+            CalendarEvent.objects.filter(user_id=user_id, event_id__in=batch.keys()).values_list('event_id', 'content_hash')
+        )
+
+        changed = []
+        for event_id, fields in batch.items():
+            fields['content_hash'] = content_hash(fields)
+            if existing.get(event_id) == fields['content_hash']:
+                counts['events_skipped'] += 1
+                continue
+            counts['events_updated' if event_id in existing else 'events_added'] += 1
+            changed.append(CalendarEvent(user_id=user_id, event_id=event_id, **fields))
+
+        if changed:
+            CalendarEvent.objects.bulk_create(
+                changed,
+                update_conflicts=True,
+                unique_fields=['user_id', 'event_id'],
+                update_fields=UPSERT_FIELDS
+            )
+    return counts
+
+
+def next_sync_time(now, failures=0):
+    # Exponential backoff for failing feeds, jittered so feeds don't all fire together
+    interval = min(settings.CALENDAR_SYNC_INTERVAL * 2 ** failures, settings.CALENDAR_SYNC_MAX_BACKOFF)
+    jitter = random.uniform(-settings.CALENDAR_SYNC_JITTER, settings.CALENDAR_SYNC_JITTER)
+    return now + interval * (1 + jitter)
+
+
+def record_success(subscription, now):
+    subscription.failure_count = 0
+    subscription.last_error = ''
+    subscription.next_sync_at = next_sync_time(now)
+    # Only the fields a sync owns are saved, and the feed's validators only while the row
+    # still points at the feed they came from: subscribe() may have replaced webcal_url
+    # since this instance was loaded (e.g. at the start of a sync_calendars pass)
+    with transaction.atomic():
+        webcal_url = CalendarSubscription.objects.select_for_update().filter(
+            pk=subscription.pk
+        ).values_list('webcal_url', flat=True).first()
+        fields = SCHEDULE_FIELDS + (FEED_FIELDS if webcal_url == subscription.webcal_url else [])
+        subscription.save(update_fields=fields)
+
+
+def record_failure(subscription, error):
+    subscription.failure_count += 1
+    subscription.last_error = str(error)
+    subscription.next_sync_at = next_sync_time(timezone.now(), subscription.failure_count)
+    subscription.save(update_fields=['failure_count', 'last_error', 'next_sync_at'])
+
+
+def sync_calendar_events(subscription):
+    """
+    Sync a subscription's events in the window [now - 7 days, now + lookahead].
+
+    Returns whether the feed body was downloaded (False on 304) and counts of events
+    added, updated and skipped because their content hash is unchanged.
+    """
+    now = timezone.now()
+    # An unchanged feed can only be skipped while the previous parse still covers the window
+    window_covered = subscription.synced_until is not None and subscription.synced_until >= now
+
+    response = open_feed(subscription, conditional=window_covered)
+    if response is None:
+        record_success(subscription, now)
+        return {'fetched': False, 'events_added': 0, 'events_updated': 0, 'events_skipped': 0}
+
+    with response:
+        return store_feed(subscription, response.iter_content(chunk_size=settings.CALENDAR_SYNC_CHUNK_SIZE), now, window_covered)
+
+
+async def async_sync_calendar_events(subscription):
+    """
+    sync_calendar_events for async views: the feed is downloaded without blocking the event
+    loop, then parsed and stored in a worker thread, since transactions need sync code.
+    """
+    now = timezone.now()
+    window_covered = subscription.synced_until is not None and subscription.synced_until >= now
+
+    body = await async_download_feed(subscription, conditional=window_covered)
+    if body is None:
+        await sync_to_async(record_success)(subscription, now)
+        return {'fetched': False, 'events_added': 0, 'events_updated': 0, 'events_skipped': 0}
+
+    with body:
+        chunks = iter(partial(body.read, settings.CALENDAR_SYNC_CHUNK_SIZE), b'')
+        return await sync_to_async(store_feed)(subscription, chunks, now, window_covered)
+
+
+def store_feed(subscription, chunks, now, window_covered):
+    """Parse a downloaded feed body and upsert the events in the sync window."""
+    result = {'fetched': True, 'events_added': 0, 'events_updated': 0, 'events_skipped': 0}
+    start_date = now - timedelta(days=7)
+    end_date = now + settings.CALENDAR_SYNC_LOOKAHEAD
+
+    # Only the raw lines of events inside the window are kept in memory, however large
+    # the feed is, and they are only parsed once the body hash shows the feed changed
+    feed = FeedReader(chunks)
+    blocks = list(feed.blocks(start_date, end_date))
+
+    if window_covered and feed.hexdigest == subscription.content_hash:
+        record_success(subscription, now)
+        return result
+
+    events = list(iter_events(feed.parse(blocks), start_date, end_date))
+
+    with transaction.atomic():
+        counts = upsert_events(subscription.user_id, events)
+        result.update(counts)
+
+        subscription.content_hash = feed.hexdigest
+        subscription.synced_until = end_date
+        record_success(subscription, now)
+
+    if counts['events_added'] or counts['events_updated']:
+        response_cache.invalidate(response_cache.CALENDAR_EVENTS, subscription.user_id)
+    return result
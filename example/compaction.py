@@ -0,0 +1,128 @@
+# example/compaction.py
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from . import embeddings, llm, response_cache
+from .conversations import render_transcript
+from .models import Conversation, ConversationMessage, WeeklySummary
+from .summarize import chunk_text
+
+logger = logging.getLogger(__name__)
+
+MODEL = "gpt-4"
+SYSTEM_PROMPT = "You maintain concise running summaries of conversations between a user and their AI mentor. Keep the user's goals, decisions, feelings, commitments and follow-ups; drop small talk. Use clear, plain language."
+UPDATE_PROMPT = "Current summary (may be empty):\n{summary}\n\nNew messages since that summary:\n{text}\n\nReturn the updated summary covering everything."
+
+
+def update_summary(client, summary, text):
+    """Fold new transcript text into an existing summary, one chunk at a time."""
+    for chunk in chunk_text(text, settings.CV_SUMMARY_CHUNK_TOKENS):
+        response = llm.chat_completion(
+            client,
+            model=MODEL,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": UPDATE_PROMPT.format(summary=summary, text=chunk)}
+            ],
+            max_tokens=500
+        )
+        summary = response.choices[0].message.content.strip()
+    return summary
+
+
+def compact_conversation(conversation_id, client=None, min_messages=1):
+    """
+    Bring a conversation's rolling summary up to date from the messages after its
+    checkpoint. Does nothing while fewer than min_messages are new. Returns whether the
+    summary changed.
+    """
+    conversation = Conversation.objects.only('id', 'user_id', 'summary', 'summary_position').get(pk=conversation_id)
+    checkpoint = -1 if conversation.summary_position is None else conversation.summary_position
+
+    last = ConversationMessage.objects.filter(conversation_id=conversation_id).aggregate(last=Max('position'))['last']
+    if last is None or last - checkpoint < min_messages:
+        return False
+
+    messages = ConversationMessage.objects.filter(
+        conversation_id=conversation_id, position__gt=checkpoint, position__lte=last
+    ).order_by('position').values_list('role', 'content')
+    summary = update_summary(client or llm.get_client(), conversation.summary, render_transcript(messages))
+
+    # Only store it if nobody moved the checkpoint (or replaced the messages) meanwhile
+    updated = Conversation.objects.filter(
+        pk=conversation_id, summary_position=conversation.summary_position
+    ).update(summary=summary, summary_position=last, summary_updated_at=timezone.now())
+    if updated:
+        response_cache.invalidate(response_cache.CONVERSATIONS, conversation.user_id)
+    return bool(updated)
+
+
+def week_start(day):
+    return day - timedelta(days=day.weekday())
+
+
+def compact_week(user_id, start, client=None):
+    """
+    Fold the user's messages from the week starting on `start` that came after its
+    checkpoint. Re-sent transcripts keep their unchanged message rows (see
+    conversations.replace_messages), so only edited or new messages get ids past it.
+    """
+    weekly, _ = WeeklySummary.objects.get_or_create(user_id=user_id, week_start=start)
+    week_begin = timezone.make_aware(datetime.combine(start, time.min))
+
+    messages = list(ConversationMessage.objects.filter(
+        conversation__user_id=user_id,
+        created_at__gte=week_begin,
+        created_at__lt=week_begin + timedelta(days=7),
+        id__gt=weekly.last_message_id
+    ).order_by('id').values_list('id', 'role', 'content'))
+    if not messages:
+        return False
+
+    summary = update_summary(client or llm.get_client(), weekly.summary, render_transcript(
+        (role, content) for _, role, content in messages
+    ))
+    return bool(WeeklySummary.objects.filter(
+        pk=weekly.pk, last_message_id=weekly.last_message_id
+    ).update(summary=summary, last_message_id=messages[-1][0], updated_at=timezone.now()))
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.COMPACTION_WORKERS,
+                thread_name_prefix='compaction'
+            )
+        return _executor
+
+
+def process(conversation_id):
+    close_old_connections()
+    try:
+        if compact_conversation(conversation_id, min_messages=settings.COMPACTION_MIN_MESSAGES):
+            # The embedded text includes the summary
+            embeddings.schedule(response_cache.CONVERSATIONS, [conversation_id])
+            user_id = Conversation.objects.values_list('user_id', flat=True).get(pk=conversation_id)
+            compact_week(user_id, week_start(timezone.localdate()))
+    except Exception:
+        logger.exception('Compacting conversation %s failed', conversation_id)
+    finally:
+        close_old_connections()
+
+
+def schedule(conversation_id):
+    """Update the conversation's summary in the background once the current transaction commits."""
+    transaction.on_commit(lambda: get_executor().submit(process, conversation_id))
@@ -0,0 +1,65 @@
+# example/context.py
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+
+from . import system_notes
+from .models import CalendarEvent, Conversation, CVAnalysis, Note
+from .serializers import CalendarEventCompactSerializer, CVAnalysisCompactSerializer
+
+SECTIONS = {
+    'notes': 'CONTEXT_NOTES_LIMIT',
+    'conversations': 'CONTEXT_CONVERSATIONS_LIMIT',
+    'events': 'CONTEXT_EVENTS_LIMIT',
+}
+
+
+def default_limits():
+    return {section: getattr(settings, setting) for section, setting in SECTIONS.items()}
+
+
+def latest_notes(user_id, limit):
+    # The system notes are always included; only the user's own notes count against the limit
+    notes = Note.objects.filter(user_id=user_id, is_system=False).order_by('-created_at', '-id')[:limit]
+    return system_notes.merge(notes, system_notes.get_system_notes())
+
+
+def section_querysets(user_id, limits, now):
+    conversations = Conversation.objects.filter(user_id=user_id).order_by('-created_at', '-id')[:limits['conversations']]
+
+    cv_analysis = CVAnalysis.objects.filter(
+        user_id=user_id,
+        status=CVAnalysis.STATUS_COMPLETED
+    ).only(*CVAnalysisCompactSerializer.Meta.fields).order_by('-created_at')
+
+    events = CalendarEvent.objects.filter(user_id=user_id).overlapping(
+        now - settings.CONTEXT_EVENTS_PAST, now + settings.CONTEXT_EVENTS_AHEAD
+    ).only(*CalendarEventCompactSerializer.Meta.fields).order_by('start_time')[:limits['events']]
+
+    return conversations, cv_analysis, events
+
+
+def build_context(user_id, limits, now=None):
+    """
+    Everything the agent needs at the start of a session, with bounded queries per
+    section: the system notes plus the latest user notes, recent conversations, the latest CV
+    summary and the events overlapping [now - CONTEXT_EVENTS_PAST, now + CONTEXT_EVENTS_AHEAD].
+    """
+    conversations, cv_analysis, events = section_querysets(user_id, limits, now or timezone.now())
+    return {
+        'notes': latest_notes(user_id, limits['notes']),
+        'conversations': list(conversations),
+        'cv_analysis': cv_analysis.first(),
+        'events': list(events),
+    }
+
+
+async def abuild_context(user_id, limits, now=None):
+    """build_context over the async ORM, for the async context view."""
+    conversations, cv_analysis, events = section_querysets(user_id, limits, now or timezone.now())
+    return {
+        'notes': await sync_to_async(latest_notes)(user_id, limits['notes']),
+        'conversations': [conversation async for conversation in conversations],
+        'cv_analysis': await cv_analysis.afirst(),
+        'events': [event async for event in events],
+    }
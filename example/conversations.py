@@ -0,0 +1,165 @@
+# example/conversations.py
+import json
+import operator
+import re
+from collections import defaultdict
+from difflib import SequenceMatcher
+from functools import reduce
+
+from django.db import transaction
+from django.db.models import Case, F, Max, Q, Value, When
+from django.db.models.functions import Concat, Now
+
+from .models import Conversation, ConversationMessage
+
+# "user: Hello" style transcript lines; anything else continues the previous message
+ROLE_LINE = re.compile(r'^(user|assistant|system|agent|ai|mentor|human|bot)\s*:\s?(.*)$', re.IGNORECASE)
+
+
+def parse_json_transcript(content):
+    """[(role, content), ...] from a JSON list of {"role", "content"} objects, otherwise None."""
+    try:
+        data = json.loads(content)
+    except ValueError:
+        return None
+    if not isinstance(data, list) or not data or not all(isinstance(item, dict) for item in data):
+        return None
+    return [
+        (str(item.get('role', '')).lower(), str(item.get('content', item.get('text', ''))))
+        for item in data
+    ]
+
+
+def split_transcript(content):
+    """
+    Split a conversation blob into [(role, content), ...]. Understands JSON transcripts
+    and "role: text" lines; anything else becomes a single message without a role.
+    """
+    messages = parse_json_transcript(content)
+    if messages is not None:
+        return messages
+
+    messages = []
+    for line in content.splitlines():
+        match = ROLE_LINE.match(line)
+        if match:
+            messages.append([match.group(1).lower(), match.group(2)])
+        elif messages:
+            messages[-1][1] += '\n' + line
+        else:
+            messages.append(['', line])
+    return [(role, text) for role, text in messages if role or text.strip()]
+
+
+def render_message(role, content):
+    return f'{role}: {content}' if role else content
+
+
+def render_transcript(messages):
+    return '\n'.join(render_message(role, content) for role, content in messages)
+
+
+def build_messages(conversation, messages, start=0):
+    return [
+        ConversationMessage(conversation=conversation, position=position, role=role, content=content)
+        for position, (role, content) in enumerate(messages, start=start)
+    ]
+
+
+def diff_messages(old, new):
+    """
+    Match the stored messages `old` [(id, role, content), ...] against the re-split
+    transcript `new` [(role, content), ...]. Returns the ids to delete, {shift: [ids]} for
+    kept messages whose position moves, [(position, role, content)] to create, and the old
+    position of the first change (None if nothing changed).
+    """
+    matcher = SequenceMatcher(None, [message[1:] for message in old], new, autojunk=False)
+    delete, shifts, create, first_change = [], defaultdict(list), [], None
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            if j1 != i1:
+                shifts[j1 - i1].extend(message[0] for message in old[i1:i2])
+            continue
+        if first_change is None:
+            first_change = i1
+        delete.extend(message[0] for message in old[i1:i2])
+        create.extend((j, *new[j]) for j in range(j1, j2))
+    return delete, shifts, create, first_change
+
+
+def replace_messages(conversations):
+    """
+    Bring the messages of freshly created or fully replaced conversations in line with
+    their content. Unchanged messages keep their rows (id, created_at), so re-sending the
+    same or an extended transcript only writes the difference; the rolling summary is
+    reset only when something at or before its checkpoint changed.
+    """
+    stored = {conversation.pk: [] for conversation in conversations}
+    for conversation_id, *message in ConversationMessage.objects.filter(
+        conversation__in=conversations
+    ).order_by('conversation', 'position').values_list('conversation_id', 'id', 'role', 'content'):
+        stored[conversation_id].append(tuple(message))
+
+    delete, shifts, create, resets = [], defaultdict(list), [], []
+    offset = 0
+    for conversation in conversations:
+        messages = split_transcript(conversation.content)
+        conversation_delete, conversation_shifts, conversation_create, first_change = diff_messages(
+            stored[conversation.pk], messages
+        )
+        offset = max(offset, len(stored[conversation.pk]), len(messages))
+        delete.extend(conversation_delete)
+        for shift, ids in conversation_shifts.items():
+            shifts[shift].extend(ids)
+        create.extend(
+            ConversationMessage(conversation=conversation, position=position, role=role, content=content)
+            for position, role, content in conversation_create
+        )
+        if first_change is not None:
+            resets.append(Q(pk=conversation.pk, summary_position__gte=first_change))
+
+    ConversationMessage.objects.filter(id__in=delete).delete()
+    if shifts:
+        # Park the moving rows above every position in use before and after the update
+        # first, so no intermediate state violates the (conversation, position) unique
+        # constraint: a row moved to its final position never meets one still parked
+        moving = [message_id for ids in shifts.values() for message_id in ids]
+        ConversationMessage.objects.filter(id__in=moving).update(position=F('position') + offset)
+        for shift, ids in shifts.items():
+            ConversationMessage.objects.filter(id__in=ids).update(position=F('position') - offset + shift)
+    ConversationMessage.objects.bulk_create(create)
+
+    if resets:
+        # The summary covers messages that changed, so it starts over
+        Conversation.objects.filter(reduce(operator.or_, resets)).update(
+            summary='', summary_position=None, summary_updated_at=None
+        )
+
+
+def append_messages(conversation_id, user_id, messages):
+    """
+    Append [(role, content), ...] to a user's conversation: inserts only the new rows
+    and extends the transcript in the database, without reading it back. Raises
+    Conversation.DoesNotExist if the user has no such conversation.
+    """
+    with transaction.atomic():
+        # Serialises concurrent appends to the same conversation
+        Conversation.objects.select_for_update().filter(pk=conversation_id, user_id=user_id).only('id').get()
+        last = ConversationMessage.objects.filter(conversation_id=conversation_id).aggregate(last=Max('position'))['last']
+        created = ConversationMessage.objects.bulk_create(
+            build_messages(Conversation(pk=conversation_id), messages, start=0 if last is None else last + 1)
+        )
+        separator = Case(When(content='', then=Value('')), default=Value('\n'))
+        Conversation.objects.filter(pk=conversation_id).update(
+            content=Concat('content', separator, Value(render_transcript(messages))),
+            updated_at=Now()
+        )
+    return created
+
+
+def tail(conversation_id, limit, before=None):
+    """The last `limit` messages (before position `before`, if given) in conversation order."""
+    messages = ConversationMessage.objects.filter(conversation_id=conversation_id)
+    if before is not None:
+        messages = messages.filter(position__lt=before)
+    return list(reversed(messages.order_by('-position')[:limit]))
@@ -0,0 +1,238 @@
+# example/cv_analysis.py
+import hashlib
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from . import cv_cache, llm, response_cache
+from .models import CVAnalysis
+from .pdf import EmptyPDFError, extract_text_from_pdf
+from .summarize import amap_reduce, condense, estimate_tokens, map_reduce
+
+MODEL = "gpt-4"
+# Bump whenever the prompts below change so cached summaries are not reused across prompt versions
+PROMPT_VERSION = 2
+SYSTEM_PROMPT = "You are a helpful assistant that analyzes resumes and CVs. When analyzing, provide a clean summary without any special characters or formatting artifacts. Focus on professional experience, skills, education, dates of employment and study, and achievements. Use clear, professional language."
+USER_PROMPT = "Please analyze this CV and provide a clear summary and key points. Remove any special characters or formatting artifacts from the text:\n\n{text}"
+# Used when a CV is too long for a single request: each part is summarised, then the parts are merged
+CHUNK_PROMPT = "This is one part of a longer CV. Summarize the professional experience, skills, education, dates and achievements it contains. Remove any special characters or formatting artifacts from the text:\n\n{text}"
+REDUCE_PROMPT = "These are summaries of consecutive parts of one CV. Combine them into a single clear summary and key points without repeating information:\n\n{text}"
+
+
+def upload_error(files, data):
+    """Why an analyze-pdf upload (request files and form data) is invalid, or None if it is valid."""
+    if 'file' not in files:
+        return 'No file provided'
+    if 'user_id' not in data:
+        return 'user_id is required'
+    if not files['file'].name.endswith('.pdf'):
+        return 'File must be a PDF'
+    if files['file'].size > settings.PDF_MAX_BYTES:
+        return f'File must not exceed {settings.PDF_MAX_BYTES} bytes'
+    return None
+
+
+def is_set(data, flag):
+    return str(data.get(flag, '')).lower() in ('1', 'true', 'yes')
+
+
+def save_analysis(user_id, result):
+    """Store a finished analysis and make it visible to the caches."""
+    cv_analysis = CVAnalysis.objects.create(user_id=user_id, **result)
+    cv_cache.remember(cv_analysis)
+    response_cache.invalidate(response_cache.CV_ANALYSIS, user_id)
+    return cv_analysis
+
+
+def file_digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def normalize_text(text):
+    return ' '.join(text.split())
+
+
+def text_digest(text):
+    payload = f'{MODEL}\n{PROMPT_VERSION}\n{normalize_text(text)}'
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def prompt_messages(prompt, text):
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt.format(text=text)}
+    ]
+
+
+def complete(client, prompt, text):
+    response = llm.chat_completion(
+        client,
+        model=MODEL,
+        messages=prompt_messages(prompt, text),
+        max_tokens=500
+    )
+    return response.choices[0].message.content
+
+
+async def acomplete(client, prompt, text):
+    response = await llm.achat_completion(
+        client,
+        model=MODEL,
+        messages=prompt_messages(prompt, text),
+        max_tokens=500
+    )
+    return response.choices[0].message.content
+
+
+def clean_summary(summary):
+    # Remove newlines from the summary and replace multiple spaces with single space
+    return summary.replace('\n', ' ').replace('  ', ' ')
+
+
+def analyze_text_with_openai(client, text):
+    if estimate_tokens(text) <= settings.CV_SUMMARY_CHUNK_TOKENS:
+        summary = complete(client, USER_PROMPT, text)
+    else:
+        summary = map_reduce(
+            text,
+            summarize=lambda chunk: complete(client, CHUNK_PROMPT, chunk),
+            reduce=lambda partials: complete(client, REDUCE_PROMPT, partials),
+            max_tokens=settings.CV_SUMMARY_CHUNK_TOKENS,
+            max_workers=settings.CV_SUMMARY_MAX_CONCURRENCY
+        )
+    return clean_summary(summary)
+
+
+async def aanalyze_text_with_openai(client, text):
+    if estimate_tokens(text) <= settings.CV_SUMMARY_CHUNK_TOKENS:
+        summary = await acomplete(client, USER_PROMPT, text)
+    else:
+        summary = await amap_reduce(
+            text,
+            summarize=lambda chunk: acomplete(client, CHUNK_PROMPT, chunk),
+            reduce=lambda partials: acomplete(client, REDUCE_PROMPT, partials),
+            max_tokens=settings.CV_SUMMARY_CHUNK_TOKENS,
+            max_workers=settings.CV_SUMMARY_MAX_CONCURRENCY
+        )
+    return clean_summary(summary)
+
+
+def stream_text_analysis(client, text):
+    """Like analyze_text_with_openai, but yields the tokens of the final (or only) completion as they arrive."""
+    prompt = USER_PROMPT
+    if estimate_tokens(text) > settings.CV_SUMMARY_CHUNK_TOKENS:
+        # Long CVs: the chunk summaries are not streamed, only the call that merges them
+        prompt = REDUCE_PROMPT
+        text = condense(
+            text,
+            summarize=lambda chunk: complete(client, CHUNK_PROMPT, chunk),
+            reduce=lambda partials: complete(client, REDUCE_PROMPT, partials),
+            max_tokens=settings.CV_SUMMARY_CHUNK_TOKENS,
+            max_workers=settings.CV_SUMMARY_MAX_CONCURRENCY
+        )
+    return llm.stream_chat_completion(client, model=MODEL, messages=prompt_messages(prompt, text), max_tokens=500)
+
+
+def analyze_pdf(data, client, on_progress=None):
+    """Return the CVAnalysis fields for a PDF, reusing cached results for identical bytes or text."""
+    file_hash = file_digest(data)
+    cached = cv_cache.lookup_by_file_hash(file_hash)
+    if cached is not None:
+        return {'file_hash': file_hash, **cached}
+
+    text = extract_text_from_pdf(data)
+    if not text.strip():
+        raise EmptyPDFError('Could not extract text from PDF')
+    if on_progress:
+        on_progress(40, text=text)
+
+    text_hash = text_digest(text)
+    summary = cv_cache.lookup_by_text_hash(text_hash)
+    if summary is None:
+        summary = analyze_text_with_openai(client, text)
+
+    return {'file_hash': file_hash, 'text_hash': text_hash, 'text': text, 'summary': summary}
+
+
+async def aanalyze_pdf(data, client):
+    """analyze_pdf for async views: extraction and cache lookups run in worker threads, the LLM calls on the event loop."""
+    file_hash = file_digest(data)
+    cached = await sync_to_async(cv_cache.lookup_by_file_hash)(file_hash)
+    if cached is not None:
+        return {'file_hash': file_hash, **cached}
+
+    # CPU-bound and independent of the request's DB connection, so it need not share its thread
+    text = await sync_to_async(extract_text_from_pdf, thread_sensitive=False)(data)
+    if not text.strip():
+        raise EmptyPDFError('Could not extract text from PDF')
+
+    text_hash = text_digest(text)
+    summary = await sync_to_async(cv_cache.lookup_by_text_hash)(text_hash)
+    if summary is None:
+        summary = await aanalyze_text_with_openai(client, text)
+
+    return {'file_hash': file_hash, 'text_hash': text_hash, 'text': text, 'summary': summary}
+
+
+def stream_pdf_analysis(data, client):
+    """
+    Generator version of analyze_pdf for streaming clients: yields ('status', stage),
+    then ('token', text) for each summary delta, and finally ('result', fields).
+    """
+    file_hash = file_digest(data)
+    cached = cv_cache.lookup_by_file_hash(file_hash)
+    if cached is not None:
+        yield 'result', {'file_hash': file_hash, **cached}
+        return
+
+    yield 'status', 'extracting'
+    text = extract_text_from_pdf(data)
+    if not text.strip():
+        raise EmptyPDFError('Could not extract text from PDF')
+
+    text_hash = text_digest(text)
+    summary = cv_cache.lookup_by_text_hash(text_hash)
+    if summary is None:
+        yield 'status', 'summarizing'
+        tokens = []
+        for token in stream_text_analysis(client, text):
+            tokens.append(token)
+            yield 'token', token
+        summary = clean_summary(''.join(tokens))
+
+    yield 'result', {'file_hash': file_hash, 'text_hash': text_hash, 'text': text, 'summary': summary}
+
+
+def set_progress(analysis, progress, **fields):
+    analysis.progress = progress
+    for name, value in fields.items():
+        setattr(analysis, name, value)
+    analysis.save(update_fields=['progress', 'updated_at', *fields])
+
+
+def run_analysis(analysis, client=None):
+    """Extract and summarise the PDF stored on a claimed (processing) CVAnalysis."""
+    client = client or llm.get_client()
+    try:
+        result = analyze_pdf(
+            bytes(analysis.source),
+            client,
+            on_progress=lambda progress, **fields: set_progress(analysis, progress, **fields)
+        )
+        set_progress(
+            analysis, 100,
+            status=CVAnalysis.STATUS_COMPLETED,
+            source=None,
+            **result
+        )
+        cv_cache.remember(analysis)
+        response_cache.invalidate(response_cache.CV_ANALYSIS, analysis.user_id)
+    except Exception as e:
+        set_progress(
+            analysis, analysis.progress,
+            status=CVAnalysis.STATUS_FAILED,
+            error=str(e),
+            source=None
+        )
+        raise
+    return analysis
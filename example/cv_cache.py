@@ -0,0 +1,117 @@
+# example/cv_cache.py
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from .models import CVAnalysis
+
+
+class LRUCache:
+    """Thread-safe LRU cache with per-entry TTL and hit/miss counters."""
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.evictions = 0
+
+    def _get(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self.evictions += 1
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(self, key, loader):
+        # Memory first, then the loader (a DB lookup); only a miss in both counts as a miss
+        with self._lock:
+            value = self._get(key)
+            if value is not None:
+                self.hits += 1
+                return value
+
+        value = loader()
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.loads += 1
+        self.set(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._data),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'loads': self.loads,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+
+# Keyed on SHA-256 of the uploaded PDF bytes -> extracted text and summary
+file_cache = LRUCache(settings.CV_CACHE_MAX_ENTRIES, settings.CV_CACHE_TTL)
+# Keyed on SHA-256 of normalised text + model + prompt version -> summary
+text_cache = LRUCache(settings.CV_CACHE_MAX_ENTRIES, settings.CV_CACHE_TTL)
+
+
+def _completed():
+    return CVAnalysis.objects.filter(status=CVAnalysis.STATUS_COMPLETED).order_by('-created_at')
+
+
+def lookup_by_file_hash(file_hash):
+    return file_cache.get_or_load(
+        file_hash,
+        lambda: _completed().filter(file_hash=file_hash).values('text', 'summary', 'text_hash').first()
+    )
+
+
+def lookup_by_text_hash(text_hash):
+    return text_cache.get_or_load(
+        text_hash,
+        lambda: _completed().filter(text_hash=text_hash).values_list('summary', flat=True).first()
+    )
+
+
+def remember(analysis):
+    if analysis.file_hash:
+        file_cache.set(analysis.file_hash, {
+            'text': analysis.text,
+            'summary': analysis.summary,
+            'text_hash': analysis.text_hash,
+        })
+    if analysis.text_hash:
+        text_cache.set(analysis.text_hash, analysis.summary)
+
+
+def stats():
+    return {
+        'file': file_cache.stats(),
+        'text': text_cache.stats(),
+    }
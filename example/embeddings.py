@@ -0,0 +1,238 @@
+# example/embeddings.py
+import hashlib
+import logging
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from . import llm
+from .models import Conversation, Embedding, Note
+
+logger = logging.getLogger(__name__)
+
+# kind -> (model, Embedding field, fields embedding_text reads)
+SOURCES = {
+    'notes': (Note, 'note', ['content']),
+    'conversations': (Conversation, 'conversation', ['content', 'summary']),
+}
+
+WORD = re.compile(r'\w+')
+
+
+def normalize(vectors):
+    # numpy is imported where it is used, keeping it out of cold starts that never embed
+    import numpy as np
+
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+class HashingEmbedder:
+    """
+    Deterministic local stub: a feature-hashed, signed bag of words. Needs no network
+    or model download, so development and tests get stable vectors for free.
+    """
+
+    def __init__(self, dimensions=None):
+        self.dimensions = dimensions or settings.EMBEDDING_DIMENSIONS
+        self.name = f'hashing-{self.dimensions}'
+
+    def embed(self, texts):
+        import numpy as np
+
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in WORD.findall(text.lower()):
+                digest = int.from_bytes(hashlib.blake2b(word.encode('utf-8'), digest_size=8).digest(), 'big')
+                vectors[row, digest % self.dimensions] += 1 if digest >> 63 else -1
+        return normalize(vectors)
+
+
+class OpenAIEmbedder:
+    def __init__(self, model=None, dimensions=None):
+        self.model = model or settings.EMBEDDING_MODEL
+        self.dimensions = dimensions or settings.EMBEDDING_DIMENSIONS
+        self.name = f'{self.model}-{self.dimensions}'
+
+    def embed(self, texts):
+        response = llm.embedding(model=self.model, input=texts, dimensions=self.dimensions)
+        return normalize([item.embedding for item in sorted(response.data, key=lambda item: item.index)])
+
+
+_embedder = None
+_embedder_lock = threading.Lock()
+
+
+def get_embedder():
+    global _embedder
+    with _embedder_lock:
+        if _embedder is None:
+            _embedder = import_string(settings.EMBEDDER)()
+        return _embedder
+
+
+def content_digest(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def embedding_text(obj, limit):
+    """
+    The text embedded for a note or conversation, at most `limit` characters. A note is
+    cut at the end; a conversation keeps its rolling summary (which covers the start) and
+    the most recent part of the transcript, since that is what is being talked about now.
+    """
+    if not isinstance(obj, Conversation):
+        return obj.content[:limit]
+    summary = obj.summary[:limit // 2]
+    rest = limit - len(summary) - 1 if summary else limit
+    recent = obj.content[-rest:] if len(obj.content) > rest else obj.content
+    return f'{summary}\n{recent}' if summary else recent
+
+
+def embed_objects(kind, ids):
+    """(Re)compute the embeddings of the given notes or conversations whose content changed."""
+    model, field, fields = SOURCES[kind]
+    embedder = get_embedder()
+
+    objects = list(model.objects.filter(id__in=ids).only('id', 'user_id', *fields))
+    texts = {obj.id: embedding_text(obj, settings.EMBEDDING_MAX_CHARS) for obj in objects}
+    current = dict(
+        Embedding.objects.filter(**{f'{field}__in': texts, 'model': embedder.name}).values_list(f'{field}_id', 'content_hash')
+    )
+    stale = [obj for obj in objects if current.get(obj.id) != content_digest(texts[obj.id])]
+
+    for start in range(0, len(stale), settings.EMBEDDING_BATCH_SIZE):
+        batch = stale[start:start + settings.EMBEDDING_BATCH_SIZE]
+        vectors = embedder.embed([texts[obj.id] for obj in batch])
+        now = timezone.now()
+        Embedding.objects.bulk_create(
+            [
+                Embedding(
+                    user_id=obj.user_id, model=embedder.name, content_hash=content_digest(texts[obj.id]),
+                    vector=vector.tobytes(), updated_at=now, **{field: obj}
+                )
+                for obj, vector in zip(batch, vectors)
+            ],
+            update_conflicts=True,
+            unique_fields=[field],
+            update_fields=['user_id', 'model', 'content_hash', 'vector', 'updated_at']
+        )
+    return len(stale)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.EMBEDDING_WORKERS,
+                thread_name_prefix='embeddings'
+            )
+        return _executor
+
+
+def process(kind, ids):
+    close_old_connections()
+    try:
+        return embed_objects(kind, ids)
+    except Exception:
+        logger.exception('Embedding %s %s failed', kind, ids)
+        return 0
+    finally:
+        close_old_connections()
+
+
+def schedule(kind, ids):
+    """Embed the objects in the background once the current transaction commits."""
+    ids = list(ids)
+    if ids:
+        transaction.on_commit(lambda: get_executor().submit(process, kind, ids))
+
+
+class VectorIndex:
+    """All of one user's vectors as a single float32 matrix, searched by cosine similarity."""
+
+    def __init__(self, keys, matrix):
+        self.keys = keys  # [(kind, id), ...], one per matrix row
+        self.matrix = matrix
+
+    @classmethod
+    def load(cls, user_id, embedder):
+        import numpy as np
+
+        rows = Embedding.objects.filter(user_id=user_id, model=embedder.name).values_list('note_id', 'conversation_id', 'vector')
+        keys, vectors = [], []
+        for note_id, conversation_id, vector in rows:
+            keys.append(('notes', note_id) if note_id else ('conversations', conversation_id))
+            vectors.append(bytes(vector))
+        matrix = np.frombuffer(b''.join(vectors), dtype=np.float32).reshape(len(keys), -1) if keys else np.zeros((0, 0), np.float32)
+        return cls(keys, matrix)
+
+    def search(self, vector, k, kinds=None):
+        import numpy as np
+
+        if not self.keys:
+            return []
+        scores = self.matrix @ vector
+        if kinds is not None:
+            scores = np.where([kind in kinds for kind, _ in self.keys], scores, -np.inf)
+        k = min(k, len(self.keys))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(*self.keys[i], float(scores[i])) for i in top if np.isfinite(scores[i])]
+
+
+_indexes = OrderedDict()  # user_id -> (version, VectorIndex), least recently used first
+_indexes_lock = threading.Lock()
+
+
+def index_version(user_id, embedder):
+    # Read from the database rather than the (possibly per-process) cache, so vectors written
+    # by any worker are seen: new or updated rows move the latest updated_at, deleted
+    # notes/conversations cascade to their rows and change the count
+    rows = Embedding.objects.filter(user_id=user_id, model=embedder.name)
+    return tuple(rows.aggregate(count=Count('id'), updated_at=Max('updated_at')).values())
+
+
+def get_index(user_id):
+    embedder = get_embedder()
+    version = index_version(user_id, embedder)
+    with _indexes_lock:
+        cached = _indexes.get(user_id)
+        if cached is not None and cached[0] == version:
+            _indexes.move_to_end(user_id)
+            return cached[1]
+
+    index = VectorIndex.load(user_id, embedder)
+    with _indexes_lock:
+        _indexes[user_id] = (version, index)
+        _indexes.move_to_end(user_id)
+        while len(_indexes) > settings.EMBEDDING_INDEX_MAX_USERS:
+            _indexes.popitem(last=False)
+    return index
+
+
+def search(user_id, text, k, kinds=None):
+    """The user's k notes/conversations most similar to `text`, as [(object, kind, score), ...]."""
+    vector = get_embedder().embed([text[:settings.EMBEDDING_MAX_CHARS]])[0]
+    hits = get_index(user_id).search(vector, k, kinds)
+
+    objects = {}
+    for kind in {kind for kind, _, _ in hits}:
+        model, _, _ = SOURCES[kind]
+        ids = [pk for hit_kind, pk, _ in hits if hit_kind == kind]
+        objects.update(((kind, obj.id), obj) for obj in model.objects.filter(id__in=ids, user_id=user_id))
+    # Objects deleted since the index was loaded are skipped
+    return [(objects[kind, pk], kind, score) for kind, pk, score in hits if (kind, pk) in objects]
@@ -0,0 +1,114 @@
+# example/ical_stream.py
+import hashlib
+from datetime import date, timedelta
+
+
+def split_lines(chunks):
+    pending = b''
+    for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b'\n')
+        yield from lines
+    if pending:
+        yield pending
+
+
+def iter_lines(chunks):
+    """Turn byte chunks into unfolded iCalendar content lines (RFC 5545 section 3.1)."""
+    current = None
+    for line in split_lines(chunks):
+        line = line.rstrip(b'\r')
+        if line[:1] in (b' ', b'\t') and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current is not None:
+        yield current
+
+
+def iter_components(lines, names=(b'VEVENT', b'VTIMEZONE')):
+    """Yield (name, lines) for each top-level component of the given types."""
+    name = None
+    block = []
+    for line in lines:
+        if name is None:
+            upper = line.upper()
+            if upper.startswith(b'BEGIN:') and upper[6:] in names:
+                name = upper[6:]
+                block = [line]
+            continue
+
+        block.append(line)
+        if line.upper() == b'END:' + name:
+            yield name.decode('ascii'), block
+            name = None
+
+
+def dtstart_date(block):
+    # DTSTART;TZID=Europe/Warsaw:20250101T100000 -> date(2025, 1, 1), without a full parse
+    for line in block:
+        if line[:7].upper() == b'DTSTART' and line[7:8] in (b':', b';'):
+            value = line.rsplit(b':', 1)[-1].strip()
+            try:
+                return date(int(value[0:4]), int(value[4:6]), int(value[6:8]))
+            except ValueError:
+                return None
+    return None
+
+
+class FeedReader:
+    """
+    Streams VEVENTs out of an iCalendar feed without building the whole component
+    tree. Events whose DTSTART falls clearly outside [start, end] are dropped before
+    parsing; the rest are parsed one at a time together with the VTIMEZONEs seen so
+    far. The SHA-256 of the raw body is available as `hexdigest` once consumed.
+
+    blocks() and parse() split that in two, so a caller can read the whole body (and
+    its hash) keeping only the raw in-window blocks, and skip parsing when the hash
+    shows nothing changed.
+    """
+
+    def __init__(self, chunks):
+        self._hash = hashlib.sha256()
+        self._chunks = chunks
+        self._timezones = []
+
+    def _hashed(self):
+        for chunk in self._chunks:
+            self._hash.update(chunk)
+            yield chunk
+
+    @property
+    def hexdigest(self):
+        return self._hash.hexdigest()
+
+    def blocks(self, start, end):
+        """Yield the raw lines of each VEVENT that may fall inside [start, end]."""
+        # A day of slack on both sides, since the cheap check ignores time zones
+        first_day = start.date() - timedelta(days=1)
+        last_day = end.date() + timedelta(days=1)
+
+        for name, block in iter_components(iter_lines(self._hashed())):
+            if name == 'VTIMEZONE':
+                self._timezones.append(b'\r\n'.join(block))
+                continue
+
+            day = dtstart_date(block)
+            if day is not None and not first_day <= day <= last_day:
+                continue
+            yield block
+
+    def parse(self, blocks):
+        """Yield the VEVENT components of raw blocks from blocks()."""
+        from icalendar import Calendar
+
+        for block in blocks:
+            calendar = Calendar.from_ical(b'\r\n'.join(
+                [b'BEGIN:VCALENDAR', *self._timezones, *block, b'END:VCALENDAR']
+            ))
+            yield from calendar.walk('VEVENT')
+
+    def events(self, start, end):
+        return self.parse(self.blocks(start, end))
@@ -0,0 +1,92 @@
+# example/jobs.py
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Q
+from django.db.models.functions import Now
+from django.urls import reverse
+from django.utils import timezone
+
+from .cv_analysis import run_analysis
+from .models import CVAnalysis
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.CV_ANALYSIS_WORKERS,
+                thread_name_prefix='cv-analysis'
+            )
+        return _executor
+
+
+def claimable():
+    # Pending jobs, plus processing ones whose worker stopped updating them (progress
+    # saves bump updated_at), e.g. because its process died mid-analysis
+    return Q(status=CVAnalysis.STATUS_PENDING) | Q(
+        status=CVAnalysis.STATUS_PROCESSING,
+        updated_at__lt=timezone.now() - settings.CV_ANALYSIS_STALE_AFTER
+    )
+
+
+def claim(analysis_id):
+    # The transition to processing is a single conditional UPDATE, so a row is only
+    # ever picked up once even if several workers race for it.
+    claimed = CVAnalysis.objects.filter(claimable(), pk=analysis_id).update(
+        status=CVAnalysis.STATUS_PROCESSING, progress=10, updated_at=Now()
+    )
+    if not claimed:
+        return None
+    return CVAnalysis.objects.get(pk=analysis_id)
+
+
+def process_job(analysis_id):
+    close_old_connections()
+    try:
+        analysis = claim(analysis_id)
+        if analysis is None:
+            return False
+        run_analysis(analysis)
+        return True
+    except Exception:
+        logger.exception('CV analysis job %s failed', analysis_id)
+        return False
+    finally:
+        close_old_connections()
+
+
+def enqueue(analysis_id):
+    return get_executor().submit(process_job, analysis_id)
+
+
+def submit(user_id, data):
+    """Queue an uploaded PDF for analysis; returns the 202 body with the URL to poll."""
+    cv_analysis = CVAnalysis.objects.create(
+        user_id=user_id,
+        status=CVAnalysis.STATUS_PENDING,
+        progress=0,
+        source=data
+    )
+    enqueue(cv_analysis.id)
+    return {
+        'id': cv_analysis.id,
+        'user_id': cv_analysis.user_id,
+        'status': cv_analysis.status,
+        'status_url': reverse('cv-analysis-status', args=[cv_analysis.id])
+    }
+
+
+def pending_job_ids(limit=None):
+    """Ids of jobs waiting to be claimed, including stale claims of dead workers."""
+    ids = CVAnalysis.objects.filter(claimable()).order_by('created_at').values_list('id', flat=True)
+    return list(ids[:limit] if limit else ids)
@@ -0,0 +1,244 @@
+# example/llm.py
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+import weakref
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def retryable_errors():
+    # The SDK is imported on first use: it is slow to load and most requests never call it
+    import openai
+
+    return (
+        openai.RateLimitError,
+        openai.APITimeoutError,
+        openai.APIConnectionError,
+        openai.InternalServerError,
+    )
+
+
+class TokenBucket:
+    """Blocking token bucket: `rate` tokens per second, bursts of up to `capacity`."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _take(self):
+        # Returns 0 when a token was taken, otherwise how long to wait for the next one
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self):
+        while wait := self._take():
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        while wait := self._take():
+            await asyncio.sleep(wait)
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.latency = 0.0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def record(self, latency, response=None, error=False):
+        usage = getattr(response, 'usage', None)
+        with self._lock:
+            self.calls += 1
+            self.errors += int(error)
+            self.latency += latency
+            self.prompt_tokens += getattr(usage, 'prompt_tokens', 0) or 0
+            self.completion_tokens += getattr(usage, 'completion_tokens', 0) or 0
+
+    def record_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'errors': self.errors,
+                'retries': self.retries,
+                'avg_latency': self.latency / self.calls if self.calls else 0.0,
+                'prompt_tokens': self.prompt_tokens,
+                'completion_tokens': self.completion_tokens,
+            }
+
+
+_client = None
+_client_lock = threading.Lock()
+_bucket = TokenBucket(settings.LLM_RATE_LIMIT_RPS, settings.LLM_RATE_LIMIT_BURST)
+_slots = threading.BoundedSemaphore(settings.LLM_MAX_CONCURRENCY)
+metrics = Metrics()
+
+# Async clients and concurrency caps are bound to an event loop, so there is one per loop
+_async_clients = weakref.WeakKeyDictionary()
+_async_slots = weakref.WeakKeyDictionary()
+
+
+def get_client():
+    # One client per process so its HTTP connection pool (keep-alive, TLS sessions)
+    # is shared by every request. Retries are handled here, not by the SDK.
+    global _client
+    with _client_lock:
+        if _client is None:
+            import openai
+
+            _client = openai.OpenAI(
+                api_key=os.getenv('OPENAI_API_KEY'),
+                timeout=settings.LLM_TIMEOUT,
+                max_retries=0
+            )
+        return _client
+
+
+def get_async_client():
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        import openai
+
+        client = _async_clients[loop] = openai.AsyncOpenAI(
+            api_key=os.getenv('OPENAI_API_KEY'),
+            timeout=settings.LLM_TIMEOUT,
+            max_retries=0
+        )
+    return client
+
+
+def get_async_slots():
+    # LLM_MAX_CONCURRENCY applies to the async views of each worker on top of the thread cap
+    loop = asyncio.get_running_loop()
+    slots = _async_slots.get(loop)
+    if slots is None:
+        slots = _async_slots[loop] = asyncio.BoundedSemaphore(settings.LLM_MAX_CONCURRENCY)
+    return slots
+
+
+def backoff_delay(attempt, error=None):
+    retry_after = None
+    response = getattr(error, 'response', None)
+    if response is not None:
+        retry_after = response.headers.get('retry-after')
+    if retry_after:
+        try:
+            # Capped like our own backoff, so one response cannot stall a worker indefinitely
+            return min(float(retry_after), settings.LLM_BACKOFF_MAX)
+        except ValueError:
+            pass
+    # Exponential backoff with full jitter
+    return random.uniform(0, min(settings.LLM_BACKOFF_MAX, settings.LLM_BACKOFF_BASE * 2 ** attempt))
+
+
+def chat_completion(client=None, **kwargs):
+    client = client or get_client()
+    return call(client.chat.completions.create, **kwargs)
+
+
+def embedding(client=None, **kwargs):
+    client = client or get_client()
+    return call(client.embeddings.create, **kwargs)
+
+
+def stream_chat_completion(client=None, **kwargs):
+    """
+    Yield the content deltas of a streamed chat completion. Transient errors are only
+    retried until the stream is open; a concurrency slot is held while it is consumed.
+    """
+    client = client or get_client()
+    stream = call(client.chat.completions.create, stream=True, **kwargs)
+    start = time.perf_counter()
+    with _slots, stream:
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    logger.info('OpenAI %s stream took %.2fs after opening', kwargs.get('model'), time.perf_counter() - start)
+
+
+async def achat_completion(client=None, **kwargs):
+    client = client or get_async_client()
+    return await acall(client.chat.completions.create, **kwargs)
+
+
+def call(create, **kwargs):
+    """Run an OpenAI API call under the shared rate limit and concurrency cap, retrying transient errors."""
+    for attempt in range(settings.LLM_MAX_RETRIES + 1):
+        _bucket.acquire()
+        start = time.perf_counter()
+        try:
+            with _slots:
+                response = create(**kwargs)
+        except retryable_errors() as e:
+            metrics.record(time.perf_counter() - start, error=True)
+            if attempt == settings.LLM_MAX_RETRIES:
+                raise
+            delay = backoff_delay(attempt, e)
+            metrics.record_retry()
+            logger.warning('OpenAI call failed (%s), retrying in %.1fs', e.__class__.__name__, delay)
+            time.sleep(delay)
+            continue
+        except Exception:
+            metrics.record(time.perf_counter() - start, error=True)
+            raise
+
+        record_response(kwargs.get('model'), time.perf_counter() - start, response)
+        return response
+
+
+async def acall(create, **kwargs):
+    """call() for the async OpenAI client: waits on the rate limit and backoff without blocking the event loop."""
+    for attempt in range(settings.LLM_MAX_RETRIES + 1):
+        await _bucket.acquire_async()
+        start = time.perf_counter()
+        try:
+            async with get_async_slots():
+                response = await create(**kwargs)
+        except retryable_errors() as e:
+            metrics.record(time.perf_counter() - start, error=True)
+            if attempt == settings.LLM_MAX_RETRIES:
+                raise
+            delay = backoff_delay(attempt, e)
+            metrics.record_retry()
+            logger.warning('OpenAI call failed (%s), retrying in %.1fs', e.__class__.__name__, delay)
+            await asyncio.sleep(delay)
+            continue
+        except Exception:
+            metrics.record(time.perf_counter() - start, error=True)
+            raise
+
+        record_response(kwargs.get('model'), time.perf_counter() - start, response)
+        return response
+
+
+def record_response(model, latency, response):
+    metrics.record(latency, response)
+    usage = getattr(response, 'usage', None)
+    logger.info(
+        'OpenAI %s call took %.2fs (prompt_tokens=%s, completion_tokens=%s)',
+        model, latency,
+        getattr(usage, 'prompt_tokens', None), getattr(usage, 'completion_tokens', None)
+    )
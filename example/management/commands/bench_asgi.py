@@ -0,0 +1,129 @@
+import asyncio
+import statistics
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from example.models import CalendarEvent, CalendarSubscription
+
+
+def build_feed(now, count):
+    lines = ['BEGIN:VCALENDAR', 'VERSION:2.0']
+    for i in range(count):
+        start = (now + timedelta(hours=i % 12)).strftime('%Y%m%dT%H%M%SZ')
+        lines += [
+            'BEGIN:VEVENT', f'UID:bench-{i}@example.com', f'SUMMARY:Event {i}',
+            f'DTSTART:{start}', f'DTEND:{start}', 'END:VEVENT'
+        ]
+    lines.append('END:VCALENDAR')
+    return '\r\n'.join(lines).encode('utf-8')
+
+
+def start_feed_server(body, latency):
+    # Stands in for a slow calendar provider: every response takes `latency` seconds
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/calendar')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark concurrent calendar syncs against a feed server with simulated latency: '
+        'the sync view behind a WSGI pool of --wsgi-threads threads vs the async view on one ASGI event loop'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50)
+        parser.add_argument('--latency', type=float, default=0.5, help='Seconds the feed server takes per response')
+        parser.add_argument('--wsgi-threads', type=int, default=4)
+        parser.add_argument('--events', type=int, default=20)
+
+    def report(self, label, elapsed, results):
+        latencies = sorted(latency for _, latency in results)
+        failures = sum(1 for status_code, _ in results if status_code != 201)
+        self.failures += failures
+        self.stdout.write(
+            f'{label:<6} {elapsed:7.2f}s {len(results) / elapsed:8.1f} req/s  '
+            f'p50 {statistics.median(latencies):6.2f}s  p95 {latencies[int(len(latencies) * 0.95) - 1]:6.2f}s  '
+            f'{failures} failed'
+        )
+
+    def run_wsgi(self, payloads):
+        local = threading.local()
+
+        def sync(payload):
+            if not hasattr(local, 'client'):
+                local.client = Client()
+            start = time.perf_counter()
+            response = local.client.post(reverse('calendar-sync'), payload, content_type='application/json')
+            return response.status_code, time.perf_counter() - start
+
+        with ThreadPoolExecutor(max_workers=self.wsgi_threads) as executor:
+            return list(executor.map(sync, payloads))
+
+    async def run_asgi(self, payloads):
+        client = AsyncClient()
+
+        async def sync(payload):
+            start = time.perf_counter()
+            response = await client.post(reverse('async-calendar-sync'), payload, content_type='application/json')
+            return response.status_code, time.perf_counter() - start
+
+        return await asyncio.gather(*(sync(payload) for payload in payloads))
+
+    def handle(self, *args, **options):
+        self.wsgi_threads = options['wsgi_threads']
+        server = start_feed_server(build_feed(timezone.now(), options['events']), options['latency'])
+        webcal_url = f'webcal://127.0.0.1:{server.server_address[1]}/feed.ics'
+        runs = {
+            label: [{'user_id': f'bench-{label}-{uuid.uuid4()}', 'webcal_url': webcal_url} for _ in range(options['requests'])]
+            for label in ('wsgi', 'asgi')
+        }
+        user_ids = [payload['user_id'] for payloads in runs.values() for payload in payloads]
+        self.failures = 0
+
+        self.stdout.write(
+            f"{options['requests']} concurrent syncs, {options['latency']}s feed latency, "
+            f"{self.wsgi_threads} WSGI threads vs 1 ASGI event loop"
+        )
+        try:
+            # The test clients send Host: testserver, and the local feed server speaks plain HTTP
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']), \
+                    mock.patch('example.calendar_sync.to_https', lambda url: url.replace('webcal://', 'http://')):
+                start = time.perf_counter()
+                results = self.run_wsgi(runs['wsgi'])
+                self.report('wsgi', time.perf_counter() - start, results)
+
+                start = time.perf_counter()
+                results = asyncio.run(self.run_asgi(runs['asgi']))
+                self.report('asgi', time.perf_counter() - start, results)
+        finally:
+            server.shutdown()
+            CalendarEvent.objects.filter(user_id__in=user_ids).delete()
+            CalendarSubscription.objects.filter(user_id__in=user_ids).delete()
+
+        if self.failures:
+            raise CommandError(f'{self.failures} requests did not return 201, so the timings are not comparable')
@@ -0,0 +1,78 @@
+import time
+import uuid
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from example.calendar_sync import upsert_events
+from example.models import CalendarEvent
+
+
+def build_events(now, count, revision=0):
+    for i in range(count):
+        start = now - timedelta(minutes=i)
+        yield f'bench-{i}@example.com', {
+            'summary': f'Event {i} r{revision}',
+            'description': 'Weekly sync\nhttps://meet.google.com/abc-defg-hij',
+            'start_time': start,
+            'end_time': start + timedelta(minutes=30),
+            'location': 'Room 1',
+            'organizer': 'organizer@example.com',
+            'attendees': [{'email': 'bob@example.com', 'name': 'Bob', 'role': 'REQ-PARTICIPANT', 'status': 'ACCEPTED'}],
+            'status': 'confirmed',
+            'meeting_link': 'https://meet.google.com/abc-defg-hij',
+            'notes': '',
+        }
+
+
+def per_row(user_id, events):
+    added = 0
+    for event_id, fields in events:
+        _, created = CalendarEvent.objects.update_or_create(user_id=user_id, event_id=event_id, defaults=fields)
+        added += created
+    return added
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark per-row update_or_create against the batched calendar event upsert'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=5000)
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def run(self, label, func):
+        counter = QueryCounter()
+        # Both paths run in one transaction, as sync_calendar_events does
+        with connection.execute_wrapper(counter), transaction.atomic():
+            start = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - start
+        self.stdout.write(f'{label:<16} {elapsed:8.2f}s {counter.count:8d} queries  {result}')
+
+    def handle(self, *args, **options):
+        count = options['events']
+        batch_size = options['batch_size']
+        per_row_user = f'bench-{uuid.uuid4()}'
+        bulk_user = f'bench-{uuid.uuid4()}'
+        now = timezone.now()
+
+        self.stdout.write(f'{count} events')
+        try:
+            self.run('per-row insert', lambda: per_row(per_row_user, build_events(now, count)))
+            self.run('per-row update', lambda: per_row(per_row_user, build_events(now, count, revision=1)))
+            self.run('bulk insert', lambda: upsert_events(bulk_user, build_events(now, count), batch_size))
+            self.run('bulk update', lambda: upsert_events(bulk_user, build_events(now, count, revision=1), batch_size))
+            self.run('bulk unchanged', lambda: upsert_events(bulk_user, build_events(now, count, revision=1), batch_size))
+        finally:
+            CalendarEvent.objects.filter(user_id__in=[per_row_user, bulk_user]).delete()
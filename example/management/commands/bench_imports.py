@@ -0,0 +1,77 @@
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# What a cold start does before answering GET notes/ or conversations/: build the WSGI
+# application (django.setup() and the middleware), then load the URLconf and views
+STARTUP = '; '.join([
+    'from django.core.wsgi import get_wsgi_application',
+    'application = get_wsgi_application()',
+    'from django.urls import resolve',
+    "resolve('/api/notes/')",
+    "resolve('/api/conversations/')",
+])
+
+# Only needed for PDF/OCR, calendar, LLM and embedding requests; none may load on this path.
+# requests is not checked: rest_framework.compat imports it whenever it is installed
+HEAVY_MODULES = ['openai', 'PyPDF2', 'pytesseract', 'PIL', 'icalendar', 'httpx', 'numpy']
+
+
+def parse_importtime(stderr):
+    """[(module, cumulative microseconds)] for the top-level imports in `python -X importtime` output."""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not name[1:].startswith(' '):  # Nested imports are indented under their importer
+            imports.append((name.strip(), int(cumulative)))
+    return imports
+
+
+class Command(BaseCommand):
+    help = 'Measure the import time of a cold start on the notes/conversations path with -X importtime and enforce a budget'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5)
+        parser.add_argument('--budget-ms', type=float, default=settings.STARTUP_IMPORT_BUDGET_MS)
+        parser.add_argument('--top', type=int, default=10, help='Number of slowest imports to list')
+
+    def measure(self):
+        check = f"; import sys; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', STARTUP + check],
+            cwd=settings.BASE_DIR, env=os.environ.copy(), capture_output=True, text=True
+        )
+        if result.returncode:
+            raise CommandError(f'Startup failed:\n{result.stderr[-2000:]}')
+        loaded = [name for name in result.stdout.strip().split(',') if name]
+        return parse_importtime(result.stderr), loaded
+
+    def handle(self, *args, **options):
+        self.measure()  # Warm-up: writes .pyc files so compilation is not measured
+        runs = []
+        for _ in range(options['runs']):
+            imports, loaded = self.measure()
+            runs.append((sum(cumulative for _, cumulative in imports) / 1000, imports, loaded))
+        runs.sort(key=lambda run: run[0])
+        total, imports, loaded = runs[len(runs) // 2]
+
+        self.stdout.write(
+            f"Startup imports: {total:.1f}ms median of {len(runs)} runs "
+            f"(min {runs[0][0]:.1f}ms, max {runs[-1][0]:.1f}ms)"
+        )
+        for name, cumulative in sorted(imports, key=lambda item: -item[1])[:options['top']]:
+            self.stdout.write(f'  {cumulative / 1000:8.1f}ms  {name}')
+
+        failures = []
+        if loaded:
+            failures.append(f"Heavy modules imported on startup: {', '.join(loaded)}")
+        if total > options['budget_ms']:
+            failures.append(f"Startup imports took {total:.1f}ms, over the {options['budget_ms']:.0f}ms budget")
+        if failures:
+            raise CommandError('\n'.join(failures))
+        self.stdout.write(self.style.SUCCESS(f"Within the {options['budget_ms']:.0f}ms budget, no heavy modules loaded"))
@@ -0,0 +1,60 @@
+import io
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from PIL import Image, ImageDraw
+
+from example.ocr import ocr_page, ocr_pages
+from example.pdf import spooled_pdf
+
+
+def build_scanned_pdf(pages):
+    # Image-only PDF, i.e. a page with no text layer as produced by a scanner
+    images = []
+    for number in range(pages):
+        image = Image.new('RGB', (1240, 1754), 'white')
+        draw = ImageDraw.Draw(image)
+        for line in range(40):
+            draw.text((100, 100 + line * 40), f'Page {number + 1} line {line + 1}: Senior Software Engineer, Python, Django', fill='black')
+        images.append(image)
+
+    buffer = io.BytesIO()
+    images[0].save(buffer, 'PDF', save_all=True, append_images=images[1:], resolution=150)
+    return buffer.getvalue()
+
+
+class Command(BaseCommand):
+    help = 'Benchmark serial vs pooled OCR on a generated multi-page scanned PDF'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=int, default=8)
+
+    def handle(self, *args, **options):
+        data = build_scanned_pdf(options['pages'])
+        page_numbers = list(range(options['pages']))
+
+        # Warm the pool so process start-up is not counted against it
+        ocr_pages(data, page_numbers[:1])
+
+        with spooled_pdf(data) as path:
+            start = time.perf_counter()
+            serial = [ocr_page(path, n, settings.OCR_PAGE_TIMEOUT, settings.OCR_LANG) for n in page_numbers]
+            serial_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        pooled = ocr_pages(data, page_numbers)
+        pooled_time = time.perf_counter() - start
+
+        self.stdout.write(f'pages: {len(page_numbers)}, workers: {settings.OCR_WORKERS}, max concurrent pages: {settings.OCR_MAX_CONCURRENT_PAGES}')
+        self.stdout.write(f'serial: {serial_time:.2f}s ({serial_time / len(page_numbers):.2f}s/page)')
+        self.stdout.write(f'pooled: {pooled_time:.2f}s ({pooled_time / len(page_numbers):.2f}s/page)')
+        self.stdout.write(f'speedup: {serial_time / pooled_time:.2f}x')
+        if len(pooled) < len(page_numbers):
+            self.stdout.write(self.style.WARNING(
+                f'pooled OCR skipped {len(page_numbers) - len(pooled)} pages (OCR_MAX_PAGES={settings.OCR_MAX_PAGES}, '
+                f'OCR_DOCUMENT_TIMEOUT={settings.OCR_DOCUMENT_TIMEOUT}s), so the timings are not comparable'
+            ))
+        # Only the pages pooled OCR returned can be compared
+        if any(serial[n] != text for n, text in pooled.items()):
+            self.stdout.write(self.style.WARNING('Serial and pooled OCR output differ'))
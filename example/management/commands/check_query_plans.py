@@ -0,0 +1,77 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from example.models import CalendarEvent, Conversation, CVAnalysis, Note
+
+USER_ID = 'plan-check-user'
+
+
+def hot_queries():
+    # Mirrors the per-user querysets behind the list/detail endpoints in example/views.py
+    now = timezone.now()
+    return [
+        ('notes/', 'note_user_created_idx',
+         Note.objects.filter(user_id=USER_ID, is_system=False).order_by('-created_at', '-id')),
+        ('conversations/', 'conversation_user_created_idx',
+         Conversation.objects.filter(user_id=USER_ID).order_by('-created_at')),
+        ('cv-analysis/', 'cvanalysis_user_status_idx',
+         CVAnalysis.objects.filter(user_id=USER_ID, status=CVAnalysis.STATUS_COMPLETED).order_by('-created_at')[:1]),
+        ('calendar-events/', 'calevent_user_start_idx',
+         CalendarEvent.objects.filter(user_id=USER_ID).overlapping(now - timedelta(days=7), now).order_by('start_time')),
+    ]
+
+
+def seed(users, rows):
+    now = timezone.now()
+    user_ids = [USER_ID] + [f'plan-check-{i}' for i in range(users)]
+    Note.objects.bulk_create(
+        Note(user_id=user_id, content='note') for user_id in user_ids for _ in range(rows)
+    )
+    Conversation.objects.bulk_create(
+        Conversation(user_id=user_id, content='conversation') for user_id in user_ids for _ in range(rows)
+    )
+    CVAnalysis.objects.bulk_create(
+        CVAnalysis(user_id=user_id, summary='summary', text='text') for user_id in user_ids for _ in range(rows)
+    )
+    CalendarEvent.objects.bulk_create(
+        CalendarEvent(
+            user_id=user_id, event_id=f'event-{i}', summary='event',
+            start_time=now - timedelta(hours=i), end_time=now - timedelta(hours=i) + timedelta(minutes=30)
+        )
+        for user_id in user_ids for i in range(rows)
+    )
+
+
+class Command(BaseCommand):
+    help = 'Seed a throwaway dataset and assert that the per-user hot queries are planned as index scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--rows', type=int, default=50, help='Rows per user and model')
+        parser.add_argument('--no-seed', action='store_true', help='Check against the existing data instead')
+
+    def handle(self, *args, **options):
+        failures = []
+        # Everything, including the seeded rows, is rolled back at the end
+        with transaction.atomic():
+            if not options['no_seed']:
+                seed(options['users'], options['rows'])
+                if connection.vendor == 'postgresql':
+                    with connection.cursor() as cursor:
+                        cursor.execute('ANALYZE')
+
+            for endpoint, index, queryset in hot_queries():
+                plan = queryset.explain()
+                uses_index = index in plan
+                self.stdout.write(f"{'ok' if uses_index else 'FAIL':<5} {endpoint:<18} expects {index}")
+                if not uses_index:
+                    failures.append(endpoint)
+                    self.stdout.write(plan)
+
+            transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError(f"Hot queries not using their index: {', '.join(failures)}")
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from example.compaction import compact_conversation, compact_week, week_start
+from example.models import Conversation
+
+
+class Command(BaseCommand):
+    help = 'Bring rolling conversation summaries and the current weekly summaries up to date'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Only compact this user\'s conversations')
+        parser.add_argument('--min-messages', type=int, default=1, help='Skip conversations with fewer new messages')
+
+    def handle(self, *args, **options):
+        conversations = Conversation.objects.order_by('id').values_list('id', 'user_id')
+        if options['user']:
+            conversations = conversations.filter(user_id=options['user'])
+
+        compacted = 0
+        users = set()
+        for conversation_id, user_id in conversations:
+            if compact_conversation(conversation_id, min_messages=options['min_messages']):
+                compacted += 1
+                users.add(user_id)
+
+        start = week_start(timezone.localdate())
+        weeks = sum(compact_week(user_id, start) for user_id in users)
+        self.stdout.write(f'Compacted {compacted} conversations and {weeks} weekly summaries')
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from example.embeddings import SOURCES, embed_objects
+
+
+class Command(BaseCommand):
+    help = 'Compute missing or outdated embeddings of notes and conversations (e.g. after changing EMBEDDER)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Only embed this user\'s content')
+        parser.add_argument('--batch', type=int, default=500, help='Objects loaded per pass')
+
+    def handle(self, *args, **options):
+        for kind, (model, _, _) in SOURCES.items():
+            queryset = model.objects.order_by('id')
+            if options['user']:
+                queryset = queryset.filter(user_id=options['user'])
+            ids = list(queryset.values_list('id', flat=True))
+
+            embedded = 0
+            for start in range(0, len(ids), options['batch']):
+                embedded += embed_objects(kind, ids[start:start + options['batch']])
+            self.stdout.write(f'{kind}: embedded {embedded} of {len(ids)}')
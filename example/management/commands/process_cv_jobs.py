@@ -0,0 +1,31 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from example.jobs import pending_job_ids, process_job
+
+
+class Command(BaseCommand):
+    help = (
+        'Process pending CV analysis jobs, including ones a restarted worker left pending or '
+        'stuck in processing for longer than CV_ANALYSIS_STALE_AFTER'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=None, help='Maximum number of jobs to process')
+        parser.add_argument('--workers', type=int, default=settings.CV_ANALYSIS_WORKERS, help='Number of concurrent jobs')
+
+    def handle(self, *args, **options):
+        job_ids = pending_job_ids(options['limit'])
+        if not job_ids:
+            self.stdout.write('No pending CV analysis jobs')
+            return
+
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            results = list(executor.map(process_job, job_ids))
+
+        processed = sum(1 for result in results if result)
+        self.stdout.write(self.style.SUCCESS(
+            f'Processed {processed} of {len(job_ids)} pending CV analysis jobs'
+        ))
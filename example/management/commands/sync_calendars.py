@@ -0,0 +1,85 @@
+import logging
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.db.models import Q
+from django.utils import timezone
+
+from example.calendar_sync import record_failure, sync_calendar_events, to_https
+from example.models import CalendarSubscription
+
+logger = logging.getLogger(__name__)
+
+
+class HostLimiter:
+    """Caps concurrent requests per host and spaces out their start times."""
+
+    def __init__(self, per_host, delay):
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._slots = defaultdict(lambda: threading.BoundedSemaphore(per_host))
+        self._next_start = defaultdict(float)
+
+    @contextmanager
+    def slot(self, host):
+        with self._lock:
+            semaphore = self._slots[host]
+        with semaphore:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_start[host])
+                self._next_start[host] = start + self.delay
+            time.sleep(start - now)
+            yield
+
+
+def due_subscriptions(now, limit=None):
+    subscriptions = CalendarSubscription.objects.filter(
+        Q(next_sync_at__isnull=True) | Q(next_sync_at__lte=now)
+    ).order_by('next_sync_at')
+    return list(subscriptions[:limit] if limit else subscriptions)
+
+
+class Command(BaseCommand):
+    help = 'Sync all calendar subscriptions that are due, with bounded concurrency and per-host limits'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=settings.CALENDAR_SYNC_WORKERS)
+        parser.add_argument('--limit', type=int, default=None, help='Maximum subscriptions per pass')
+        parser.add_argument('--loop', action='store_true', help='Keep running, checking for due subscriptions every --poll seconds')
+        parser.add_argument('--poll', type=int, default=60)
+
+    def sync_one(self, limiter, subscription):
+        close_old_connections()
+        try:
+            with limiter.slot(urlparse(to_https(subscription.webcal_url)).hostname):
+                result = sync_calendar_events(subscription)
+            logger.info('Synced calendar for user %s: %s', subscription.user_id, result)
+            return True
+        except Exception as e:
+            logger.warning('Calendar sync for user %s failed: %s', subscription.user_id, e)
+            record_failure(subscription, e)
+            return False
+        finally:
+            close_old_connections()
+
+    def run_pass(self, executor, limiter, limit):
+        subscriptions = due_subscriptions(timezone.now(), limit)
+        results = list(executor.map(lambda subscription: self.sync_one(limiter, subscription), subscriptions))
+        succeeded = sum(results)
+        self.stdout.write(f'Synced {succeeded} of {len(subscriptions)} due calendar subscriptions')
+
+    def handle(self, *args, **options):
+        limiter = HostLimiter(settings.CALENDAR_SYNC_PER_HOST, settings.CALENDAR_SYNC_HOST_DELAY)
+        with ThreadPoolExecutor(max_workers=options['workers'], thread_name_prefix='calendar-sync') as executor:
+            self.run_pass(executor, limiter, options['limit'])
+            while options['loop']:
+                time.sleep(options['poll'])
+                self.run_pass(executor, limiter, options['limit'])
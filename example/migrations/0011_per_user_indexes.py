@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('example', '0010_calendarsubscription_schedule'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='calendarevent',
+            index=models.Index(fields=['user_id', 'start_time'], name='calevent_user_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='calendarsubscription',
+            index=models.Index(fields=['user_id'], name='calsub_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='conversation',
+            index=models.Index(fields=['user_id', '-created_at'], name='conversation_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cvanalysis',
+            index=models.Index(fields=['user_id', 'status', '-created_at'], name='cvanalysis_user_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(fields=['user_id', '-created_at'], name='note_user_created_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:50
+
+from django.db import migrations, models
+
+# The notes that used to be hard-coded as the default notes for every user
+SYSTEM_NOTE_IDS = [14, 15, 16, 17, 18]
+
+
+def mark_system_notes(apps, schema_editor):
+    Note = apps.get_model('example', 'Note')
+    Note.objects.filter(id__in=SYSTEM_NOTE_IDS).update(is_system=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('example', '0011_per_user_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='note',
+            name='is_system',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(mark_system_notes, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(condition=models.Q(('is_system', True)), fields=['id'], name='note_system_idx'),
+        ),
+    ]
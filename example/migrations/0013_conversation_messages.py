@@ -0,0 +1,91 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:52
+
+import json
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Copies of the transcript helpers in example/conversations.py as of this migration, so
+# later changes to that module cannot change what this data migration does
+ROLE_LINE = re.compile(r'^(user|assistant|system|agent|ai|mentor|human|bot)\s*:\s?(.*)$', re.IGNORECASE)
+
+
+def parse_json_transcript(content):
+    try:
+        data = json.loads(content)
+    except ValueError:
+        return None
+    if not isinstance(data, list) or not data or not all(isinstance(item, dict) for item in data):
+        return None
+    return [
+        (str(item.get('role', '')).lower(), str(item.get('content', item.get('text', ''))))
+        for item in data
+    ]
+
+
+def split_transcript(content):
+    messages = parse_json_transcript(content)
+    if messages is not None:
+        return messages
+
+    messages = []
+    for line in content.splitlines():
+        match = ROLE_LINE.match(line)
+        if match:
+            messages.append([match.group(1).lower(), match.group(2)])
+        elif messages:
+            messages[-1][1] += '\n' + line
+        else:
+            messages.append(['', line])
+    return [(role, text) for role, text in messages if role or text.strip()]
+
+
+def render_transcript(messages):
+    return '\n'.join(f'{role}: {content}' if role else content for role, content in messages)
+
+
+def split_conversations(apps, schema_editor):
+    Conversation = apps.get_model('example', 'Conversation')
+    ConversationMessage = apps.get_model('example', 'ConversationMessage')
+
+    batch = []
+    for conversation in Conversation.objects.order_by('pk').iterator(chunk_size=500):
+        messages = split_transcript(conversation.content)
+        batch.extend(
+            ConversationMessage(conversation_id=conversation.pk, position=position, role=role, content=content)
+            for position, (role, content) in enumerate(messages)
+        )
+        # JSON transcripts become plain text, so appended turns can simply be concatenated
+        if parse_json_transcript(conversation.content) is not None:
+            Conversation.objects.filter(pk=conversation.pk).update(content=render_transcript(messages))
+        if len(batch) >= 1000:
+            ConversationMessage.objects.bulk_create(batch)
+            batch = []
+    ConversationMessage.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('example', '0012_note_is_system'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConversationMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField()),
+                ('role', models.CharField(blank=True, default='', max_length=32)),
+                ('content', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('conversation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='messages', to='example.conversation')),
+            ],
+            options={
+                'ordering': ['conversation', 'position'],
+                'constraints': [models.UniqueConstraint(fields=('conversation', 'position'), name='conversation_message_position_uniq')],
+            },
+        ),
+        migrations.RunPython(split_conversations, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:54
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+# table -> columns whose text feeds the search vector
+SEARCH_COLUMNS = {
+    'example_note': ['content'],
+    'example_conversation': ['content'],
+    'example_cvanalysis': ['summary', 'text'],
+}
+SEARCH_INDEXES = {
+    'example_note': 'note_search_idx',
+    'example_conversation': 'conversation_search_idx',
+    'example_cvanalysis': 'cvanalysis_search_idx',
+}
+
+
+def create_search_triggers(apps, schema_editor):
+    # GIN indexes and tsvector triggers only exist on PostgreSQL; other databases use the fallback search
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table, columns in SEARCH_COLUMNS.items():
+        column_list = ', '.join(columns)
+        document = " || ' ' || ".join(f"coalesce({column}, '')" for column in columns)
+        schema_editor.execute(f'CREATE INDEX {SEARCH_INDEXES[table]} ON {table} USING gin (search_vector)')
+        schema_editor.execute(
+            f'CREATE TRIGGER {table}_search_vector_update BEFORE INSERT OR UPDATE OF {column_list} ON {table} '
+            f"FOR EACH ROW EXECUTE FUNCTION tsvector_update_trigger(search_vector, 'pg_catalog.english', {column_list})"
+        )
+        schema_editor.execute(f"UPDATE {table} SET search_vector = to_tsvector('pg_catalog.english', {document})")
+
+
+def drop_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table in SEARCH_COLUMNS:
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS {table}_search_vector_update ON {table}')
+        schema_editor.execute(f'DROP INDEX IF EXISTS {SEARCH_INDEXES[table]}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('example', '0013_conversation_messages'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversation',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='cvanalysis',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='note',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='conversation',
+                    index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='conversation_search_idx'),
+                ),
+                migrations.AddIndex(
+                    model_name='cvanalysis',
+                    index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='cvanalysis_search_idx'),
+                ),
+                migrations.AddIndex(
+                    model_name='note',
+                    index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='note_search_idx'),
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(create_search_triggers, drop_search_triggers),
+            ],
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('example', '0014_search_vectors'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Embedding',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.CharField(max_length=100)),
+                ('model', models.CharField(max_length=100)),
+                ('content_hash', models.CharField(max_length=64)),
+                ('vector', models.BinaryField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('conversation', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='embedding', to='example.conversation')),
+                ('note', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='embedding', to='example.note')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user_id', 'model'], name='embedding_user_model_idx')],
+                'constraints': [models.CheckConstraint(check=models.Q(models.Q(('conversation__isnull', True), ('note__isnull', False)), models.Q(('conversation__isnull', False), ('note__isnull', True)), _connector='OR'), name='embedding_single_source')],
+            },
+        ),
+    ]
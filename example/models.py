@@ -1,31 +1,151 @@
+from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
+class SearchableManager(models.Manager):
+    # search_vector is only used inside search queries, so ordinary reads never load it
+    def get_queryset(self):
+        return super().get_queryset().defer('search_vector')
+
 class Note(models.Model):
     user_id = models.CharField(max_length=100)
     content = models.TextField()
+    # System notes are returned to every user alongside their own notes
+    is_system = models.BooleanField(default=False)
+    search_vector = SearchVectorField(null=True, editable=False)  # Maintained by a database trigger on PostgreSQL
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = SearchableManager()
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user_id', '-created_at'], name='note_user_created_idx'),
+            models.Index(fields=['id'], name='note_system_idx', condition=models.Q(is_system=True)),
+            GinIndex(fields=['search_vector'], name='note_search_idx'),
+        ]
 
 class Conversation(models.Model):
     user_id = models.CharField(max_length=100)
-    content = models.TextField()  # Changed from JSONField to TextField
+    content = models.TextField()  # Full transcript, kept in sync with the messages below
+    search_vector = SearchVectorField(null=True, editable=False)  # Maintained by a database trigger on PostgreSQL
+    # Rolling summary of the messages up to and including summary_position (see compaction.py)
+    summary = models.TextField(blank=True, default='')
+    summary_position = models.IntegerField(null=True, blank=True)
+    summary_updated_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = SearchableManager()
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user_id', '-created_at'], name='conversation_user_created_idx'),
+            GinIndex(fields=['search_vector'], name='conversation_search_idx'),
+        ]
+
+class ConversationMessage(models.Model):
+    conversation = models.ForeignKey(Conversation, on_delete=models.CASCADE, related_name='messages')
+    position = models.PositiveIntegerField()  # 0-based order within the conversation
+    role = models.CharField(max_length=32, blank=True, default='')  # e.g. user, assistant; empty when unknown
+    content = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['conversation', 'position']
+        constraints = [
+            # Also the index behind appends (max position) and tail reads
+            models.UniqueConstraint(fields=['conversation', 'position'], name='conversation_message_position_uniq'),
+        ]
+
+class WeeklySummary(models.Model):
+    """Rolling summary of all of a user's conversation messages in one week (Monday to Sunday)."""
+    user_id = models.CharField(max_length=100)
+    week_start = models.DateField()
+    summary = models.TextField(blank=True, default='')
+    last_message_id = models.BigIntegerField(default=0)  # Checkpoint: messages up to this id are summarised
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-week_start']
+        constraints = [
+            models.UniqueConstraint(fields=['user_id', 'week_start'], name='weeklysummary_user_week_uniq'),
+        ]
+
+class Embedding(models.Model):
+    """Vector embedding of one note or conversation, computed in the background after writes."""
+    user_id = models.CharField(max_length=100)
+    note = models.OneToOneField(Note, on_delete=models.CASCADE, null=True, blank=True, related_name='embedding')
+    conversation = models.OneToOneField(Conversation, on_delete=models.CASCADE, null=True, blank=True, related_name='embedding')
+    model = models.CharField(max_length=100)  # Name of the embedder that produced the vector
+    content_hash = models.CharField(max_length=64)  # SHA-256 of the embedded text, to skip unchanged content
+    vector = models.BinaryField()  # float32, L2-normalised
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user_id', 'model'], name='embedding_user_model_idx'),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(note__isnull=False, conversation__isnull=True) | models.Q(note__isnull=True, conversation__isnull=False),
+                name='embedding_single_source'
+            ),
+        ]
 
 class CVAnalysis(models.Model):
+    STATUS_PENDING = 'pending'
+    STATUS_PROCESSING = 'processing'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_PROCESSING, 'Processing'),
+        (STATUS_COMPLETED, 'Completed'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
     user_id = models.CharField(max_length=100)
-    summary = models.TextField()
-    text = models.TextField()
+    summary = models.TextField(blank=True, default='')
+    text = models.TextField(blank=True, default='')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_COMPLETED)
+    progress = models.PositiveSmallIntegerField(default=100)  # 0-100, meaningful while a job is running
+    error = models.TextField(blank=True, default='')
+    source = models.BinaryField(null=True, blank=True, editable=False)  # Uploaded PDF, kept only until the job finishes
+    file_hash = models.CharField(max_length=64, blank=True, default='', db_index=True)  # SHA-256 of the uploaded PDF
+    text_hash = models.CharField(max_length=64, blank=True, default='', db_index=True)  # SHA-256 of normalised text + model + prompt version
+    search_vector = SearchVectorField(null=True, editable=False)  # Maintained by a database trigger on PostgreSQL
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = SearchableManager()
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user_id', 'status', '-created_at'], name='cvanalysis_user_status_idx'),
+            GinIndex(fields=['search_vector'], name='cvanalysis_search_idx'),
+        ]
+
+class CalendarEventQuerySet(models.QuerySet):
+    def overlapping(self, start=None, end=None):
+        # Events overlapping the half-open range [start, end), on the raw indexed columns.
+        # Events starting at most CALENDAR_EVENT_MAX_SPAN before the range are found by a
+        # range scan of the (user_id, start_time) index bounded on both sides; the few
+        # longer ones that started earlier and are still running, through (user_id, end_time).
+        queryset = self
+        if end is not None:
+            queryset = queryset.filter(start_time__lt=end)
+        if start is not None:
+            cutoff = start - settings.CALENDAR_EVENT_MAX_SPAN
+            queryset = queryset.filter(
+                models.Q(models.Q(end_time__gt=start) | models.Q(start_time__gte=start), start_time__gte=cutoff)
+                | models.Q(start_time__lt=cutoff, end_time__gt=start)
+            )
+        return queryset
 
 class CalendarEvent(models.Model):
     user_id = models.CharField(max_length=100)
@@ -41,16 +161,35 @@ class CalendarEvent(models.Model):
     notes = models.TextField(null=True, blank=True)
     status = models.CharField(max_length=50, null=True, blank=True)  # confirmed, tentative, cancelled
     meeting_link = models.URLField(max_length=500, null=True, blank=True)  # For virtual meetings
+    content_hash = models.CharField(max_length=64, blank=True, default='')  # SHA-256 of the synced fields, to skip unchanged events
+
+    objects = CalendarEventQuerySet.as_manager()
 
     class Meta:
         ordering = ['-start_time']
         unique_together = ['user_id', 'event_id']
+        indexes = [
+            models.Index(fields=['user_id', 'start_time'], name='calevent_user_start_idx'),
+            models.Index(fields=['user_id', 'end_time'], name='calevent_user_end_idx'),
+        ]
 
 class CalendarSubscription(models.Model):
     user_id = models.CharField(max_length=100)
     webcal_url = models.URLField(max_length=500)
     last_sync = models.DateTimeField(auto_now=True)
+    # Validators of the last fetched feed, sent back as If-None-Match / If-Modified-Since
+    etag = models.CharField(max_length=255, blank=True, default='')
+    last_modified = models.CharField(max_length=64, blank=True, default='')
+    content_hash = models.CharField(max_length=64, blank=True, default='')  # SHA-256 of the last parsed feed body
+    synced_until = models.DateTimeField(null=True, blank=True)  # End of the event window covered by the last parse
+    # Background sync schedule, see the sync_calendars management command
+    next_sync_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    failure_count = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        ordering = ['-created_at'] 
\ No newline at end of file
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user_id'], name='calsub_user_idx'),
+        ]
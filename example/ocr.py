@@ -0,0 +1,138 @@
+# example/ocr.py
+import io
+import logging
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+class OCRUnavailableError(Exception):
+    pass
+
+
+_executor = None
+_executor_lock = threading.Lock()
+# Caps OCR pages in flight across all requests in this process, so a burst of
+# scanned uploads queues up here instead of tying up every API worker
+_slots = threading.BoundedSemaphore(settings.OCR_MAX_CONCURRENT_PAGES)
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=settings.OCR_WORKERS)
+        return _executor
+
+
+def reset_executor(broken):
+    global _executor
+    with _executor_lock:
+        # Another caller may already have replaced the broken pool
+        if _executor is broken:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def ocr_page(path, page_number, timeout=None, lang='eng'):
+    # Runs in a worker process; the imaging libraries are only loaded there
+    import pytesseract
+    from PIL import Image
+
+    from .pdf import worker_reader
+
+    # Scanned CVs store each page as an embedded image, so OCR those images
+    # rather than rendering the whole page
+    reader = worker_reader(path)
+    texts = []
+    for image in reader.pages[page_number].images:
+        try:
+            texts.append(pytesseract.image_to_string(Image.open(io.BytesIO(image.data)), lang=lang, timeout=timeout or 0))
+        except RuntimeError:
+            # pytesseract kills tesseract and raises RuntimeError when the timeout expires
+            return ''
+        except pytesseract.TesseractNotFoundError:
+            # Re-raised as a plain exception: TesseractNotFoundError cannot be unpickled in the parent
+            raise OCRUnavailableError('tesseract is not installed or not on PATH')
+    return '\n'.join(text.strip() for text in texts if text.strip())
+
+
+def ocr_pages(data, page_numbers):
+    """
+    OCR text of the given pages, {page_number: text}. At most OCR_MAX_PAGES pages are
+    OCRed per document and all of them must finish within OCR_DOCUMENT_TIMEOUT seconds;
+    pages beyond the cap or the budget are left out.
+    """
+    timeout = settings.OCR_PAGE_TIMEOUT
+    deadline = time.monotonic() + settings.OCR_DOCUMENT_TIMEOUT
+    if len(page_numbers) > settings.OCR_MAX_PAGES:
+        logger.warning('Document has %d pages without text, OCRing the first %d', len(page_numbers), settings.OCR_MAX_PAGES)
+        page_numbers = page_numbers[:settings.OCR_MAX_PAGES]
+
+    from .pdf import spooled_pdf  # pdf.py imports this module
+
+    # Like PDF extraction, the tasks carry the path of one temporary copy of the document
+    with spooled_pdf(data) as path:
+        executor = get_executor()
+        return collect(executor, submit(executor, path, page_numbers, timeout, deadline), timeout, deadline)
+
+
+def submit(executor, path, page_numbers, timeout, deadline):
+    futures = {}
+    for page_number in page_numbers:
+        if not _slots.acquire(timeout=max(0, min(timeout, deadline - time.monotonic()))):
+            logger.warning('OCR pool saturated, skipping remaining %d pages', len(page_numbers) - len(futures))
+            break
+        try:
+            future = executor.submit(ocr_page, path, page_number, timeout, settings.OCR_LANG)
+        except Exception:
+            _slots.release()
+            raise
+        future.add_done_callback(lambda _: _slots.release())
+        futures[page_number] = future
+    return futures
+
+
+def collect(executor, futures, timeout, deadline):
+    results = {}
+    for page_number, future in futures.items():
+        remaining = deadline - time.monotonic()
+        try:
+            # The worker enforces the timeout on tesseract itself; this one is the backstop,
+            # shortened to what is left of the document's budget
+            results[page_number] = future.result(timeout=max(0, min(timeout + 5, remaining)))
+        except TimeoutError:
+            if remaining < timeout + 5:
+                # Pages not started yet are dropped; running ones finish within their own timeout
+                future.cancel()
+                logger.warning('OCR time budget spent, skipping page %d', page_number)
+            else:
+                logger.warning('OCR of page %d timed out', page_number)
+            results[page_number] = ''
+        except BrokenProcessPool:
+            logger.error('OCR worker process died on page %d, restarting pool', page_number)
+            reset_executor(executor)
+            results[page_number] = ''
+        except Exception as e:
+            # e.g. OCRUnavailableError or an image format PIL cannot decode
+            logger.warning('OCR of page %d failed: %s', page_number, e)
+            results[page_number] = ''
+    return results
+
+
+def fill_empty_pages(data, pages):
+    """Replace pages without a text layer by their OCR text."""
+    if not settings.OCR_ENABLED:
+        return pages
+    empty = [i for i, text in enumerate(pages) if not text.strip()]
+    if not empty:
+        return pages
+
+    pages = list(pages)
+    for page_number, text in ocr_pages(data, empty).items():
+        pages[page_number] = text
+    return pages
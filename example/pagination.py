@@ -0,0 +1,102 @@
+# example/pagination.py
+import base64
+import json
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+PAGINATION_PARAMETERS = [
+    OpenApiParameter(name='page_size', description='Opt in to pagination with this many items per page', required=False, type=int),
+    OpenApiParameter(name='cursor', description='Opaque cursor from the "next" link of the previous page', required=False, type=str),
+]
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination on (<timestamp field>, id), so every page is an index
+    range scan no matter how deep the client pages. Opt-in: requests without
+    page_size or cursor get the full, unpaginated list as before.
+
+    `extra` instances (e.g. notes shared by all users) are merged into the pages in
+    the same order, as if they were part of the queryset.
+    """
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+
+    def __init__(self, ordering):
+        self.ordering = ordering
+        self.field = ordering[0].lstrip('-')
+        self.descending = ordering[0].startswith('-')
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, api_settings.PAGE_SIZE))
+        except ValueError:
+            page_size = api_settings.PAGE_SIZE
+        return max(1, min(page_size, settings.MAX_PAGE_SIZE))
+
+    def encode_cursor(self, instance):
+        position = [getattr(instance, self.field).isoformat(), instance.pk]
+        return base64.urlsafe_b64encode(json.dumps(position).encode('utf-8')).decode('ascii')
+
+    def decode_cursor(self, cursor):
+        try:
+            value, pk = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            value = parse_datetime(value)
+            if value is None:
+                raise ValueError
+            return value, int(pk)
+        except (TypeError, ValueError):
+            raise NotFound('Invalid cursor')
+
+    def sort_key(self, instance):
+        return getattr(instance, self.field), instance.pk
+
+    def paginate_queryset(self, queryset, request, view=None, extra=()):
+        params = request.query_params
+        if self.page_size_query_param not in params and self.cursor_query_param not in params:
+            return None
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+
+        extra = list(extra)
+        cursor = params.get(self.cursor_query_param)
+        if cursor:
+            value, pk = self.decode_cursor(cursor)
+            lookup = 'lt' if self.descending else 'gt'
+            queryset = queryset.filter(
+                Q(**{f'{self.field}__{lookup}': value}) | Q(**{self.field: value, f'pk__{lookup}': pk})
+            )
+            if self.descending:
+                extra = [instance for instance in extra if self.sort_key(instance) < (value, pk)]
+            else:
+                extra = [instance for instance in extra if self.sort_key(instance) > (value, pk)]
+
+        # One extra row tells us whether there is a next page
+        page = list(queryset[:page_size + 1])
+        if extra:
+            page = sorted(page + extra, key=self.sort_key, reverse=self.descending)[:page_size + 1]
+        self.has_next = len(page) > page_size
+        self.page = page[:page_size]
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
@@ -0,0 +1,111 @@
+# example/pdf.py
+import io
+import tempfile
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+from django.conf import settings
+
+from . import ocr
+
+
+class PDFError(ValueError):
+    pass
+
+
+class EmptyPDFError(PDFError):
+    pass
+
+
+class PDFTooLargeError(PDFError):
+    pass
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=settings.PDF_EXTRACT_WORKERS)
+        return _executor
+
+
+def _read(pdf_file):
+    return pdf_file if isinstance(pdf_file, (bytes, bytearray)) else pdf_file.read()
+
+
+@contextmanager
+def spooled_pdf(data):
+    """
+    Write a document to a temporary file for the worker pools and yield its path, so
+    tasks carry the path instead of pickling the whole document into each of them.
+    """
+    # A unique name keeps workers from mistaking it for a previous document they still hold
+    with tempfile.NamedTemporaryFile(prefix=f'{uuid.uuid4().hex}-', suffix='.pdf') as f:
+        f.write(data)
+        f.flush()
+        yield f.name
+
+
+_worker_reader = None  # (path, PdfReader) of the document this worker process last opened
+
+
+def worker_reader(path):
+    """In a worker process: the reader of the document at `path`, parsed once per worker rather than once per task."""
+    global _worker_reader
+    import PyPDF2
+
+    if _worker_reader is None or _worker_reader[0] != path:
+        with open(path, 'rb') as f:
+            _worker_reader = (path, PyPDF2.PdfReader(io.BytesIO(f.read())))
+    return _worker_reader[1]
+
+
+def _extract_pages(path, start, stop):
+    # Runs in a worker process
+    reader = worker_reader(path)
+    return [reader.pages[i].extract_text() or '' for i in range(start, stop)]
+
+
+def open_pdf(data):
+    if len(data) > settings.PDF_MAX_BYTES:
+        raise PDFTooLargeError(f'PDF exceeds the {settings.PDF_MAX_BYTES} byte limit')
+
+    import PyPDF2  # Imported on first use to keep it out of cold starts that never see a PDF
+
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    if len(reader.pages) > settings.PDF_MAX_PAGES:
+        raise PDFTooLargeError(f'PDF exceeds the {settings.PDF_MAX_PAGES} page limit')
+    return reader
+
+
+def iter_page_texts(pdf_file):
+    """Yield the text of each page in order, as soon as it has been extracted."""
+    data = _read(pdf_file)
+    reader = open_pdf(data)
+    page_count = len(reader.pages)
+
+    # Small documents are faster to extract in-process than to ship to the pool
+    if page_count < settings.PDF_PARALLEL_PAGE_THRESHOLD:
+        for page in reader.pages:
+            yield page.extract_text() or ''
+        return
+
+    step = settings.PDF_PAGES_PER_TASK
+    starts = range(0, page_count, step)
+    stops = [min(start + step, page_count) for start in starts]
+    with spooled_pdf(data) as path:
+        # map() returns results in submission order while later chunks are still running
+        for texts in get_executor().map(_extract_pages, [path] * len(starts), starts, stops):
+            yield from texts
+
+
+def extract_text_from_pdf(pdf_file):
+    data = _read(pdf_file)
+    pages = ocr.fill_empty_pages(data, list(iter_page_texts(data)))
+    return ''.join(f'{text}\n' for text in pages)
@@ -0,0 +1,109 @@
+# example/response_cache.py
+import hashlib
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+NOTES = 'notes'
+CONVERSATIONS = 'conversations'
+CV_ANALYSIS = 'cv-analysis'
+CALENDAR_EVENTS = 'calendar-events'
+
+# Cache key for everyone's cached responses of a resource, e.g. after a system note changes
+ALL_USERS = '*'
+
+
+def _digest(value):
+    return hashlib.sha256(value.encode('utf-8')).hexdigest()[:32]
+
+
+def _version_key(resource, user_id):
+    return f'response:version:{resource}:{_digest(user_id)}'
+
+
+def get_version(resource, user_id):
+    return cache.get_or_set(_version_key(resource, user_id), 1, None)
+
+
+def invalidate(resource, user_id=ALL_USERS):
+    # Bumping the version orphans every cached response built on the old one
+    key = _version_key(resource, user_id)
+    if cache.add(key, 2, None):
+        return
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, None)
+
+
+def response_key(resources, user_id, request):
+    versions = '.'.join(
+        f'{get_version(resource, ALL_USERS)}.{get_version(resource, user_id)}' for resource in resources
+    )
+    return f"response:{'+'.join(resources)}:{_digest(user_id)}:{versions}:{_digest(request.build_absolute_uri())}"
+
+
+def cached_response(*resources):
+    """
+    Cache successful GET responses per user (versioned by invalidate() on any of the
+    given resources) and answer If-None-Match with 304 when the client already has
+    the current representation.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            user_id = request.query_params.get('user_id')
+            if not user_id:
+                return method(self, request, *args, **kwargs)
+
+            key = response_key(resources, user_id, request)
+            cached = cache.get(key)
+            if cached is None:
+                response = method(self, request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                etag = quote_etag(_digest(JSONRenderer().render(response.data).decode('utf-8')))
+                cached = (response.data, etag)
+                cache.set(key, cached, settings.RESPONSE_CACHE_TTL)
+
+            data, etag = cached
+            headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+            if etag in parse_etags(request.headers.get('If-None-Match', '')):
+                return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+            return Response(data, headers=headers)
+        return wrapper
+    return decorator
+
+
+def async_cached_response(*resources):
+    """cached_response for the async views, which return rendered JSON HttpResponses."""
+    def decorator(method):
+        @wraps(method)
+        async def wrapper(self, request, *args, **kwargs):
+            user_id = request.GET.get('user_id')
+            if not user_id:
+                return await method(self, request, *args, **kwargs)
+
+            key = await sync_to_async(response_key)(resources, user_id, request)
+            cached = await cache.aget(key)
+            if cached is None:
+                response = await method(self, request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                cached = (response.content, quote_etag(_digest(response.content.decode('utf-8'))))
+                await cache.aset(key, cached, settings.RESPONSE_CACHE_TTL)
+
+            content, etag = cached
+            headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+            if etag in parse_etags(request.headers.get('If-None-Match', '')):
+                return HttpResponseNotModified(headers=headers)
+            return HttpResponse(content, content_type='application/json', headers=headers)
+        return wrapper
+    return decorator
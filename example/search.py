@@ -0,0 +1,114 @@
+# example/search.py
+import math
+import operator
+import re
+from collections import namedtuple
+from functools import reduce
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import F, Q, Value
+from django.db.models.functions import Concat
+
+from .models import Conversation, CVAnalysis, Note
+
+Source = namedtuple('Source', ['model', 'fields', 'filters'])
+Hit = namedtuple('Hit', ['type', 'id', 'rank', 'created_at'])
+
+SOURCES = {
+    'notes': Source(Note, ['content'], {'is_system': False}),
+    'conversations': Source(Conversation, ['content'], {}),
+    'cv': Source(CVAnalysis, ['summary', 'text'], {'status': CVAnalysis.STATUS_COMPLETED}),
+}
+
+SNIPPET_CHARS = 200
+WORD = re.compile(r'\w+')
+
+
+def get_queryset(source, user_id):
+    return source.model.objects.filter(user_id=user_id, **source.filters)
+
+
+def document(source):
+    if len(source.fields) == 1:
+        return F(source.fields[0])
+    parts = []
+    for field in source.fields:
+        parts += [F(field), Value(' ')]
+    return Concat(*parts[:-1])
+
+
+def search(user_id, text, types, limit, offset=0):
+    """
+    Rank the user's notes, conversations and CV analyses against a free-text query.
+    Returns (hits on the requested page, snippets by (type, id), whether there are
+    more hits). PostgreSQL uses the GIN-indexed search vectors, other databases a
+    term-matching fallback.
+    """
+    backend = PostgresSearch(text) if connection.vendor == 'postgresql' else FallbackSearch(text)
+
+    # Every type contributes at most as many hits as could end up on this page
+    hits = []
+    for type_ in types:
+        hits.extend(backend.hits(type_, SOURCES[type_], user_id, offset + limit + 1))
+    hits.sort(key=lambda hit: (hit.rank, hit.created_at), reverse=True)
+
+    page = hits[offset:offset + limit]
+    snippets = {}
+    for type_ in types:
+        ids = [hit.id for hit in page if hit.type == type_]
+        if ids:
+            snippets.update(((type_, pk), snippet) for pk, snippet in backend.snippets(SOURCES[type_], ids))
+    return page, snippets, len(hits) > offset + limit
+
+
+class PostgresSearch:
+    def __init__(self, text):
+        self.query = SearchQuery(text, config=settings.SEARCH_CONFIG, search_type='websearch')
+
+    def hits(self, type_, source, user_id, limit):
+        rows = get_queryset(source, user_id).filter(search_vector=self.query).annotate(
+            rank=SearchRank(F('search_vector'), self.query)
+        ).order_by('-rank', '-created_at').values_list('id', 'rank', 'created_at')[:limit]
+        return [Hit(type_, pk, rank, created_at) for pk, rank, created_at in rows]
+
+    def snippets(self, source, ids):
+        return source.model.objects.filter(id__in=ids).annotate(
+            snippet=SearchHeadline(document(source), self.query, config=settings.SEARCH_CONFIG, max_words=35, min_words=15)
+        ).values_list('id', 'snippet')
+
+
+class FallbackSearch:
+    """Case-insensitive matching of all query words, ranked by term frequency."""
+
+    def __init__(self, text):
+        self.terms = sorted({term.lower() for term in WORD.findall(text)})
+        self.pattern = re.compile('|'.join(re.escape(term) for term in self.terms), re.IGNORECASE) if self.terms else None
+
+    def text(self, instance, source):
+        return ' '.join(getattr(instance, field) or '' for field in source.fields)
+
+    def hits(self, type_, source, user_id, limit):
+        if not self.terms:
+            return []
+        queryset = get_queryset(source, user_id).only('id', 'created_at', *source.fields)
+        for term in self.terms:
+            queryset = queryset.filter(reduce(operator.or_, (Q(**{f'{field}__icontains': term}) for field in source.fields)))
+
+        hits = []
+        for instance in queryset:
+            text = self.text(instance, source)
+            occurrences = len(self.pattern.findall(text))
+            rank = occurrences / (1 + math.log(1 + len(WORD.findall(text))))
+            hits.append(Hit(type_, instance.id, rank, instance.created_at))
+        hits.sort(key=lambda hit: (hit.rank, hit.created_at), reverse=True)
+        return hits[:limit]
+
+    def snippets(self, source, ids):
+        for instance in source.model.objects.filter(id__in=ids).only('id', *source.fields):
+            text = self.text(instance, source)
+            match = self.pattern.search(text)
+            start = max(0, match.start() - SNIPPET_CHARS // 2) if match else 0
+            snippet = text[start:start + SNIPPET_CHARS]
+            yield instance.id, self.pattern.sub(lambda m: f'<b>{m.group(0)}</b>', snippet)
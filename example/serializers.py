@@ -1,13 +1,22 @@
 from rest_framework import serializers
-from .models import Note, Conversation, CVAnalysis, CalendarSubscription, CalendarEvent
+from .models import Note, Conversation, ConversationMessage, WeeklySummary, CVAnalysis, CalendarSubscription, CalendarEvent
+
+class DynamicFieldsModelSerializer(serializers.ModelSerializer):
+    # Accepts fields=[...] to serialize only a subset of Meta.fields
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
 
 class NoteSerializer(serializers.ModelSerializer):
     content = serializers.CharField(trim_whitespace=False)  # This will preserve exact string format
     
     class Meta:
         model = Note
-        fields = ['id', 'content', 'created_at', 'updated_at']
-        read_only_fields = ['created_at', 'updated_at']
+        fields = ['id', 'content', 'is_system', 'created_at', 'updated_at']
+        read_only_fields = ['is_system', 'created_at', 'updated_at']
 
 class ConversationSerializer(serializers.ModelSerializer):
     content = serializers.CharField(trim_whitespace=False)  # Change to CharField to handle plain text
@@ -24,16 +33,50 @@ class ConversationSerializer(serializers.ModelSerializer):
             data['content'] = data['content'].strip('"')
         return super().to_internal_value(data)
 
+class ConversationDetailSerializer(DynamicFieldsModelSerializer):
+    # With the rolling summary of the messages up to summary_position
+    class Meta:
+        model = Conversation
+        fields = ['id', 'content', 'summary', 'summary_position', 'summary_updated_at', 'created_at', 'updated_at']
+
+class ConversationCompactSerializer(ConversationDetailSerializer):
+    # Summary only, without the full transcript
+    class Meta(ConversationDetailSerializer.Meta):
+        fields = ['id', 'summary', 'summary_position', 'summary_updated_at', 'created_at', 'updated_at']
+
+class WeeklySummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = WeeklySummary
+        fields = ['week_start', 'summary', 'updated_at']
+
+class ConversationMessageSerializer(serializers.ModelSerializer):
+    content = serializers.CharField(trim_whitespace=False)
+
+    class Meta:
+        model = ConversationMessage
+        fields = ['id', 'position', 'role', 'content', 'created_at']
+        read_only_fields = ['position', 'created_at']
+
 class CVAnalysisSerializer(serializers.ModelSerializer):
     class Meta:
         model = CVAnalysis
         fields = ['id', 'user_id']
 
-class CVAnalysisDetailSerializer(serializers.ModelSerializer):
+class CVAnalysisDetailSerializer(DynamicFieldsModelSerializer):
     class Meta:
         model = CVAnalysis
         fields = ['id', 'user_id', 'summary', 'text', 'created_at']
 
+class CVAnalysisCompactSerializer(CVAnalysisDetailSerializer):
+    # Without the raw extracted text, which is by far the largest column
+    class Meta(CVAnalysisDetailSerializer.Meta):
+        fields = ['id', 'user_id', 'summary', 'created_at']
+
+class CVAnalysisStatusSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CVAnalysis
+        fields = ['id', 'user_id', 'status', 'progress', 'error', 'created_at', 'updated_at']
+
 class CalendarSubscriptionSerializer(serializers.ModelSerializer):
     class Meta:
         model = CalendarSubscription
@@ -41,13 +84,44 @@ class CalendarSubscriptionSerializer(serializers.ModelSerializer):
 
 class CalendarSyncResponseSerializer(serializers.Serializer):
     status = serializers.CharField()
+    fetched = serializers.BooleanField()
     events_added = serializers.IntegerField()
+    events_updated = serializers.IntegerField()
+    events_skipped = serializers.IntegerField()
 
-class CalendarEventDetailSerializer(serializers.ModelSerializer):
+class CalendarEventDetailSerializer(DynamicFieldsModelSerializer):
     class Meta:
         model = CalendarEvent
         fields = [
             'id', 'event_id', 'summary', 'description', 'start_time', 
             'end_time', 'location', 'organizer', 'attendees', 'notes',
             'status', 'meeting_link', 'created_at'
-        ] 
\ No newline at end of file
+        ]
+
+class CalendarEventCompactSerializer(CalendarEventDetailSerializer):
+    # Without description, notes and attendees (TEXT/JSON columns)
+    class Meta(CalendarEventDetailSerializer.Meta):
+        fields = [
+            'id', 'event_id', 'summary', 'start_time', 'end_time',
+            'location', 'organizer', 'status', 'meeting_link'
+        ]
+ 
+class ContextSerializer(serializers.Serializer):
+    notes = NoteSerializer(many=True)
+    conversations = ConversationSerializer(many=True)
+    cv_analysis = CVAnalysisCompactSerializer(allow_null=True)
+    events = CalendarEventCompactSerializer(many=True)
+
+class SearchResultSerializer(serializers.Serializer):
+    type = serializers.ChoiceField(choices=['notes', 'conversations', 'cv'])
+    id = serializers.IntegerField()
+    rank = serializers.FloatField()
+    snippet = serializers.CharField()
+    created_at = serializers.DateTimeField()
+
+class SemanticSearchResultSerializer(serializers.Serializer):
+    type = serializers.ChoiceField(choices=['notes', 'conversations'])
+    id = serializers.IntegerField()
+    score = serializers.FloatField()
+    content = serializers.CharField()
+    created_at = serializers.DateTimeField()
@@ -0,0 +1,76 @@
+# example/summarize.py
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+# Rough average for English text with OpenAI tokenizers; good enough for budgeting
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text):
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def chunk_text(text, max_tokens):
+    """Split text into chunks of at most max_tokens, preferring line boundaries."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    chunks = []
+    current = []
+    size = 0
+
+    for line in text.splitlines(keepends=True):
+        # A single line longer than the budget is split hard
+        pieces = [line[i:i + max_chars] for i in range(0, len(line), max_chars)] or ['']
+        for piece in pieces:
+            if size + len(piece) > max_chars and current:
+                chunks.append(''.join(current))
+                current, size = [], 0
+            current.append(piece)
+            size += len(piece)
+
+    if current:
+        chunks.append(''.join(current))
+    return [chunk for chunk in chunks if chunk.strip()]
+
+
+def condense(text, summarize, reduce, max_tokens, max_workers):
+    """
+    Summarise chunks of text concurrently (at most max_workers at a time) and return
+    the joined partial summaries, condensing them again with reduce while they are
+    still too long for a single call.
+    """
+    chunks = chunk_text(text, max_tokens)
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+        partials = list(executor.map(summarize, chunks))
+
+    combined = '\n\n'.join(partials)
+    if estimate_tokens(combined) > max_tokens and len(partials) > 1:
+        return condense(combined, reduce, reduce, max_tokens, max_workers)
+    return combined
+
+
+def map_reduce(text, summarize, reduce, max_tokens, max_workers):
+    """
+    Summarise text in one call when it fits in max_tokens, otherwise condense it
+    into partial summaries and reduce those in a final call.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return summarize(text)
+    return reduce(condense(text, summarize, reduce, max_tokens, max_workers))
+
+
+async def amap_reduce(text, summarize, reduce, max_tokens, max_workers):
+    """map_reduce for coroutine summarize/reduce functions, with at most max_workers chunk calls in flight."""
+    if estimate_tokens(text) <= max_tokens:
+        return await summarize(text)
+
+    slots = asyncio.Semaphore(max_workers)
+
+    async def bounded(chunk):
+        async with slots:
+            return await summarize(chunk)
+
+    partials = await asyncio.gather(*(bounded(chunk) for chunk in chunk_text(text, max_tokens)))
+    combined = '\n\n'.join(partials)
+    if estimate_tokens(combined) > max_tokens and len(partials) > 1:
+        return await amap_reduce(combined, reduce, reduce, max_tokens, max_workers)
+    return await reduce(combined)
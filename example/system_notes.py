@@ -0,0 +1,45 @@
+# example/system_notes.py
+import threading
+import time
+
+from django.conf import settings
+
+from . import response_cache
+from .models import Note
+
+_lock = threading.Lock()
+_cached = None  # (version, expires_at, notes)
+
+
+def is_fresh(cached, version):
+    return cached is not None and cached[0] == version and cached[1] > time.monotonic()
+
+
+def get_system_notes():
+    """
+    The shared system notes, loaded once per process and reloaded after a system note
+    changes (invalidate() bumps the all-users notes version in the cache) or at the latest
+    SYSTEM_NOTES_TTL seconds after loading. The TTL bounds staleness when the cache is
+    process-local (LocMemCache) and other workers' version bumps are never seen.
+    """
+    global _cached
+    version = response_cache.get_version(response_cache.NOTES, response_cache.ALL_USERS)
+    cached = _cached
+    if is_fresh(cached, version):
+        return cached[2]
+
+    with _lock:
+        if not is_fresh(_cached, version):
+            notes = list(Note.objects.filter(is_system=True).order_by('-created_at', '-id'))
+            _cached = (version, time.monotonic() + settings.SYSTEM_NOTES_TTL, notes)
+        return _cached[2]
+
+
+def invalidate():
+    # Every user's notes include the system notes, so their cached responses go too
+    response_cache.invalidate(response_cache.NOTES)
+
+
+def merge(notes, system_notes):
+    """Merge the user's notes with the system notes, newest first."""
+    return sorted([*notes, *system_notes], key=lambda note: (note.created_at, note.id), reverse=True)
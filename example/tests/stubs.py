@@ -0,0 +1,65 @@
+import asyncio
+import re
+import threading
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from example import llm
+
+
+def completion(content):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=None)
+
+
+class StubStream:
+    """A streamed completion: one chunk per word, plus a role-only chunk without content."""
+
+    def __init__(self, content):
+        self.deltas = [None, *re.findall(r'\S+\s*', content)]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def __iter__(self):
+        for delta in self.deltas:
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=delta))])
+
+
+class StubClient:
+    """Stands in for openai.OpenAI: records the prompts and answers with a numbered summary."""
+
+    def __init__(self):
+        self.prompts = []
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def answer(self, messages):
+        with self._lock:
+            self.prompts.append(messages[-1]['content'])
+            return f'summary {len(self.prompts)}\nof the text'
+
+    def create(self, model, messages, stream=False, **kwargs):
+        if stream:
+            return StubStream(self.answer(messages))
+        return completion(self.answer(messages))
+
+
+class AsyncStubClient(StubClient):
+    """Stands in for openai.AsyncOpenAI."""
+
+    async def create(self, model, messages, **kwargs):
+        await asyncio.sleep(0)
+        return completion(self.answer(messages))
+
+
+class StubClientTestCase(SimpleTestCase):
+    def setUp(self):
+        # No rate limiting between stubbed calls
+        patcher = mock.patch.object(llm, '_bucket', llm.TokenBucket(rate=1000, capacity=1000))
+        patcher.start()
+        self.addCleanup(patcher.stop)
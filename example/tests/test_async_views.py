@@ -0,0 +1,108 @@
+from datetime import timedelta
+from unittest import mock
+
+import httpx
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from example import calendar_sync, cv_analysis, cv_cache, jobs, llm, system_notes
+from example.models import CalendarEvent, CalendarSubscription, CVAnalysis, Note
+
+from .stubs import AsyncStubClient, StubClientTestCase
+
+
+def feed(start):
+    stamp = start.strftime('%Y%m%dT%H%M%SZ')
+    return (
+        'BEGIN:VCALENDAR\r\nVERSION:2.0\r\n'
+        f'BEGIN:VEVENT\r\nUID:standup\r\nSUMMARY:Standup\r\nDTSTART:{stamp}\r\nDTEND:{stamp}\r\nEND:VEVENT\r\n'
+        'END:VCALENDAR\r\n'
+    ).encode('utf-8')
+
+
+class AsyncViewTests(StubClientTestCase, TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        system_notes._cached = None
+        cv_cache.file_cache.clear()
+        cv_cache.text_cache.clear()
+
+    async def test_context_matches_the_sync_view(self):
+        await Note.objects.acreate(user_id='async', content='note')
+        await CVAnalysis.objects.acreate(user_id='async', summary='Python developer')
+
+        response = await self.async_client.get(reverse('async-context'), {'user_id': 'async', 'notes': 5})
+        self.assertEqual(response.status_code, 200)
+        cache.clear()
+        expected = await self.async_client.get(reverse('context'), {'user_id': 'async', 'notes': 5})
+        self.assertEqual(response.json(), expected.json())
+
+        not_modified = await self.async_client.get(
+            reverse('async-context'), {'user_id': 'async', 'notes': 5}, headers={'if-none-match': response['ETag']}
+        )
+        self.assertEqual(not_modified.status_code, 304)
+        response = await self.async_client.get(reverse('async-context'), {'user_id': 'async', 'notes': 'many'})
+        self.assertEqual(response.status_code, 400)
+
+    async def test_pdf_analysis(self):
+        stub = AsyncStubClient()
+        upload = SimpleUploadedFile('cv.pdf', b'%PDF-1.4 async', content_type='application/pdf')
+        with mock.patch.object(llm, 'get_async_client', return_value=stub), \
+                mock.patch.object(cv_analysis, 'extract_text_from_pdf', return_value='Python developer'):
+            response = await self.async_client.post(reverse('async-analyze-pdf'), {'file': upload, 'user_id': 'async'})
+
+        self.assertEqual(response.status_code, 201)
+        analysis = await CVAnalysis.objects.aget(pk=response.json()['id'])
+        self.assertEqual(analysis.summary, 'summary 1 of the text')
+        self.assertEqual(len(stub.prompts), 1)
+
+    async def test_pdf_analysis_can_be_queued(self):
+        upload = SimpleUploadedFile('cv.pdf', b'%PDF-1.4 queued', content_type='application/pdf')
+        with mock.patch.object(jobs, 'enqueue') as enqueue:
+            response = await self.async_client.post(reverse('async-analyze-pdf'), {'file': upload, 'user_id': 'async', 'async': 'true'})
+        self.assertEqual(response.status_code, 202)
+        enqueue.assert_called_once_with(response.json()['id'])
+
+        response = await self.async_client.post(reverse('async-analyze-pdf'), {'user_id': 'async'})
+        self.assertEqual((response.status_code, response.json()), (400, {'error': 'No file provided'}))
+
+    async def test_calendar_sync(self):
+        requests = []
+
+        def respond(request):
+            requests.append(request)
+            if request.headers.get('if-none-match') == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, headers={'ETag': '"v1"'}, content=feed(timezone.now() + timedelta(days=1)))
+
+        payload = {'user_id': 'async', 'webcal_url': 'webcal://example.com/feed.ics'}
+        async with httpx.AsyncClient(transport=httpx.MockTransport(respond)) as client:
+            with mock.patch.object(calendar_sync, 'get_http_client', return_value=client):
+                first = await self.async_client.post(reverse('async-calendar-sync'), payload, content_type='application/json')
+                second = await self.async_client.post(reverse('async-calendar-sync'), payload, content_type='application/json')
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual((first.json()['fetched'], first.json()['events_added']), (True, 1))
+        self.assertEqual(second.json()['fetched'], False)
+        self.assertEqual(str(requests[0].url), 'https://example.com/feed.ics')
+        self.assertEqual(await CalendarEvent.objects.filter(user_id='async').acount(), 1)
+        self.assertEqual((await CalendarSubscription.objects.aget(user_id='async')).etag, '"v1"')
+
+    async def test_calendar_sync_failures_are_recorded(self):
+        async with httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(500))) as client:
+            with mock.patch.object(calendar_sync, 'get_http_client', return_value=client):
+                response = await self.async_client.post(
+                    reverse('async-calendar-sync'), {'user_id': 'async', 'webcal_url': 'webcal://example.com/feed.ics'},
+                    content_type='application/json'
+                )
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual((await CalendarSubscription.objects.aget(user_id='async')).failure_count, 1)
+
+        response = await self.async_client.post(
+            reverse('async-calendar-sync'), {'user_id': 'async', 'webcal_url': 'https://example.com'}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
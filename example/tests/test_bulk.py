@@ -0,0 +1,57 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from example.models import Conversation, ConversationMessage, Note
+
+
+class BulkWriteTests(TestCase):
+    def send(self, method, name, payload, expected=200):
+        response = getattr(self.client, method)(reverse(name), payload, content_type='application/json')
+        self.assertEqual(response.status_code, expected, response.content)
+        return response.json()
+
+    def test_create_update_and_delete_notes(self):
+        created = self.send('post', 'notes-bulk', {'user_id': 'bulk', 'items': [{'content': 'a'}, {'content': 'b'}]}, 201)
+        ids = [note['id'] for note in created['results']]
+        self.assertEqual(list(Note.objects.filter(user_id='bulk').order_by('id').values_list('content', flat=True)), ['a', 'b'])
+
+        others = Note.objects.create(user_id='someone-else', content='theirs')
+        system = Note.objects.create(user_id='system', content='shared', is_system=True)
+        items = [{'id': ids[0], 'content': 'a2'}, {'id': others.id, 'content': 'x'}, {'id': system.id, 'content': 'x'}]
+        updated = self.send('put', 'notes-bulk', {'user_id': 'bulk', 'items': items})
+        self.assertEqual([result['status'] for result in updated['results']], ['updated', 'not_found', 'not_found'])
+        self.assertEqual(Note.objects.get(pk=ids[0]).content, 'a2')
+        self.assertEqual(Note.objects.get(pk=others.pk).content, 'theirs')
+
+        deleted = self.send('delete', 'notes-bulk', {'user_id': 'bulk', 'ids': [ids[1], others.id]})
+        self.assertEqual([result['status'] for result in deleted['results']], ['deleted', 'not_found'])
+        self.assertEqual(list(Note.objects.filter(user_id='bulk').values_list('id', flat=True)), [ids[0]])
+
+    def test_invalid_items_reject_the_whole_batch(self):
+        body = self.send('post', 'notes-bulk', {'user_id': 'bulk', 'items': [{'content': 'a'}, {}]}, 400)
+        self.assertEqual(body['errors'][0], {})
+        self.assertIn('content', body['errors'][1])
+
+        body = self.send('put', 'notes-bulk', {'user_id': 'bulk', 'items': [{'content': 'a'}]}, 400)
+        self.assertEqual(body['errors'], [{'id': ['A valid integer is required.']}])
+        self.assertFalse(Note.objects.filter(user_id='bulk').exists())
+
+    @override_settings(BULK_MAX_ITEMS=2)
+    def test_batch_limits(self):
+        self.send('post', 'notes-bulk', {'user_id': 'bulk', 'items': [{'content': 'a'}] * 3}, 400)
+        self.send('post', 'notes-bulk', {'user_id': 'bulk', 'items': []}, 400)
+        self.send('delete', 'notes-bulk', {'user_id': 'bulk', 'ids': ['1']}, 400)
+        self.send('post', 'notes-bulk', {'items': [{'content': 'a'}]}, 400)
+
+    def test_conversations_get_their_messages(self):
+        created = self.send('post', 'conversations-bulk', {
+            'user_id': 'bulk', 'items': [{'content': 'user: hi\nassistant: hello'}, {'content': 'user: bye'}]
+        }, 201)
+        first, second = (Conversation.objects.get(pk=result['id']) for result in created['results'])
+        self.assertEqual(ConversationMessage.objects.filter(conversation=first).count(), 2)
+
+        self.send('put', 'conversations-bulk', {'user_id': 'bulk', 'items': [{'id': second.id, 'content': 'user: bye\nuser: again'}]})
+        self.assertEqual(
+            list(ConversationMessage.objects.filter(conversation=second).order_by('position').values_list('content', flat=True)),
+            ['bye', 'again']
+        )
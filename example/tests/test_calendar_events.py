@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from example.models import CalendarEvent
+
+
+def at(day, hour=0):
+    return timezone.make_aware(datetime(2025, 3, day, hour))
+
+
+class OverlappingTests(TestCase):
+    def setUp(self):
+        for event_id, start, end in [
+            ('before', at(1, 9), at(1, 10)),
+            ('running-into', at(9, 22), at(10, 2)),
+            ('inside', at(10, 9), at(10, 10)),
+            ('after', at(11, 9), at(11, 10)),
+            # Started long before CALENDAR_EVENT_MAX_SPAN and still running
+            ('sabbatical', at(1) - timedelta(days=60), at(20)),
+            ('long-finished', at(1) - timedelta(days=60), at(1) - timedelta(days=30)),
+        ]:
+            CalendarEvent.objects.create(user_id='overlap', event_id=event_id, start_time=start, end_time=end)
+
+    def overlapping(self, start, end):
+        return set(CalendarEvent.objects.filter(user_id='overlap').overlapping(start, end).values_list('event_id', flat=True))
+
+    def test_half_open_range(self):
+        self.assertEqual(self.overlapping(at(10), at(11)), {'running-into', 'inside', 'sabbatical'})
+        self.assertEqual(self.overlapping(at(10, 10), at(11, 9)), {'sabbatical'})
+
+    def test_open_ended_ranges(self):
+        self.assertEqual(self.overlapping(at(11), None), {'after', 'sabbatical'})
+        self.assertEqual(self.overlapping(None, at(1, 10)), {'before', 'sabbatical', 'long-finished'})
+
+    def test_date_filter_of_the_calendar_events_endpoint(self):
+        response = self.client.get(
+            reverse('user-calendar-events'), {'user_id': 'overlap', 'start_date': '2025-03-10', 'end_date': '2025-03-10'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([event['event_id'] for event in response.json()], ['sabbatical', 'running-into', 'inside'])
+
+        response = self.client.get(
+            reverse('user-calendar-events'), {'user_id': 'overlap', 'start_date': '2025-03-11', 'end_date': '2025-03-10'}
+        )
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,161 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+
+import requests
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from example.calendar_sync import next_sync_time, record_success, subscribe, upsert_events
+from example.management.commands import sync_calendars
+from example.models import CalendarEvent, CalendarSubscription
+
+
+class UpsertEventsTests(TestCase):
+    def event(self, event_id, summary, hour=10):
+        start = datetime(2025, 1, 10, hour, tzinfo=dt_timezone.utc)
+        return event_id, {
+            'summary': summary, 'description': None, 'start_time': start, 'end_time': start + timedelta(hours=1),
+            'location': None, 'organizer': None, 'attendees': [], 'status': 'confirmed', 'meeting_link': None, 'notes': None,
+        }
+
+    def test_counts_added_updated_and_skipped(self):
+        counts = upsert_events('cal', [self.event('a', 'A'), self.event('b', 'B')], batch_size=1)
+        self.assertEqual(counts, {'events_added': 2, 'events_updated': 0, 'events_skipped': 0})
+
+        counts = upsert_events('cal', [self.event('a', 'A'), self.event('b', 'B changed'), self.event('c', 'C')])
+        self.assertEqual(counts, {'events_added': 1, 'events_updated': 1, 'events_skipped': 1})
+        self.assertEqual(CalendarEvent.objects.get(user_id='cal', event_id='b').summary, 'B changed')
+
+    def test_repeated_uid_in_a_batch_keeps_the_last_occurrence(self):
+        counts = upsert_events('cal', [self.event('a', 'first'), self.event('a', 'second', hour=12)])
+        self.assertEqual(counts['events_added'], 1)
+        self.assertEqual(CalendarEvent.objects.get(user_id='cal', event_id='a').summary, 'second')
+
+
+class SyncScheduleTests(TestCase):
+    def setUp(self):
+        self.subscription = CalendarSubscription.objects.create(user_id='sched', webcal_url='webcal://example.com/old.ics')
+
+    def test_record_success_stores_the_feed_validators(self):
+        self.subscription.etag = '"v1"'
+        self.subscription.content_hash = 'hash'
+        record_success(self.subscription, timezone.now())
+
+        self.subscription.refresh_from_db()
+        self.assertEqual((self.subscription.etag, self.subscription.content_hash), ('"v1"', 'hash'))
+        self.assertGreater(self.subscription.next_sync_at, timezone.now())
+
+    def test_record_success_keeps_a_url_changed_during_the_sync(self):
+        # The background pass loaded the subscription before the user pointed it elsewhere
+        stale = CalendarSubscription.objects.get(pk=self.subscription.pk)
+        subscribe('sched', 'webcal://example.com/new.ics')
+        stale.etag = '"old-feed"'
+        stale.content_hash = 'old-hash'
+        record_success(stale, timezone.now())
+
+        self.subscription.refresh_from_db()
+        self.assertEqual(self.subscription.webcal_url, 'webcal://example.com/new.ics')
+        self.assertEqual((self.subscription.etag, self.subscription.content_hash), ('', ''))
+        self.assertEqual(self.subscription.failure_count, 0)
+
+    @override_settings(CALENDAR_SYNC_JITTER=0)
+    def test_failures_back_off_up_to_the_cap(self):
+        now = timezone.now()
+        self.assertEqual(next_sync_time(now, 1) - now, settings.CALENDAR_SYNC_INTERVAL * 2)
+        self.assertEqual(next_sync_time(now, 30) - now, settings.CALENDAR_SYNC_MAX_BACKOFF)
+
+    def test_failed_sync_is_recorded_and_not_due_until_later(self):
+        CalendarSubscription.objects.create(
+            user_id='later', webcal_url='webcal://example.com/later.ics', next_sync_at=timezone.now() + timedelta(hours=1)
+        )
+        self.assertEqual(sync_calendars.due_subscriptions(timezone.now()), [self.subscription])
+
+        with mock.patch('example.management.commands.sync_calendars.sync_calendar_events', side_effect=ValueError('feed is down')):
+            self.assertFalse(sync_calendars.Command().sync_one(sync_calendars.HostLimiter(1, 0), self.subscription))
+
+        self.subscription.refresh_from_db()
+        self.assertEqual((self.subscription.failure_count, self.subscription.last_error), (1, 'feed is down'))
+        self.assertEqual(sync_calendars.due_subscriptions(timezone.now()), [])
+
+
+def build_feed(start):
+    stamp = start.strftime('%Y%m%dT%H%M%SZ')
+    return (
+        'BEGIN:VCALENDAR\r\nVERSION:2.0\r\nBEGIN:VEVENT\r\nUID:standup@example.com\r\nSUMMARY:Standup\r\n'
+        f'DTSTART:{stamp}\r\nDTEND:{stamp}\r\nEND:VEVENT\r\nEND:VCALENDAR\r\n'
+    ).encode('utf-8')
+
+
+class FeedResponse:
+    """Stands in for a streamed requests.Response."""
+
+    def __init__(self, status_code, body=b'', headers=None):
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers or {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        pass
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f'{self.status_code} Server Error')
+
+    def iter_content(self, chunk_size):
+        return (self.body[i:i + chunk_size] for i in range(0, len(self.body), chunk_size))
+
+
+class CalendarSyncViewTests(TestCase):
+    def setUp(self):
+        self.feed = build_feed(timezone.now().replace(microsecond=0) + timedelta(hours=1))
+        self.requests = []
+        self.responses = []
+        patcher = mock.patch('requests.get', side_effect=self.get)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get(self, url, headers, **kwargs):
+        self.requests.append((url, headers))
+        return self.responses.pop(0)
+
+    def sync(self, url='webcal://example.com/feed.ics'):
+        return self.client.post(reverse('calendar-sync'), {'user_id': 'sync', 'webcal_url': url}, content_type='application/json')
+
+    def test_unchanged_feed_is_not_downloaded_again(self):
+        self.responses.append(FeedResponse(200, self.feed, {'ETag': '"v1"'}))
+        response = self.sync()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.json()['fetched'], response.json()['events_added']), (True, 1))
+        self.assertEqual(self.requests[0], ('https://example.com/feed.ics', {}))
+
+        self.responses.append(FeedResponse(304))
+        response = self.sync()
+        self.assertEqual(response.json()['fetched'], False)
+        self.assertEqual(self.requests[1][1], {'If-None-Match': '"v1"'})
+
+    def test_identical_body_skips_the_upsert(self):
+        self.responses += [FeedResponse(200, self.feed), FeedResponse(200, self.feed)]
+        self.sync()
+        with mock.patch('example.calendar_sync.upsert_events') as upsert:
+            response = self.sync()
+        upsert.assert_not_called()
+        self.assertEqual((response.json()['fetched'], response.json()['events_added']), (True, 0))
+
+    def test_new_url_is_saved_without_old_validators_even_when_its_sync_fails(self):
+        self.responses += [FeedResponse(200, self.feed, {'ETag': '"v1"'}), FeedResponse(500)]
+        self.sync()
+        response = self.sync('webcal://example.com/other.ics')
+
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(self.requests[1], ('https://example.com/other.ics', {}))
+        subscription = CalendarSubscription.objects.get(user_id='sync')
+        self.assertEqual((subscription.webcal_url, subscription.etag), ('webcal://example.com/other.ics', ''))
+        self.assertEqual(subscription.failure_count, 1)
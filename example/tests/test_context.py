@@ -0,0 +1,56 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from example import system_notes
+from example.models import CalendarEvent, Conversation, CVAnalysis, Note
+
+
+class ContextTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        system_notes._cached = None
+        now = timezone.now()
+        Note.objects.create(user_id='system', content='Be kind', is_system=True)
+        for i in range(3):
+            Note.objects.create(user_id='context', content=f'note {i}')
+            Conversation.objects.create(user_id='context', content=f'user: hello {i}')
+        CVAnalysis.objects.create(user_id='context', summary='Python developer', text='extracted')
+        for event_id, start in [('yesterday', now - timedelta(hours=20)), ('tomorrow', now + timedelta(days=1)),
+                                ('last-month', now - timedelta(days=30)), ('next-month', now + timedelta(days=30))]:
+            CalendarEvent.objects.create(user_id='context', event_id=event_id, start_time=start, end_time=start + timedelta(hours=1))
+
+    def context(self, **params):
+        response = self.client.get(reverse('context'), {'user_id': 'context', **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_sections_are_bounded(self):
+        # Notes, system notes, conversations, the CV summary and events: one query each
+        with self.assertNumQueries(5):
+            context = self.context(notes=2, conversations=1)
+
+        self.assertEqual([note['content'] for note in context['notes']], ['note 2', 'note 1', 'Be kind'])
+        self.assertEqual([conversation['content'] for conversation in context['conversations']], ['user: hello 2'])
+        self.assertEqual(context['cv_analysis']['summary'], 'Python developer')
+        self.assertNotIn('text', context['cv_analysis'])
+        self.assertEqual([event['event_id'] for event in context['events']], ['yesterday', 'tomorrow'])
+
+    def test_limits_are_validated_and_clamped(self):
+        self.assertEqual(self.client.get(reverse('context'), {'user_id': 'context', 'notes': 'many'}).status_code, 400)
+        self.assertEqual(self.context(events=-1)['events'], [])
+
+    def test_empty_context(self):
+        context = self.client.get(reverse('context'), {'user_id': 'nobody'}).json()
+        self.assertEqual(
+            (context['conversations'], context['cv_analysis'], context['events']), ([], None, [])
+        )
+        self.assertEqual([note['content'] for note in context['notes']], ['Be kind'])
+
+    def test_writes_to_any_section_refresh_the_context(self):
+        self.context()
+        self.client.post(reverse('notes'), {'user_id': 'context', 'content': 'note 3'}, content_type='application/json')
+        self.assertEqual(self.context()['notes'][0]['content'], 'note 3')
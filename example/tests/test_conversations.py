@@ -0,0 +1,119 @@
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from example import compaction
+from example.conversations import diff_messages, replace_messages, split_transcript
+from example.models import Conversation, ConversationMessage, WeeklySummary
+
+from .stubs import StubClient, StubClientTestCase
+
+
+class DiffMessagesTests(SimpleTestCase):
+    def old(self, *contents):
+        return [(i + 100, 'user', content) for i, content in enumerate(contents)]
+
+    def new(self, *contents):
+        return [('user', content) for content in contents]
+
+    def test_identical_transcripts_change_nothing(self):
+        self.assertEqual(diff_messages(self.old('a', 'b'), self.new('a', 'b')), ([], {}, [], None))
+
+    def test_insert_shifts_the_following_messages(self):
+        delete, shifts, create, first_change = diff_messages(self.old('a', 'b'), self.new('x', 'a', 'b'))
+        self.assertEqual((delete, dict(shifts), create, first_change), ([], {1: [100, 101]}, [(0, 'user', 'x')], 0))
+
+    def test_delete_and_edit(self):
+        delete, shifts, create, first_change = diff_messages(self.old('a', 'b', 'c'), self.new('a', 'c2'))
+        self.assertEqual((delete, dict(shifts), create, first_change), ([101, 102], {}, [(1, 'user', 'c2')], 1))
+
+
+class ReplaceMessagesTests(TestCase):
+    def create(self, content):
+        conversation = Conversation.objects.create(user_id='diff', content=content)
+        replace_messages([conversation])
+        return conversation
+
+    def put(self, conversation, content):
+        response = self.client.put(
+            reverse('conversation-detail', args=[conversation.pk]),
+            {'user_id': 'diff', 'content': content}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def stored(self, conversation):
+        return list(ConversationMessage.objects.filter(conversation=conversation).order_by('position').values_list('id', 'role', 'content'))
+
+    def assertMessagesMatch(self, conversation, content):
+        messages = self.stored(conversation)
+        self.assertEqual([message[1:] for message in messages], split_transcript(content))
+        self.assertEqual(
+            list(ConversationMessage.objects.filter(conversation=conversation).order_by('position').values_list('position', flat=True)),
+            list(range(len(messages)))
+        )
+
+    def test_put_inserting_between_kept_messages(self):
+        conversation = self.create('user: a\nuser: b')
+        ids = {content: pk for pk, _, content in self.stored(conversation)}
+
+        content = 'user: x1\nuser: x2\nuser: x3\nuser: a\nuser: y\nuser: b'
+        self.put(conversation, content)
+
+        self.assertMessagesMatch(conversation, content)
+        kept = {content: pk for pk, _, content in self.stored(conversation) if content in ids}
+        self.assertEqual(kept, ids)
+
+    def test_put_deleting_and_reordering(self):
+        conversation = self.create('user: a\nassistant: b\nuser: c\nassistant: d\nuser: e')
+        for content in ['user: a\nuser: c\nuser: e', 'user: e\nuser: a\nuser: c\nassistant: new', 'user: c']:
+            self.put(conversation, content)
+            self.assertMessagesMatch(conversation, content)
+
+    def test_summary_is_reset_only_when_a_change_precedes_its_checkpoint(self):
+        conversation = self.create('user: a\nuser: b\nuser: c')
+        Conversation.objects.filter(pk=conversation.pk).update(summary='a and b', summary_position=1)
+
+        self.put(conversation, 'user: a\nuser: b\nuser: c2\nuser: d')
+        conversation.refresh_from_db()
+        self.assertEqual((conversation.summary, conversation.summary_position), ('a and b', 1))
+
+        self.put(conversation, 'user: a2\nuser: b\nuser: c2\nuser: d')
+        conversation.refresh_from_db()
+        self.assertEqual((conversation.summary, conversation.summary_position), ('', None))
+
+
+class CompactionTests(StubClientTestCase, TestCase):
+    def test_compact_conversation_folds_only_new_messages(self):
+        conversation = Conversation.objects.create(user_id='compact', content='user: a\nassistant: b')
+        replace_messages([conversation])
+        client = StubClient()
+
+        self.assertTrue(compaction.compact_conversation(conversation.pk, client))
+        self.assertFalse(compaction.compact_conversation(conversation.pk, client))
+        conversation.refresh_from_db()
+        self.assertEqual((conversation.summary, conversation.summary_position), ('summary 1\nof the text', 1))
+
+        conversation.content += '\nuser: c'
+        conversation.save()
+        replace_messages([conversation])
+        self.assertFalse(compaction.compact_conversation(conversation.pk, client, min_messages=2))
+        self.assertTrue(compaction.compact_conversation(conversation.pk, client))
+        self.assertIn('New messages since that summary:\nuser: c\n\n', client.prompts[-1])
+
+    def test_compact_week_does_not_refold_resent_messages(self):
+        conversation = Conversation.objects.create(user_id='compact', content='user: a\nassistant: b')
+        replace_messages([conversation])
+        client = StubClient()
+        start = compaction.week_start(timezone.localdate())
+
+        self.assertTrue(compaction.compact_week('compact', start, client))
+        # Re-sending the same transcript plus one message only adds that message to the week
+        conversation.content += '\nuser: c'
+        conversation.save()
+        replace_messages([conversation])
+        self.assertTrue(compaction.compact_week('compact', start, client))
+        self.assertFalse(compaction.compact_week('compact', start, client))
+
+        self.assertEqual(len(client.prompts), 2)
+        self.assertIn('New messages since that summary:\nuser: c\n\n', client.prompts[-1])
+        self.assertEqual(WeeklySummary.objects.get(user_id='compact').summary, 'summary 2\nof the text')
@@ -0,0 +1,80 @@
+import asyncio
+
+from django.test import SimpleTestCase, override_settings
+
+from example import cv_analysis
+from example.summarize import amap_reduce, chunk_text, estimate_tokens, map_reduce
+
+from .stubs import AsyncStubClient, StubClient, StubClientTestCase
+
+
+class SummarizeTests(SimpleTestCase):
+    def test_chunk_text_respects_the_budget(self):
+        text = ''.join(f'line {i}\n' for i in range(200)) + 'x' * 100
+        chunks = chunk_text(text, max_tokens=10)
+        self.assertTrue(all(len(chunk) <= 40 for chunk in chunks))
+        self.assertEqual(''.join(chunks), text)
+
+    def test_map_reduce_single_call_when_text_fits(self):
+        calls = []
+        summary = map_reduce(
+            'short text', summarize=lambda text: calls.append(text) or 'summary',
+            reduce=lambda text: self.fail('reduce called'), max_tokens=100, max_workers=2
+        )
+        self.assertEqual(summary, 'summary')
+        self.assertEqual(calls, ['short text'])
+
+    def test_map_reduce_summarizes_chunks_then_reduces(self):
+        text = ''.join(f'line {i}\n' for i in range(100))
+        reduced = []
+        summary = map_reduce(
+            text, summarize=lambda chunk: 'part', reduce=lambda partials: reduced.append(partials) or 'final',
+            max_tokens=50, max_workers=4
+        )
+        self.assertEqual(summary, 'final')
+        self.assertEqual(reduced, ['\n\n'.join(['part'] * len(chunk_text(text, 50)))])
+
+    def test_amap_reduce_caps_concurrency(self):
+        text = ''.join(f'line {i}\n' for i in range(100))
+        running = peak = 0
+
+        async def summarize(chunk):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return 'part'
+
+        async def reduce(partials):
+            return 'final'
+
+        self.assertEqual(asyncio.run(amap_reduce(text, summarize, reduce, max_tokens=20, max_workers=3)), 'final')
+        self.assertEqual(peak, 3)
+
+
+@override_settings(CV_SUMMARY_CHUNK_TOKENS=50, CV_SUMMARY_MAX_CONCURRENCY=2)
+class CVAnalysisTests(StubClientTestCase):
+    long_text = ''.join(f'Worked on project {i} from 2010 to 2012.\n' for i in range(40))
+
+    def test_short_cv_is_summarized_in_one_call(self):
+        client = StubClient()
+        summary = cv_analysis.analyze_text_with_openai(client, 'Python developer')
+        self.assertEqual(summary, 'summary 1 of the text')
+        self.assertEqual(client.prompts, [cv_analysis.USER_PROMPT.format(text='Python developer')])
+
+    def test_long_cv_is_summarized_in_chunks_and_merged(self):
+        client = StubClient()
+        summary = cv_analysis.analyze_text_with_openai(client, self.long_text)
+        *chunk_prompts, reduce_prompt = client.prompts
+        self.assertGreater(estimate_tokens(self.long_text), 50)
+        self.assertEqual(len(chunk_prompts), len(chunk_text(self.long_text, 50)))
+        self.assertTrue(all(prompt.startswith(cv_analysis.CHUNK_PROMPT.split('{text}')[0]) for prompt in chunk_prompts))
+        self.assertTrue(reduce_prompt.startswith(cv_analysis.REDUCE_PROMPT.split('{text}')[0]))
+        self.assertEqual(summary, f'summary {len(client.prompts)} of the text')
+
+    def test_async_analysis_matches_sync(self):
+        sync_client, async_client = StubClient(), AsyncStubClient()
+        cv_analysis.analyze_text_with_openai(sync_client, self.long_text)
+        asyncio.run(cv_analysis.aanalyze_text_with_openai(async_client, self.long_text))
+        self.assertEqual(sorted(async_client.prompts), sorted(sync_client.prompts))
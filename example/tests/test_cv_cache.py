@@ -0,0 +1,72 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+
+from example import cv_analysis, cv_cache
+from example.cv_cache import LRUCache
+
+from .stubs import StubClient, StubClientTestCase
+
+
+class LRUCacheTests(SimpleTestCase):
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = LRUCache(max_size=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        self.assertEqual(cache.get_or_load('a', lambda: None), 1)
+        cache.set('c', 3)
+
+        self.assertIsNone(cache.get_or_load('b', lambda: None))
+        self.assertEqual(cache.get_or_load('c', lambda: None), 3)
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_expired_entries_are_loaded_again(self):
+        cache = LRUCache(max_size=2, ttl=60)
+        with mock.patch('example.cv_cache.time.monotonic', return_value=0):
+            cache.set('a', 1)
+        with mock.patch('example.cv_cache.time.monotonic', return_value=61):
+            self.assertEqual(cache.get_or_load('a', lambda: 'loaded'), 'loaded')
+        self.assertEqual({key: cache.stats()[key] for key in ('hits', 'loads', 'misses')}, {'hits': 0, 'loads': 1, 'misses': 0})
+
+
+class CVCacheTests(StubClientTestCase, TestCase):
+    def setUp(self):
+        super().setUp()
+        cv_cache.file_cache.clear()
+        cv_cache.text_cache.clear()
+
+    def analyze(self, data, client, text='Python developer'):
+        with mock.patch.object(cv_analysis, 'extract_text_from_pdf', return_value=text) as extract:
+            result = cv_analysis.analyze_pdf(data, client)
+        return result, extract.called
+
+    def test_identical_upload_skips_extraction_and_the_llm(self):
+        client = StubClient()
+        result, _ = self.analyze(b'%PDF cv', client)
+        cv_analysis.save_analysis('cache', result)
+
+        cached, extracted = self.analyze(b'%PDF cv', client)
+        self.assertFalse(extracted)
+        self.assertEqual(cached, result)
+        self.assertEqual(len(client.prompts), 1)
+
+    def test_same_text_in_a_different_file_reuses_the_summary(self):
+        client = StubClient()
+        result, _ = self.analyze(b'%PDF cv', client, text='Python   developer')
+        cv_analysis.save_analysis('cache', result)
+
+        other, extracted = self.analyze(b'%PDF re-exported cv', client, text='Python developer\n')
+        self.assertTrue(extracted)
+        self.assertEqual(other['summary'], result['summary'])
+        self.assertEqual(len(client.prompts), 1)
+
+    def test_results_are_found_in_the_database_after_a_restart(self):
+        client = StubClient()
+        result, _ = self.analyze(b'%PDF cv', client)
+        cv_analysis.save_analysis('cache', result)
+        cv_cache.file_cache.clear()
+        loads = cv_cache.stats()['file']['loads']
+
+        _, extracted = self.analyze(b'%PDF cv', client)
+        self.assertFalse(extracted)
+        self.assertEqual(cv_cache.stats()['file']['loads'], loads + 1)
@@ -0,0 +1,66 @@
+import io
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from example import embeddings
+from example.models import Conversation, Embedding, Note
+
+
+class EmbeddingTextTests(SimpleTestCase):
+    def test_note_keeps_its_start(self):
+        self.assertEqual(embeddings.embedding_text(Note(content='abcdefgh'), 4), 'abcd')
+
+    def test_conversation_keeps_summary_and_recent_messages(self):
+        conversation = Conversation(content='user: old\nuser: recent', summary='about old')
+        self.assertEqual(embeddings.embedding_text(conversation, 22), 'about old\nuser: recent')
+        self.assertEqual(embeddings.embedding_text(Conversation(content='0123456789'), 4), '6789')
+
+
+class EmbeddingTests(TestCase):
+    def setUp(self):
+        self.giraffes = Note.objects.create(user_id='vectors', content='Feeding the giraffes at the zoo')
+        self.taxes = Note.objects.create(user_id='vectors', content='Quarterly tax return paperwork')
+        self.conversation = Conversation.objects.create(user_id='vectors', content='user: my giraffes love leaves')
+
+    def test_unchanged_content_is_not_embedded_again(self):
+        self.assertEqual(embeddings.embed_objects('notes', [self.giraffes.id, self.taxes.id]), 2)
+        self.assertEqual(embeddings.embed_objects('notes', [self.giraffes.id, self.taxes.id]), 0)
+
+        Note.objects.filter(pk=self.taxes.pk).update(content='Annual tax return')
+        self.assertEqual(embeddings.embed_objects('notes', [self.giraffes.id, self.taxes.id]), 1)
+
+    def test_search_ranks_by_similarity_and_sees_new_vectors(self):
+        embeddings.embed_objects('notes', [self.giraffes.id, self.taxes.id])
+        results = embeddings.search('vectors', 'giraffes', k=2)
+        self.assertEqual([(obj, kind) for obj, kind, _ in results][0], (self.giraffes, 'notes'))
+
+        # The in-memory index is reloaded once the user's vectors change in the database
+        embeddings.embed_objects('conversations', [self.conversation.id])
+        results = embeddings.search('vectors', 'giraffes', k=3, kinds={'conversations'})
+        self.assertEqual([obj for obj, _, _ in results], [self.conversation])
+
+        self.giraffes.delete()
+        self.assertNotIn(self.giraffes.id, [obj.id for obj, kind, _ in embeddings.search('vectors', 'giraffes', k=3) if kind == 'notes'])
+
+    def test_context_search_endpoint(self):
+        embeddings.embed_objects('notes', [self.giraffes.id, self.taxes.id])
+        response = self.client.get(reverse('context-search'), {'user_id': 'vectors', 'q': 'tax', 'k': 1, 'types': 'notes'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([result['id'] for result in response.json()['results']], [self.taxes.id])
+
+        response = self.client.get(reverse('context-search'), {'user_id': 'vectors', 'q': 'tax', 'types': 'events'})
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(EMBEDDING_BATCH_SIZE=1)
+    def test_embed_content_backfills_every_source(self):
+        stdout = io.StringIO()
+        call_command('embed_content', user='vectors', batch=1, stdout=stdout)
+
+        self.assertEqual(stdout.getvalue().splitlines(), ['notes: embedded 2 of 2', 'conversations: embedded 1 of 1'])
+        self.assertEqual(Embedding.objects.filter(user_id='vectors').count(), 3)
+
+        stdout = io.StringIO()
+        call_command('embed_content', user='vectors', stdout=stdout)
+        self.assertEqual(stdout.getvalue().splitlines(), ['notes: embedded 0 of 2', 'conversations: embedded 0 of 1'])
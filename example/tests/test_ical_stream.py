@@ -0,0 +1,67 @@
+import hashlib
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+
+from example.calendar_sync import store_feed
+from example.ical_stream import FeedReader, iter_lines
+from example.models import CalendarEvent, CalendarSubscription
+
+
+FEED = (
+    b'BEGIN:VCALENDAR\r\nVERSION:2.0\r\n'
+    b'BEGIN:VTIMEZONE\r\nTZID:Europe/Warsaw\r\nBEGIN:STANDARD\r\nDTSTART:19701025T030000\r\n'
+    b'TZOFFSETFROM:+0200\r\nTZOFFSETTO:+0100\r\nEND:STANDARD\r\nEND:VTIMEZONE\r\n'
+    b'BEGIN:VEVENT\r\nUID:in-window\r\nSUMMARY:A long summary that is\r\n  folded\r\n'
+    b'DTSTART;TZID=Europe/Warsaw:20250110T100000\r\nDTEND;TZID=Europe/Warsaw:20250110T110000\r\nEND:VEVENT\r\n'
+    b'BEGIN:VEVENT\r\nUID:too-old\r\nSUMMARY:Old\r\nDTSTART:20240101T100000Z\r\nDTEND:20240101T110000Z\r\nEND:VEVENT\r\n'
+    b'END:VCALENDAR\r\n'
+)
+
+
+def chunks_of(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class ICalStreamTests(SimpleTestCase):
+    def test_iter_lines_unfolds_across_chunk_boundaries(self):
+        lines = list(iter_lines(chunks_of(FEED, 7)))
+        self.assertIn(b'SUMMARY:A long summary that is folded', lines)
+        self.assertEqual(lines, list(iter_lines([FEED])))
+
+    def test_feed_reader_keeps_events_in_window(self):
+        feed = FeedReader(iter(chunks_of(FEED, 16)))
+        start = datetime(2025, 1, 5, tzinfo=dt_timezone.utc)
+        events = list(feed.events(start, start + timedelta(days=10)))
+
+        self.assertEqual([str(event.get('uid')) for event in events], ['in-window'])
+        self.assertEqual(str(events[0].get('summary')), 'A long summary that is folded')
+        # The VTIMEZONE seen earlier in the feed is used to resolve TZID
+        self.assertEqual(events[0].get('dtstart').dt.utcoffset(), timedelta(hours=1))
+        self.assertEqual(feed.hexdigest, hashlib.sha256(FEED).hexdigest())
+
+
+class StoreFeedTests(TestCase):
+    now = datetime(2025, 1, 10, tzinfo=dt_timezone.utc)
+
+    def setUp(self):
+        self.subscription = CalendarSubscription.objects.create(
+            user_id='feed', webcal_url='webcal://example.com/feed.ics',
+            content_hash=hashlib.sha256(FEED).hexdigest(), synced_until=self.now + timedelta(days=1)
+        )
+
+    def test_unchanged_body_is_not_parsed(self):
+        with mock.patch.object(FeedReader, 'parse') as parse:
+            result = store_feed(self.subscription, chunks_of(FEED, 64), self.now, window_covered=True)
+        parse.assert_not_called()
+        self.assertEqual(result['events_added'], 0)
+        self.assertFalse(CalendarEvent.objects.filter(user_id='feed').exists())
+
+    def test_changed_body_is_parsed_and_stored(self):
+        self.subscription.content_hash = ''
+        result = store_feed(self.subscription, chunks_of(FEED, 64), self.now, window_covered=True)
+        self.assertEqual(result['events_added'], 1)
+        self.assertEqual(list(CalendarEvent.objects.filter(user_id='feed').values_list('event_id', flat=True)), ['in-window'])
+        self.subscription.refresh_from_db()
+        self.assertEqual(self.subscription.content_hash, hashlib.sha256(FEED).hexdigest())
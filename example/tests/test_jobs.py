@@ -0,0 +1,75 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from example import cv_analysis, cv_cache, jobs
+from example.models import CVAnalysis
+
+from .stubs import StubClient, StubClientTestCase
+
+
+class JobTests(StubClientTestCase, TestCase):
+    def setUp(self):
+        super().setUp()
+        cv_cache.file_cache.clear()
+        cv_cache.text_cache.clear()
+
+    def job(self, status=CVAnalysis.STATUS_PENDING, age=timedelta(0)):
+        analysis = CVAnalysis.objects.create(user_id='jobs', status=status, progress=0, source=b'%PDF-1.4 jobs')
+        # update() leaves auto_now alone, so the row can be made to look abandoned
+        CVAnalysis.objects.filter(pk=analysis.pk).update(updated_at=timezone.now() - age)
+        return analysis
+
+    def test_a_job_is_claimed_only_once(self):
+        analysis = self.job()
+        claimed = jobs.claim(analysis.id)
+        self.assertEqual((claimed.status, claimed.progress), (CVAnalysis.STATUS_PROCESSING, 10))
+        self.assertIsNone(jobs.claim(analysis.id))
+
+    def test_stale_processing_jobs_are_reclaimed(self):
+        fresh = self.job(CVAnalysis.STATUS_PROCESSING)
+        stale = self.job(CVAnalysis.STATUS_PROCESSING, age=settings.CV_ANALYSIS_STALE_AFTER + timedelta(minutes=1))
+        self.assertIsNone(jobs.claim(fresh.id))
+        self.assertIsNotNone(jobs.claim(stale.id))
+
+    def test_pending_job_ids_skip_running_and_finished_jobs(self):
+        first, second = self.job(), self.job()
+        stale = self.job(CVAnalysis.STATUS_PROCESSING, age=settings.CV_ANALYSIS_STALE_AFTER * 2)
+        self.job(CVAnalysis.STATUS_PROCESSING)
+        self.job(CVAnalysis.STATUS_COMPLETED)
+        self.assertEqual(set(jobs.pending_job_ids()), {first.id, second.id, stale.id})
+        self.assertEqual(len(jobs.pending_job_ids(limit=2)), 2)
+
+    def test_async_upload_is_queued_and_polled_until_completed(self):
+        upload = SimpleUploadedFile('cv.pdf', b'%PDF-1.4 queued', content_type='application/pdf')
+        with mock.patch.object(jobs, 'enqueue') as enqueue:
+            response = self.client.post(reverse('analyze-pdf'), {'file': upload, 'user_id': 'jobs', 'async': 'true'})
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()['id']
+        enqueue.assert_called_once_with(job_id)
+
+        status_url = response.json()['status_url']
+        self.assertEqual(self.client.get(status_url, {'user_id': 'jobs'}).json()['status'], CVAnalysis.STATUS_PENDING)
+        self.assertEqual(self.client.get(status_url, {'user_id': 'someone-else'}).status_code, 404)
+
+        # What process_job does on a worker thread
+        with mock.patch.object(cv_analysis, 'extract_text_from_pdf', return_value='Python developer'):
+            cv_analysis.run_analysis(jobs.claim(job_id), StubClient())
+
+        body = self.client.get(status_url, {'user_id': 'jobs'}).json()
+        self.assertEqual((body['status'], body['progress']), (CVAnalysis.STATUS_COMPLETED, 100))
+        self.assertIsNone(CVAnalysis.objects.get(pk=job_id).source)
+
+    def test_failed_analysis_is_recorded_on_the_job(self):
+        analysis = jobs.claim(self.job().id)
+        with self.assertRaises(cv_analysis.EmptyPDFError), \
+                mock.patch.object(cv_analysis, 'extract_text_from_pdf', return_value=' '):
+            cv_analysis.run_analysis(analysis, StubClient())
+
+        analysis.refresh_from_db()
+        self.assertEqual((analysis.status, analysis.error, analysis.source), (CVAnalysis.STATUS_FAILED, 'Could not extract text from PDF', None))
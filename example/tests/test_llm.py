@@ -0,0 +1,71 @@
+import httpx
+import openai
+from django.test import SimpleTestCase, override_settings
+
+from example import llm
+
+from .stubs import StubClientTestCase, completion
+
+
+def rate_limit_error(retry_after=None):
+    headers = {'retry-after': retry_after} if retry_after is not None else {}
+    request = httpx.Request('POST', 'https://api.openai.com/v1/chat/completions')
+    return openai.RateLimitError('Rate limit reached', response=httpx.Response(429, headers=headers, request=request), body=None)
+
+
+class TokenBucketTests(SimpleTestCase):
+    def test_allows_a_burst_then_asks_to_wait(self):
+        bucket = llm.TokenBucket(rate=1, capacity=2)
+        self.assertEqual(bucket._take(), 0)
+        self.assertEqual(bucket._take(), 0)
+        self.assertGreater(bucket._take(), 0)
+
+
+@override_settings(LLM_BACKOFF_BASE=0, LLM_MAX_RETRIES=2)
+class CallTests(StubClientTestCase):
+    def test_transient_errors_are_retried(self):
+        outcomes = [rate_limit_error('0'), rate_limit_error(), completion('done')]
+
+        def create(**kwargs):
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        retries = llm.metrics.snapshot()['retries']
+        response = llm.call(create, model='gpt-4', messages=[])
+        self.assertEqual(response.choices[0].message.content, 'done')
+        self.assertEqual(llm.metrics.snapshot()['retries'], retries + 2)
+
+    def test_gives_up_after_max_retries(self):
+        calls = []
+
+        def create(**kwargs):
+            calls.append(kwargs)
+            raise rate_limit_error('0')
+
+        with self.assertRaises(openai.RateLimitError):
+            llm.call(create, model='gpt-4', messages=[])
+        self.assertEqual(len(calls), 3)
+
+    def test_other_errors_are_not_retried(self):
+        calls = []
+
+        def create(**kwargs):
+            calls.append(kwargs)
+            raise ValueError('bad request')
+
+        with self.assertRaises(ValueError):
+            llm.call(create, model='gpt-4', messages=[])
+        self.assertEqual(len(calls), 1)
+
+
+class BackoffTests(SimpleTestCase):
+    @override_settings(LLM_BACKOFF_MAX=30)
+    def test_retry_after_is_honoured_up_to_the_cap(self):
+        self.assertEqual(llm.backoff_delay(0, rate_limit_error('2')), 2)
+        self.assertEqual(llm.backoff_delay(0, rate_limit_error('3600')), 30)
+
+    @override_settings(LLM_BACKOFF_BASE=1, LLM_BACKOFF_MAX=4)
+    def test_exponential_backoff_is_capped(self):
+        self.assertTrue(all(0 <= llm.backoff_delay(attempt) <= 4 for attempt in range(10)))
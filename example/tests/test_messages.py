@@ -0,0 +1,76 @@
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from example.conversations import replace_messages, split_transcript
+from example.models import Conversation, ConversationMessage
+
+
+class SplitTranscriptTests(SimpleTestCase):
+    def test_role_lines_and_continuations(self):
+        self.assertEqual(
+            split_transcript('preamble\nUser: hi\nthere\nassistant:hello'),
+            [('', 'preamble'), ('user', 'hi\nthere'), ('assistant', 'hello')]
+        )
+
+    def test_json_transcripts(self):
+        self.assertEqual(
+            split_transcript('[{"role": "User", "content": "hi"}, {"role": "assistant", "text": "hello"}]'),
+            [('user', 'hi'), ('assistant', 'hello')]
+        )
+        self.assertEqual(split_transcript('[1, 2]'), [('', '[1, 2]')])
+
+
+class ConversationMessagesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.conversation = Conversation.objects.create(
+            user_id='messages', content='\n'.join(f'user: message {i}' for i in range(5))
+        )
+        replace_messages([self.conversation])
+        self.url = reverse('conversation-messages', args=[self.conversation.pk])
+
+    def test_append_extends_messages_and_transcript(self):
+        response = self.client.post(self.url, {'user_id': 'messages', 'role': 'assistant', 'content': 'reply'}, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()[0]['position'], 5)
+
+        response = self.client.post(self.url, {'user_id': 'messages', 'messages': [
+            {'role': 'user', 'content': 'one'}, {'role': 'user', 'content': 'two'}
+        ]}, content_type='application/json')
+        self.assertEqual([message['position'] for message in response.json()], [6, 7])
+
+        self.conversation.refresh_from_db()
+        self.assertTrue(self.conversation.content.endswith('user: message 4\nassistant: reply\nuser: one\nuser: two'))
+        self.assertEqual(split_transcript(self.conversation.content), list(
+            ConversationMessage.objects.filter(conversation=self.conversation).order_by('position').values_list('role', 'content')
+        ))
+
+    def test_append_to_an_empty_conversation(self):
+        conversation = Conversation.objects.create(user_id='messages', content='')
+        self.client.post(
+            reverse('conversation-messages', args=[conversation.pk]),
+            {'user_id': 'messages', 'role': 'user', 'content': 'first'}, content_type='application/json'
+        )
+        conversation.refresh_from_db()
+        self.assertEqual(conversation.content, 'user: first')
+
+    def test_append_checks_the_owner(self):
+        response = self.client.post(self.url, {'user_id': 'intruder', 'content': 'hi'}, content_type='application/json')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(ConversationMessage.objects.filter(conversation=self.conversation).count(), 5)
+
+    def test_tail_pages_backwards(self):
+        body = self.client.get(self.url, {'user_id': 'messages', 'limit': 2}).json()
+        self.assertEqual([message['content'] for message in body['results']], ['message 3', 'message 4'])
+
+        body = self.client.get(body['previous']).json()
+        self.assertEqual([message['content'] for message in body['results']], ['message 1', 'message 2'])
+        body = self.client.get(body['previous']).json()
+        self.assertEqual(([message['content'] for message in body['results']], body['previous']), (['message 0'], None))
+
+    def test_tail_sees_appended_messages(self):
+        self.client.get(self.url, {'user_id': 'messages', 'limit': 1})
+        self.client.post(self.url, {'user_id': 'messages', 'content': 'new'}, content_type='application/json')
+        body = self.client.get(self.url, {'user_id': 'messages', 'limit': 1}).json()
+        self.assertEqual(body['results'][0]['content'], 'new')
@@ -0,0 +1,47 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from example.models import Conversation, Note
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        base = timezone.now()
+        for i in range(7):
+            note = Note.objects.create(user_id='pager', content=f'note {i}')
+            # Two notes share a timestamp, so the id has to break the tie
+            Note.objects.filter(pk=note.pk).update(created_at=base - timedelta(minutes=i // 2 * 2))
+
+    def test_pages_cover_the_unpaginated_list_in_order(self):
+        url = reverse('notes')
+        expected = [note['id'] for note in self.client.get(url, {'user_id': 'pager'}).json()]
+
+        seen = []
+        response = self.client.get(url, {'user_id': 'pager', 'page_size': 3}).json()
+        while True:
+            self.assertLessEqual(len(response['results']), 3)
+            seen += [note['id'] for note in response['results']]
+            if not response['next']:
+                break
+            response = self.client.get(response['next']).json()
+
+        self.assertEqual(seen, expected)
+
+    def test_invalid_cursor_is_404(self):
+        response = self.client.get(reverse('notes'), {'user_id': 'pager', 'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_conversations_are_paginated_too(self):
+        for i in range(5):
+            Conversation.objects.create(user_id='pager', content=f'user: hello {i}')
+        url = reverse('conversations')
+
+        pages = [self.client.get(url, {'user_id': 'pager', 'page_size': 2}).json()]
+        while pages[-1]['next']:
+            pages.append(self.client.get(pages[-1]['next']).json())
+
+        self.assertEqual([len(page['results']) for page in pages], [2, 2, 1])
+        self.assertIsInstance(self.client.get(url, {'user_id': 'pager'}).json(), list)
@@ -0,0 +1,49 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from example.models import CalendarEvent, CVAnalysis
+from example.serializers import CalendarEventCompactSerializer
+
+
+class ProjectionTests(TestCase):
+    def setUp(self):
+        CVAnalysis.objects.create(user_id='projection', summary='Python developer', text='extracted ' * 1000)
+        CalendarEvent.objects.create(
+            user_id='projection', event_id='standup', summary='Standup', description='Agenda ' * 100,
+            start_time=timezone.now(), end_time=timezone.now(), attendees=[{'email': 'a@example.com'}]
+        )
+
+    def get(self, name, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse(name), {'user_id': 'projection', **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json(), ' '.join(query['sql'] for query in queries)
+
+    def test_cv_analysis_fields(self):
+        body, sql = self.get('cv-analysis', fields='id,summary')
+        self.assertEqual(set(body), {'id', 'summary'})
+        self.assertNotIn('"text"', sql)
+
+        body, sql = self.get('cv-analysis', view='compact')
+        self.assertEqual(set(body), {'id', 'user_id', 'summary', 'created_at'})
+        self.assertNotIn('"text"', sql)
+
+        body, _ = self.get('cv-analysis')
+        self.assertEqual(body['text'], 'extracted ' * 1000)
+
+    def test_calendar_events_compact_view(self):
+        body, sql = self.get('user-calendar-events', view='compact')
+        self.assertEqual(set(body[0]), set(CalendarEventCompactSerializer.Meta.fields))
+        self.assertNotIn('"description"', sql)
+        self.assertNotIn('"attendees"', sql)
+
+        body, _ = self.get('user-calendar-events', fields='summary')
+        self.assertEqual(body, [{'summary': 'Standup'}])
+
+    def test_unknown_fields_are_rejected(self):
+        response = self.client.get(reverse('cv-analysis'), {'user_id': 'projection', 'fields': 'summary,secret'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'Unknown fields: secret'})
@@ -0,0 +1,13 @@
+import io
+import unittest
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'query plans are only checked on PostgreSQL')
+class QueryPlanTests(TestCase):
+    def test_hot_queries_use_their_indexes(self):
+        # Raises CommandError when a query is not planned with its index
+        call_command('check_query_plans', users=50, rows=20, stdout=io.StringIO())
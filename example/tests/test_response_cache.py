@@ -0,0 +1,58 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from example import system_notes
+from example.models import CVAnalysis, Note
+
+
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        system_notes._cached = None
+        self.note = Note.objects.create(user_id='etag', content='first')
+
+    def notes(self, user_id='etag', **headers):
+        return self.client.get(reverse('notes'), {'user_id': user_id}, headers=headers)
+
+    def test_unchanged_response_is_not_modified(self):
+        response = self.notes()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+
+        not_modified = self.notes(if_none_match=response['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified['ETag'], response['ETag'])
+        self.assertEqual(self.notes(if_none_match='"stale"').status_code, 200)
+
+    def test_writes_invalidate_the_users_cached_responses(self):
+        etag = self.notes()['ETag']
+        other_etag = self.notes(user_id='bystander')['ETag']
+
+        self.client.post(reverse('notes'), {'user_id': 'etag', 'content': 'second'}, content_type='application/json')
+        response = self.notes(if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([note['content'] for note in response.json()], ['second', 'first'])
+        self.assertEqual(self.notes(user_id='bystander', if_none_match=other_etag).status_code, 304)
+
+        etag = response['ETag']
+        self.client.delete(reverse('note-detail', args=[self.note.pk]))
+        self.assertEqual([note['content'] for note in self.notes(if_none_match=etag).json()], ['second'])
+
+    def test_system_note_changes_invalidate_every_user(self):
+        system_note = Note.objects.create(user_id='system', content='Be kind', is_system=True)
+        etag = self.notes()['ETag']
+
+        self.client.put(
+            reverse('note-detail', args=[system_note.pk]),
+            {'user_id': 'system', 'content': 'Be very kind', 'is_system': True}, content_type='application/json'
+        )
+        response = self.notes(if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Be very kind', [note['content'] for note in response.json()])
+
+    def test_only_successful_responses_are_cached(self):
+        self.assertEqual(self.client.get(reverse('cv-analysis'), {'user_id': 'etag'}).status_code, 404)
+        # Written without invalidating, so only an uncached 404 lets the new row be seen
+        CVAnalysis.objects.create(user_id='etag', summary='Python developer')
+        self.assertEqual(self.client.get(reverse('cv-analysis'), {'user_id': 'etag'}).status_code, 200)
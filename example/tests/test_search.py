@@ -0,0 +1,62 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from example.models import Conversation, CVAnalysis, Note
+from example.search import SOURCES, FallbackSearch
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.note = Note.objects.create(user_id='search', content='Interview at the Django meetup')
+        self.conversation = Conversation.objects.create(user_id='search', content='user: how do I prepare for a Django interview?')
+        self.cv = CVAnalysis.objects.create(user_id='search', summary='Backend developer', text='Django and PostgreSQL since 2015')
+        Note.objects.create(user_id='someone-else', content='Django interview')
+        Note.objects.create(user_id='system', content='Django interview tips', is_system=True)
+        CVAnalysis.objects.create(user_id='search', status=CVAnalysis.STATUS_PENDING, text='Django interview')
+
+    def search(self, **params):
+        response = self.client.get(reverse('search'), {'user_id': 'search', **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_only_the_users_own_completed_documents_match(self):
+        results = self.search(q='django')['results']
+        self.assertEqual(
+            {(result['type'], result['id']) for result in results},
+            {('notes', self.note.id), ('conversations', self.conversation.id), ('cv', self.cv.id)}
+        )
+
+    def test_every_word_must_match(self):
+        results = self.search(q='django interview')['results']
+        self.assertEqual({result['type'] for result in results}, {'notes', 'conversations'})
+        self.assertEqual(self.search(q='django interview', types='cv')['results'], [])
+
+    def test_pages_follow_the_next_link(self):
+        body = self.search(q='django', limit=2)
+        self.assertEqual(len(body['results']), 2)
+        rest = self.client.get(body['next']).json()
+        self.assertEqual((len(rest['results']), rest['next']), (1, None))
+        seen = {(result['type'], result['id']) for result in body['results'] + rest['results']}
+        self.assertEqual(len(seen), 3)
+
+    def test_invalid_requests(self):
+        for params in [{'q': ''}, {'q': 'django', 'types': 'events'}, {'q': 'django', 'limit': 'ten'}]:
+            response = self.client.get(reverse('search'), {'user_id': 'search', **params})
+            self.assertEqual(response.status_code, 400)
+
+
+class FallbackSearchTests(TestCase):
+    def test_snippets_highlight_the_terms(self):
+        note = Note.objects.create(user_id='search', content='x' * 300 + ' Django meetup')
+        (pk, snippet), = FallbackSearch('django').snippets(SOURCES['notes'], [note.id])
+        self.assertEqual(pk, note.id)
+        self.assertIn('<b>Django</b> meetup', snippet)
+        self.assertLessEqual(len(snippet), 200 + len('<b></b>'))
+
+    def test_more_occurrences_rank_higher(self):
+        once = Note.objects.create(user_id='search', content='Django')
+        twice = Note.objects.create(user_id='search', content='Django, Django')
+        hits = FallbackSearch('django').hits('notes', SOURCES['notes'], 'search', 10)
+        self.assertEqual([hit.id for hit in hits], [twice.id, once.id])
@@ -0,0 +1,62 @@
+import json
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.urls import reverse
+
+from example import cv_analysis, cv_cache, llm
+from example.models import CVAnalysis
+
+from .stubs import StubClient, StubClientTestCase
+
+
+def parse_events(response):
+    body = b''.join(response.streaming_content).decode('utf-8')
+    events = []
+    for block in body.split('\n\n')[:-1]:
+        event, data = block.split('\n')
+        events.append((event.removeprefix('event: '), json.loads(data.removeprefix('data: '))))
+    return events
+
+
+class StreamingAnalysisTests(StubClientTestCase, TestCase):
+    def setUp(self):
+        super().setUp()
+        cv_cache.file_cache.clear()
+        cv_cache.text_cache.clear()
+        self.client_stub = StubClient()
+        patcher = mock.patch.object(llm, 'get_client', return_value=self.client_stub)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def stream(self, data=b'%PDF-1.4 stream', text='Python developer'):
+        upload = SimpleUploadedFile('cv.pdf', data, content_type='application/pdf')
+        with mock.patch.object(cv_analysis, 'extract_text_from_pdf', return_value=text):
+            response = self.client.post(reverse('analyze-pdf'), {'file': upload, 'user_id': 'stream', 'stream': 'true'})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual((response['Content-Type'], response['Cache-Control']), ('text/event-stream', 'no-cache'))
+            return parse_events(response)
+
+    def test_tokens_are_sent_as_they_arrive_then_saved(self):
+        events = self.stream()
+        self.assertEqual(events[:2], [('status', 'extracting'), ('status', 'summarizing')])
+        self.assertEqual(events[2:-1], [('token', 'summary '), ('token', '1\n'), ('token', 'of '), ('token', 'the '), ('token', 'text')])
+
+        event, done = events[-1]
+        self.assertEqual(event, 'done')
+        self.assertEqual(done['summary'], 'summary 1 of the text')
+        self.assertEqual(CVAnalysis.objects.get(pk=done['id']).summary, done['summary'])
+
+    def test_cached_upload_is_answered_at_once(self):
+        self.stream()
+        events = self.stream()
+        self.assertEqual([event for event, _ in events], ['done'])
+        self.assertEqual(len(self.client_stub.prompts), 1)
+
+    def test_errors_are_reported_in_band(self):
+        self.assertEqual(
+            self.stream(text=' '),
+            [('status', 'extracting'), ('error', {'error': 'Could not extract text from PDF'})]
+        )
+        self.assertFalse(CVAnalysis.objects.filter(user_id='stream').exists())
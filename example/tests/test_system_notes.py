@@ -0,0 +1,44 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from example import system_notes
+from example.models import Note
+
+
+@override_settings(SYSTEM_NOTES_TTL=60)
+class SystemNotesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        system_notes._cached = None
+        self.system_note = Note.objects.create(user_id='system', content='Be kind', is_system=True)
+
+    def test_loaded_once_until_invalidated(self):
+        self.assertEqual(system_notes.get_system_notes(), [self.system_note])
+        with self.assertNumQueries(0):
+            system_notes.get_system_notes()
+
+        other = Note.objects.create(user_id='system', content='Be brief', is_system=True)
+        self.assertEqual(system_notes.get_system_notes(), [self.system_note])
+        system_notes.invalidate()
+        self.assertEqual(system_notes.get_system_notes(), [other, self.system_note])
+
+    def test_reloaded_after_the_ttl(self):
+        with mock.patch('example.system_notes.time.monotonic', return_value=0):
+            system_notes.get_system_notes()
+        # A version bump made by another worker's process-local cache is never seen here
+        Note.objects.filter(pk=self.system_note.pk).update(content='Be very kind')
+        with mock.patch('example.system_notes.time.monotonic', return_value=59):
+            self.assertEqual(system_notes.get_system_notes()[0].content, 'Be kind')
+        with mock.patch('example.system_notes.time.monotonic', return_value=61):
+            self.assertEqual(system_notes.get_system_notes()[0].content, 'Be very kind')
+
+    def test_merge_is_newest_first(self):
+        now = timezone.now()
+        old = Note(id=1, user_id='merge', content='old', created_at=now - timedelta(days=2))
+        new = Note(id=2, user_id='merge', content='new', created_at=now)
+        system = Note(id=3, content='system', is_system=True, created_at=now - timedelta(days=1))
+        self.assertEqual(system_notes.merge([new, old], [system]), [new, system, old])
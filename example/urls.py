@@ -1,18 +1,36 @@
 # example/urls.py
 from django.urls import path
 from .views import (
-    NotesView, NoteDetailView, ConversationsView, ConversationDetailView,
-    PDFAnalysisView, CVAnalysisDetailView, CalendarSyncView,
-    UserCalendarEventsView
+    NotesView, NoteDetailView, NotesBulkView, ConversationsView,
+    ConversationDetailView, ConversationsBulkView, ConversationMessagesView,
+    WeeklySummaryView,
+    PDFAnalysisView, CVAnalysisDetailView, CVAnalysisStatusView,
+    CVAnalysisCacheStatsView, LLMStatsView, CalendarSyncView,
+    UserCalendarEventsView, ContextView, ContextSearchView, SearchView
 )
+from .async_views import AsyncCalendarSyncView, AsyncContextView, AsyncPDFAnalysisView
 
 urlpatterns = [
     path('notes/', NotesView.as_view(), name='notes'),
     path('notes/<int:pk>/', NoteDetailView.as_view(), name='note-detail'),
+    path('notes/bulk/', NotesBulkView.as_view(), name='notes-bulk'),
     path('conversations/', ConversationsView.as_view(), name='conversations'),
     path('conversations/<int:pk>/', ConversationDetailView.as_view(), name='conversation-detail'),
+    path('conversations/<int:pk>/messages/', ConversationMessagesView.as_view(), name='conversation-messages'),
+    path('conversations/weekly-summaries/', WeeklySummaryView.as_view(), name='conversation-weekly-summaries'),
+    path('conversations/bulk/', ConversationsBulkView.as_view(), name='conversations-bulk'),
     path('analyze-pdf/', PDFAnalysisView.as_view(), name='analyze-pdf'),
     path('cv-analysis/', CVAnalysisDetailView.as_view(), name='cv-analysis'),
+    path('cv-analysis/<int:pk>/status/', CVAnalysisStatusView.as_view(), name='cv-analysis-status'),
+    path('cv-analysis/cache-stats/', CVAnalysisCacheStatsView.as_view(), name='cv-analysis-cache-stats'),
+    path('llm-stats/', LLMStatsView.as_view(), name='llm-stats'),
     path('calendar-sync/', CalendarSyncView.as_view(), name='calendar-sync'),
     path('calendar-events/', UserCalendarEventsView.as_view(), name='user-calendar-events'),
+    path('context/', ContextView.as_view(), name='context'),
+    path('context/search/', ContextSearchView.as_view(), name='context-search'),
+    path('search/', SearchView.as_view(), name='search'),
+    # Native async variants, for deployments served through api/asgi.py
+    path('async/analyze-pdf/', AsyncPDFAnalysisView.as_view(), name='async-analyze-pdf'),
+    path('async/calendar-sync/', AsyncCalendarSyncView.as_view(), name='async-calendar-sync'),
+    path('async/context/', AsyncContextView.as_view(), name='async-context'),
 ]
\ No newline at end of file
@@ -1,29 +1,54 @@
 # example/views.py
-from datetime import datetime, timedelta
+from datetime import date, datetime, time, timedelta
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import AllowAny
-from .models import Note, Conversation, CVAnalysis, CalendarEvent, CalendarSubscription
-from .serializers import NoteSerializer, ConversationSerializer, CVAnalysisSerializer, CVAnalysisDetailSerializer, CalendarSubscriptionSerializer, CalendarSyncResponseSerializer, CalendarEventDetailSerializer
-from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiExample, OpenApiTypes
-
-from django.http import HttpResponse
-import os
-from PIL import Image
-import io
-import PyPDF2
-import pytesseract
-from openai import OpenAI
+from .models import Note, Conversation, CVAnalysis, CalendarEvent, WeeklySummary
+from .serializers import NoteSerializer, ConversationSerializer, ConversationDetailSerializer, ConversationCompactSerializer, ConversationMessageSerializer, WeeklySummarySerializer, ContextSerializer, SearchResultSerializer, SemanticSearchResultSerializer, CVAnalysisSerializer, CVAnalysisDetailSerializer, CVAnalysisCompactSerializer, CVAnalysisStatusSerializer, CalendarSubscriptionSerializer, CalendarSyncResponseSerializer, CalendarEventDetailSerializer, CalendarEventCompactSerializer
+from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter, OpenApiExample, OpenApiTypes
+from . import compaction, cv_cache, embeddings, jobs, llm, response_cache, system_notes
+from .response_cache import cached_response
+from .context import build_context, default_limits
+from .conversations import append_messages, replace_messages, tail
+from .search import SOURCES, search
+from .cv_analysis import analyze_pdf, file_digest, is_set, save_analysis, stream_pdf_analysis, upload_error
+from .calendar_sync import record_failure, subscribe, subscription_error, sync_calendar_events
+from .pagination import PAGINATION_PARAMETERS, KeysetPagination
+from .pdf import PDFError
+
+from django.http import HttpResponse, StreamingHttpResponse
+from django.db import transaction
+import json
 from rest_framework.parsers import MultiPartParser
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
 from django.conf import settings
-from dotenv import load_dotenv
-import requests
-from icalendar import Calendar
 from django.utils import timezone
-from django.db import models
 
-load_dotenv()
+PROJECTION_PARAMETERS = [
+    OpenApiParameter(name='view', description='Set to "compact" to omit large text fields', required=False, type=str, enum=['compact']),
+    OpenApiParameter(name='fields', description='Comma-separated list of fields to return', required=False, type=str),
+]
+
+def day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+def select_fields(request, serializer_class, compact_serializer_class):
+    """
+    Resolve ?fields=a,b or ?view=compact into (serializer class, fields to serialize).
+    Fields are None for the full representation. Raises ValueError on unknown fields.
+    """
+    requested = request.query_params.get('fields')
+    if requested:
+        fields = [field.strip() for field in requested.split(',') if field.strip()]
+        unknown = set(fields) - set(serializer_class.Meta.fields)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        return serializer_class, fields
+    if request.query_params.get('view') == 'compact':
+        return compact_serializer_class, list(compact_serializer_class.Meta.fields)
+    return serializer_class, None
 
 def index(request):
     now = datetime.now()
@@ -42,23 +67,28 @@ class NotesView(APIView):
 
     @extend_schema(
         parameters=[
-            OpenApiParameter(name='user_id', description='ID of the user', required=True, type=str)
+            OpenApiParameter(name='user_id', description='ID of the user', required=True, type=str),
+            *PAGINATION_PARAMETERS
         ],
         responses={200: NoteSerializer(many=True)},
-        description='Get all notes for a specific user and default system notes (IDs: 14-18)'
+        description='Get all notes for a specific user and the default system notes'
     )
+    @cached_response(response_cache.NOTES)
     def get(self, request):
         user_id = request.query_params.get('user_id')
         if not user_id:
             return Response({'error': 'user_id is required'}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Get both user's notes and system notes (IDs: 14-18)
-        notes = Note.objects.filter(
-            models.Q(user_id=user_id) | 
-            models.Q(id__in=[14, 15, 16, 17, 18])
-        ).distinct().order_by('-created_at')
-        
-        serializer = NoteSerializer(notes, many=True)
+        # The user's notes come from the per-user index; the system notes from the in-process cache
+        notes = Note.objects.filter(user_id=user_id, is_system=False).order_by('-created_at', '-id')
+
+        paginator = KeysetPagination(ordering=('-created_at', '-id'))
+        page = paginator.paginate_queryset(notes, request, view=self, extra=system_notes.get_system_notes())
+        if page is not None:
+            serializer = NoteSerializer(page, many=True)
+            return paginator.get_paginated_response(serializer.data)
+
+        serializer = NoteSerializer(system_notes.merge(notes, system_notes.get_system_notes()), many=True)
         return Response(serializer.data)
 
     @extend_schema(
@@ -73,7 +103,9 @@ class NotesView(APIView):
         
         serializer = NoteSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save(user_id=user_id)
+            note = serializer.save(user_id=user_id)
+            response_cache.invalidate(response_cache.NOTES, user_id)
+            embeddings.schedule(response_cache.NOTES, [note.id])
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -86,6 +118,12 @@ class NoteDetailView(APIView):
         except Note.DoesNotExist:
             return None
 
+    def invalidate_cache(self, note):
+        if note.is_system:
+            system_notes.invalidate()
+        else:
+            response_cache.invalidate(response_cache.NOTES, note.user_id)
+
     @extend_schema(
         responses={200: NoteSerializer},
         description='Get a specific note by ID'
@@ -111,6 +149,8 @@ class NoteDetailView(APIView):
         serializer = NoteSerializer(note, data=request.data)
         if serializer.is_valid():
             serializer.save()
+            self.invalidate_cache(note)
+            embeddings.schedule(response_cache.NOTES, [note.id])
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -124,6 +164,7 @@ class NoteDetailView(APIView):
             return Response({'error': 'Note not found'}, status=status.HTTP_404_NOT_FOUND)
         
         note.delete()
+        self.invalidate_cache(note)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 class ConversationsView(APIView):
@@ -131,17 +172,26 @@ class ConversationsView(APIView):
 
     @extend_schema(
         parameters=[
-            OpenApiParameter(name='user_id', description='ID of the user', required=True, type=str)
+            OpenApiParameter(name='user_id', description='ID of the user', required=True, type=str),
+            *PAGINATION_PARAMETERS
         ],
         responses={200: ConversationSerializer(many=True)},
         description='Get all conversations for a specific user'
     )
+    @cached_response(response_cache.CONVERSATIONS)
     def get(self, request):
         user_id = request.query_params.get('user_id')
         if not user_id:
             return Response({'error': 'user_id is required'}, status=status.HTTP_400_BAD_REQUEST)
         
         conversations = Conversation.objects.filter(user_id=user_id)
+
+        paginator = KeysetPagination(ordering=('-created_at', '-id'))
+        page = paginator.paginate_queryset(conversations, request, view=self)
+        if page is not None:
+            serializer = ConversationSerializer(page, many=True)
+            return paginator.get_paginated_response(serializer.data)
+
         serializer = ConversationSerializer(conversations, many=True)
         return Response(serializer.data)
 
@@ -157,7 +207,12 @@ class ConversationsView(APIView):
         
         serializer = ConversationSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save(user_id=user_id)
+            with transaction.atomic():
+                conversation = serializer.save(user_id=user_id)
+                replace_messages([conversation])
+            response_cache.invalidate(response_cache.CONVERSATIONS, user_id)
+            embeddings.schedule(response_cache.CONVERSATIONS, [conversation.id])
+            compaction.schedule(conversation.id)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -170,16 +225,32 @@ class ConversationDetailView(APIView):
         except Conversation.DoesNotExist:
             return None
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name='user_id', description='ID of the user', required=True, type=str),
+            *PROJECTION_PARAMETERS
+        ],
+        responses={200: ConversationDetailSerializer},
+        description='Get a conversation with its rolling summary. With view=compact only the summary is returned; fetch messages after summary_position from the messages endpoint'
+    )
     def get(self, request, pk):
         user_id = request.query_params.get('user_id')
         if not user_id:
             return Response({'error': 'user_id is required'}, status=status.HTTP_400_BAD_REQUEST)
 
-        conversation = self.get_object(pk, user_id)
+        try:
+            serializer_class, fields = select_fields(request, ConversationDetailSerializer, ConversationCompactSerializer)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        conversations = Conversation.objects.filter(pk=pk, user_id=user_id)
+        # Only read the columns that will be serialized
+        conversations = conversations.only(*fields) if fields else conversations
+        conversation = conversations.first()
         if not conversation:
             return Response({'error': 'Conversation not found'}, status=status.HTTP_404_NOT_FOUND)
         
-        serializer = ConversationSerializer(conversation)
+        serializer = serializer_class(conversation, fields=fields)
         return Response(serializer.data)
 
     def put(self, request, pk):
@@ -193,7 +264,12 @@ class ConversationDetailView(APIView):
         
         serializer = ConversationSerializer(conversation, data=request.data)
         if serializer.is_valid():
-            serializer.save()
+            with transaction.atomic():
+                serializer.save()
+                replace_messages([conversation])
+            response_cache.invalidate(response_cache.CONVERSATIONS, user_id)
+            embeddings.schedule(response_cache.CONVERSATIONS, [conversation.id])
+            compaction.schedule(conversation.id)
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -207,39 +283,286 @@ class ConversationDetailView(APIView):
             return Response({'error': 'Conversation not found'}, status=status.HTTP_404_NOT_FOUND)
         
         conversation.delete()
+        response_cache.invalidate(response_cache.CONVERSATIONS, user_id)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+class BulkWriteView(APIView):
+    """
+    Create, update or delete up to BULK_MAX_ITEMS of a user's objects in one request and
+    one transaction. Subclasses set model, serializer_class and the cached resource.
+    """
+    permission_classes = [AllowAny]
+    model = None
+    serializer_class = None
+    resource = None
+
+    def get_queryset(self, user_id):
+        return self.model.objects.filter(user_id=user_id)
+
+    def saved(self, objects):
+        """Called inside the transaction with the created or updated objects."""
+        embeddings.schedule(self.resource, [obj.id for obj in objects])
+
+    def parse_items(self, request, key):
+        user_id = request.data.get('user_id')
+        if not user_id:
+            return None, None, Response({'error': 'user_id is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        items = request.data.get(key)
+        if not isinstance(items, list) or not items:
+            return None, None, Response({'error': f'{key} must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > settings.BULK_MAX_ITEMS:
+            return None, None, Response(
+                {'error': f'At most {settings.BULK_MAX_ITEMS} {key} per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return user_id, items, None
+
+    def item_errors(self, serializer, count):
+        # One dict of errors per item; newer DRF versions key list errors by index
+        errors = serializer.errors
+        if isinstance(errors, dict):
+            return [dict(errors.get(index, {})) for index in range(count)]
+        return [dict(item_errors) for item_errors in errors]
+
+    def post(self, request):
+        user_id, items, error = self.parse_items(request, 'items')
+        if error:
+            return error
+
+        serializer = self.serializer_class(data=items, many=True)
+        if not serializer.is_valid():
+            return Response({'errors': self.item_errors(serializer, len(items))}, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            objects = self.model.objects.bulk_create(
+                self.model(user_id=user_id, **attrs) for attrs in serializer.validated_data
+            )
+            self.saved(objects)
+        response_cache.invalidate(self.resource, user_id)
+
+        return Response(
+            {'results': self.serializer_class(objects, many=True).data},
+            status=status.HTTP_201_CREATED
+        )
+
+    def put(self, request):
+        user_id, items, error = self.parse_items(request, 'items')
+        if error:
+            return error
+
+        serializer = self.serializer_class(data=items, many=True)
+        errors = [{} for _ in items] if serializer.is_valid() else self.item_errors(serializer, len(items))
+        ids = []
+        for item, item_errors in zip(items, errors):
+            try:
+                ids.append(int(item['id']))
+            except (KeyError, TypeError, ValueError):
+                item_errors['id'] = ['A valid integer is required.']
+        if any(errors):
+            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            objects = self.get_queryset(user_id).select_for_update().in_bulk(ids)
+            now = timezone.now()
+            fields = {'updated_at'}
+            for pk, attrs in zip(ids, serializer.validated_data):
+                if pk in objects:
+                    for field, value in attrs.items():
+                        setattr(objects[pk], field, value)
+                    objects[pk].updated_at = now
+                    fields.update(attrs)
+            self.model.objects.bulk_update(objects.values(), sorted(fields))
+            self.saved(list(objects.values()))
+        response_cache.invalidate(self.resource, user_id)
+
+        return Response({'results': [
+            {'id': pk, 'status': 'updated' if pk in objects else 'not_found'} for pk in ids
+        ]})
+
+    def delete(self, request):
+        user_id, ids, error = self.parse_items(request, 'ids')
+        if error:
+            return error
+        if not all(isinstance(pk, int) for pk in ids):
+            return Response({'error': 'ids must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            queryset = self.get_queryset(user_id).filter(id__in=ids)
+            deleted = set(queryset.values_list('id', flat=True))
+            queryset.delete()
+        response_cache.invalidate(self.resource, user_id)
+
+        return Response({'results': [
+            {'id': pk, 'status': 'deleted' if pk in deleted else 'not_found'} for pk in ids
+        ]})
+
+BULK_ITEMS_REQUEST = {
+    'application/json': {
+        'type': 'object',
+        'properties': {
+            'user_id': {'type': 'string'},
+            'items': {'type': 'array', 'items': {'type': 'object'}}
+        },
+        'required': ['user_id', 'items']
+    }
+}
+
+BULK_IDS_REQUEST = {
+    'application/json': {
+        'type': 'object',
+        'properties': {
+            'user_id': {'type': 'string'},
+            'ids': {'type': 'array', 'items': {'type': 'integer'}}
+        },
+        'required': ['user_id', 'ids']
+    }
+}
+
+@extend_schema_view(
+    post=extend_schema(request=BULK_ITEMS_REQUEST, responses={201: OpenApiTypes.OBJECT}, description='Create up to BULK_MAX_ITEMS notes for a user in one transaction'),
+    put=extend_schema(request=BULK_ITEMS_REQUEST, responses={200: OpenApiTypes.OBJECT}, description='Update the content of up to BULK_MAX_ITEMS of a user\'s notes, each identified by "id"'),
+    delete=extend_schema(request=BULK_IDS_REQUEST, responses={200: OpenApiTypes.OBJECT}, description='Delete up to BULK_MAX_ITEMS of a user\'s notes by id')
+)
+class NotesBulkView(BulkWriteView):
+    model = Note
+    serializer_class = NoteSerializer
+    resource = response_cache.NOTES
+
+    def get_queryset(self, user_id):
+        # System notes are shared and cannot be changed through a user's batch
+        return super().get_queryset(user_id).filter(is_system=False)
+
+@extend_schema_view(
+    post=extend_schema(request=BULK_ITEMS_REQUEST, responses={201: OpenApiTypes.OBJECT}, description='Create up to BULK_MAX_ITEMS conversations for a user in one transaction'),
+    put=extend_schema(request=BULK_ITEMS_REQUEST, responses={200: OpenApiTypes.OBJECT}, description='Update the content of up to BULK_MAX_ITEMS of a user\'s conversations, each identified by "id"'),
+    delete=extend_schema(request=BULK_IDS_REQUEST, responses={200: OpenApiTypes.OBJECT}, description='Delete up to BULK_MAX_ITEMS of a user\'s conversations by id')
+)
+class ConversationsBulkView(BulkWriteView):
+    model = Conversation
+    serializer_class = ConversationSerializer
+    resource = response_cache.CONVERSATIONS
+
+    def saved(self, objects):
+        super().saved(objects)
+        replace_messages(objects)
+        for conversation in objects:
+            compaction.schedule(conversation.id)
+
+class ConversationMessagesView(APIView):
+    permission_classes = [AllowAny]
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name='user_id', description='ID of the user', required=True, type=str),
+            OpenApiParameter(name='limit', description='Number of messages to return from the end of the conversation', required=False, type=int),
+            OpenApiParameter(name='before', description='Only return messages before this position (from the "previous" link)', required=False, type=int),
+        ],
+        responses={200: ConversationMessageSerializer(many=True)},
+        description='Get the last messages of a conversation, oldest first. Follow "previous" for earlier messages'
+    )
+    @cached_response(response_cache.CONVERSATIONS)
+    def get(self, request, pk):
+        user_id = request.query_params.get('user_id')
+        if not user_id:
+            return Response({'error': 'user_id is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            limit = int(request.query_params.get('limit', api_settings.PAGE_SIZE))
+            before = request.query_params.get('before')
+            before = int(before) if before is not None else None
+        except ValueError:
+            return Response({'error': 'limit and before must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, settings.MAX_PAGE_SIZE))
+
+        if not Conversation.objects.filter(pk=pk, user_id=user_id).exists():
+            return Response({'error': 'Conversation not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        messages = tail(pk, limit, before)
+        previous = None
+        if messages and messages[0].position > 0:
+            previous = replace_query_param(request.build_absolute_uri(), 'before', messages[0].position)
+
+        return Response({
+            'previous': previous,
+            'results': ConversationMessageSerializer(messages, many=True).data
+        })
+
+    @extend_schema(
+        request={
+            'application/json': {
+                'type': 'object',
+                'properties': {
+                    'user_id': {'type': 'string'},
+                    'role': {'type': 'string'},
+                    'content': {'type': 'string'},
+                    'messages': {'type': 'array', 'items': {'type': 'object'}}
+                },
+                'required': ['user_id']
+            }
+        },
+        responses={201: ConversationMessageSerializer(many=True)},
+        description='Append one message (role, content) or several (messages) to the end of a conversation'
+    )
+    def post(self, request, pk):
+        user_id = request.data.get('user_id')
+        if not user_id:
+            return Response({'error': 'user_id is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        items = request.data.get('messages', [request.data])
+        if not isinstance(items, list) or not items or len(items) > settings.BULK_MAX_ITEMS:
+            return Response(
+                {'error': f'messages must be a list of 1 to {settings.BULK_MAX_ITEMS} items'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        serializer = ConversationMessageSerializer(data=items, many=True)
+        if not serializer.is_valid():
+            return Response({'errors': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            messages = append_messages(pk, user_id, [(item.get('role', ''), item['content']) for item in serializer.validated_data])
+        except Conversation.DoesNotExist:
+            return Response({'error': 'Conversation not found'}, status=status.HTTP_404_NOT_FOUND)
+        response_cache.invalidate(response_cache.CONVERSATIONS, user_id)
+        embeddings.schedule(response_cache.CONVERSATIONS, [pk])
+        compaction.schedule(pk)
+
+        return Response(ConversationMessageSerializer(messages, many=True).data, status=status.HTTP_201_CREATED)
+
+def sse_event(event, data):
+    return f'event: {event}\ndata: {json.dumps(data)}\n\n'
+
 class PDFAnalysisView(APIView):
     permission_classes = [AllowAny]
     parser_classes = [MultiPartParser]
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-
-    def extract_text_from_pdf(self, pdf_file):
-        # Read PDF file
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
-        text = ""
-        
-        # Extract text from each page
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
-        
-        return text
-
-    def analyze_text_with_openai(self, text):
-        response = self.client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant that analyzes resumes and CVs. When analyzing, provide a clean summary without any special characters or formatting artifacts. Focus on professional experience, skills, education, dates of employment and study, and achievements. Use clear, professional language."},
-                {"role": "user", "content": f"Please analyze this CV and provide a clear summary and key points. Remove any special characters or formatting artifacts from the text:\n\n{text}"}
-            ],
-            max_tokens=500
-        )
-        # Remove newlines from the summary and replace multiple spaces with single space
-        summary = response.choices[0].message.content.replace('\n', ' ').replace('  ', ' ')
-        return summary
+        self.client = llm.get_client()
+
+    def stream_analysis(self, user_id, data):
+        def events():
+            try:
+                for event, value in stream_pdf_analysis(data, self.client):
+                    if event == 'result':
+                        # Persisted only once the summary is complete
+                        cv_analysis = save_analysis(user_id, value)
+                        yield sse_event('done', {
+                            'id': cv_analysis.id,
+                            'user_id': cv_analysis.user_id,
+                            'summary': cv_analysis.summary
+                        })
+                    else:
+                        yield sse_event(event, value)
+            except Exception as e:
+                # Headers are already sent, so failures are reported in-band
+                yield sse_event('error', {'error': str(e)})
+
+        response = StreamingHttpResponse(events(), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # Stop nginx from buffering the stream
+        return response
 
     @extend_schema(
         request={
@@ -247,13 +570,15 @@ class PDFAnalysisView(APIView):
                 'type': 'object',
                 'properties': {
                     'file': {'type': 'string', 'format': 'binary'},
-                    'user_id': {'type': 'string'}
+                    'user_id': {'type': 'string'},
+                    'async': {'type': 'boolean'},
+                    'stream': {'type': 'boolean'}
                 },
                 'required': ['file', 'user_id']
             }
         },
-        responses={201: CVAnalysisSerializer},
-        description='Analyze a PDF file and use OpenAI to provide analysis',
+        responses={201: CVAnalysisSerializer, 202: CVAnalysisStatusSerializer, (200, 'text/event-stream'): OpenApiTypes.STR},
+        description='Analyze a PDF file and use OpenAI to provide analysis. With async=true the upload is queued and 202 is returned with a job id to poll at cv-analysis/<id>/status/. With stream=true the summary is sent as Server-Sent Events while it is generated: "status" events, a "token" event per text delta, then "done" with the saved id, user_id and summary (or "error").',
         examples=[
             OpenApiExample(
                 'Successful Response',
@@ -265,44 +590,31 @@ class PDFAnalysisView(APIView):
         ]
     )
     def post(self, request):
-        if 'file' not in request.FILES:
-            return Response(
-                {'error': 'No file provided'}, 
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        if 'user_id' not in request.data:
-            return Response(
-                {'error': 'user_id is required'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        error = upload_error(request.FILES, request.data)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
 
         user_id = request.data['user_id']
-        pdf_file = request.FILES['file']
-        
-        if not pdf_file.name.endswith('.pdf'):
-            return Response(
-                {'error': 'File must be a PDF'}, 
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        data = request.FILES['file'].read()
+
+        # Identical uploads are answered straight from the content-hash cache, even in async mode
+        if is_set(request.data, 'async') and cv_cache.lookup_by_file_hash(file_digest(data)) is None:
+            return Response(jobs.submit(user_id, data), status=status.HTTP_202_ACCEPTED)
+
+        if is_set(request.data, 'stream'):
+            return self.stream_analysis(user_id, data)
 
         try:
-            extracted_text = self.extract_text_from_pdf(pdf_file)
-            
-            if not extracted_text.strip():
+            try:
+                result = analyze_pdf(data, self.client)
+            except PDFError as e:
                 return Response(
-                    {'error': 'Could not extract text from PDF'}, 
+                    {'error': str(e)}, 
                     status=status.HTTP_400_BAD_REQUEST
                 )
-            
-            analysis = self.analyze_text_with_openai(extracted_text)
 
             # Save to database
-            cv_analysis = CVAnalysis.objects.create(
-                user_id=user_id,
-                summary=analysis,
-                text=extracted_text
-            )
+            cv_analysis = save_analysis(user_id, result)
 
             # Return only id and user_id
             return Response({
@@ -326,11 +638,13 @@ class CVAnalysisDetailView(APIView):
 
     @extend_schema(
         parameters=[
-            OpenApiParameter(name='user_id', description='ID of the user', required=True, type=str)
+            OpenApiParameter(name='user_id', description='ID of the user', required=True, type=str),
+            *PROJECTION_PARAMETERS
         ],
         responses={200: CVAnalysisDetailSerializer},
         description='Get CV analysis for a specific user'
     )
+    @cached_response(response_cache.CV_ANALYSIS)
     def get(self, request):
         user_id = request.query_params.get('user_id')
         if not user_id:
@@ -338,11 +652,23 @@ class CVAnalysisDetailView(APIView):
                 {'error': 'user_id is required'}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
-        
+
+        try:
+            serializer_class, fields = select_fields(request, CVAnalysisDetailSerializer, CVAnalysisCompactSerializer)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        analyses = CVAnalysis.objects.filter(
+            user_id=user_id,
+            status=CVAnalysis.STATUS_COMPLETED
+        )
+        # Only read the columns that will be serialized
+        analyses = analyses.only(*fields, 'created_at') if fields else analyses.defer('source')
+
         try:
             # Get the most recent analysis for this user
-            analysis = CVAnalysis.objects.filter(user_id=user_id).latest('created_at')
-            serializer = CVAnalysisDetailSerializer(analysis)
+            analysis = analyses.latest('created_at')
+            serializer = serializer_class(analysis, fields=fields)
             return Response(serializer.data)
         except CVAnalysis.DoesNotExist:
             return Response(
@@ -350,72 +676,51 @@ class CVAnalysisDetailView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-class CalendarSyncView(APIView):
+class CVAnalysisStatusView(APIView):
     permission_classes = [AllowAny]
 
-    def sync_calendar_events(self, user_id, webcal_url):
-        https_url = webcal_url.replace('webcal://', 'https://')
-        response = requests.get(https_url)
-        cal = Calendar.from_ical(response.content)
-        
-        end_date = timezone.now()
-        start_date = end_date - timedelta(days=7)
-        
-        events_added = 0
-        
-        for component in cal.walk('VEVENT'):
-            event_start = component.get('dtstart').dt
-            
-            if event_start < start_date or event_start > end_date:
-                continue
-                
-            event_id = str(component.get('uid'))
-            
-            # Extract attendees information
-            attendees = []
-            for attendee in component.get('attendee', []):
-                attendee_params = dict(attendee.params)
-                attendee_data = {
-                    'email': str(attendee).replace('mailto:', ''),
-                    'name': attendee_params.get('CN', ''),
-                    'role': attendee_params.get('ROLE', ''),
-                    'status': attendee_params.get('PARTSTAT', '')
-                }
-                attendees.append(attendee_data)
-
-            # Extract location and meeting link
-            location = str(component.get('location', ''))
-            meeting_link = ''
-            
-            # Look for virtual meeting links in description or location
-            description = str(component.get('description', ''))
-            for line in description.split('\n'):
-                if any(link in line.lower() for link in ['meet.google.com', 'teams.microsoft.com', 'zoom.us']):
-                    meeting_link = line.strip()
-                    break
-
-            # Create or update event with extended information
-            event, created = CalendarEvent.objects.update_or_create(
-                user_id=user_id,
-                event_id=event_id,
-                defaults={
-                    'summary': str(component.get('summary', '')),
-                    'description': description,
-                    'start_time': component.get('dtstart').dt,
-                    'end_time': component.get('dtend').dt if component.get('dtend') else component.get('dtstart').dt,
-                    'location': location,
-                    'organizer': str(component.get('organizer', '')).replace('mailto:', ''),
-                    'attendees': attendees,
-                    'status': str(component.get('status', 'confirmed')).lower(),
-                    'meeting_link': meeting_link,
-                    'notes': str(component.get('x-alt-desc', ''))  # Some calendars use this for rich text notes
-                }
-            )
-            
-            if created:
-                events_added += 1
-        
-        return events_added
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name='user_id', description='ID of the user', required=True, type=str)
+        ],
+        responses={200: CVAnalysisStatusSerializer},
+        description='Poll the status and progress of a queued CV analysis job'
+    )
+    def get(self, request, pk):
+        user_id = request.query_params.get('user_id')
+        if not user_id:
+            return Response({'error': 'user_id is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            analysis = CVAnalysis.objects.defer('summary', 'text', 'source').get(pk=pk, user_id=user_id)
+        except CVAnalysis.DoesNotExist:
+            return Response({'error': 'CV analysis not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        serializer = CVAnalysisStatusSerializer(analysis)
+        return Response(serializer.data)
+
+class CVAnalysisCacheStatsView(APIView):
+    permission_classes = [AllowAny]
+
+    @extend_schema(
+        responses={200: OpenApiTypes.OBJECT},
+        description='Hit/miss counters of the content-hash CV summary cache in this process'
+    )
+    def get(self, request):
+        return Response(cv_cache.stats())
+
+class LLMStatsView(APIView):
+    permission_classes = [AllowAny]
+
+    @extend_schema(
+        responses={200: OpenApiTypes.OBJECT},
+        description='Call, retry, latency and token counters of the shared OpenAI client in this process'
+    )
+    def get(self, request):
+        return Response(llm.metrics.snapshot())
+
+class CalendarSyncView(APIView):
+    permission_classes = [AllowAny]
 
     @extend_schema(
         request=CalendarSubscriptionSerializer,
@@ -426,34 +731,27 @@ class CalendarSyncView(APIView):
         user_id = request.data.get('user_id')
         webcal_url = request.data.get('webcal_url')
 
-        if not user_id or not webcal_url:
-            return Response(
-                {'error': 'Both user_id and webcal_url are required'}, 
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        if not webcal_url.startswith('webcal://'):
-            return Response(
-                {'error': 'URL must be a webcal:// URL'}, 
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        error = subscription_error(user_id, webcal_url)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
 
+        subscription = None
         try:
             # Save or update subscription
-            subscription, _ = CalendarSubscription.objects.update_or_create(
-                user_id=user_id,
-                defaults={'webcal_url': webcal_url}
-            )
+            subscription = subscribe(user_id, webcal_url)
 
             # Sync events
-            events_added = self.sync_calendar_events(user_id, webcal_url)
+            result = sync_calendar_events(subscription)
 
             return Response({
                 'status': 'success',
-                'events_added': events_added
+                **result
             }, status=status.HTTP_201_CREATED)
 
         except Exception as e:
+            if subscription is not None:
+                # Backs off the scheduled re-syncs of a feed that cannot be fetched
+                record_failure(subscription, e)
             return Response(
                 {'error': str(e)}, 
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -467,20 +765,23 @@ class UserCalendarEventsView(APIView):
             OpenApiParameter(name='user_id', description='ID of the user', required=True, type=str),
             OpenApiParameter(
                 name='start_date',
-                description='Start date for filtering events (YYYY-MM-DD)',
+                description='Return events that end on or after this date (YYYY-MM-DD)',
                 required=False,
                 type=str
             ),
             OpenApiParameter(
                 name='end_date',
-                description='End date for filtering events (YYYY-MM-DD)',
+                description='Return events that start on or before this date (YYYY-MM-DD, inclusive)',
                 required=False,
                 type=str
-            )
+            ),
+            *PROJECTION_PARAMETERS,
+            *PAGINATION_PARAMETERS
         ],
         responses={200: CalendarEventDetailSerializer(many=True)},
-        description='Get all calendar events for a specific user with optional date filtering'
+        description='Get all calendar events for a specific user, optionally only those overlapping a date range'
     )
+    @cached_response(response_cache.CALENDAR_EVENTS)
     def get(self, request):
         user_id = request.query_params.get('user_id')
         start_date = request.query_params.get('start_date')
@@ -492,23 +793,184 @@ class UserCalendarEventsView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Start with base query
-        events = CalendarEvent.objects.filter(user_id=user_id)
-
-        # Apply date filters if provided
+        # Dates become a half-open [start, end) range of aware datetimes in the current time zone
         try:
-            if start_date:
-                events = events.filter(start_time__date__gte=start_date)
-            if end_date:
-                events = events.filter(end_time__date__lte=end_date)
+            range_start = day_start(date.fromisoformat(start_date)) if start_date else None
+            range_end = day_start(date.fromisoformat(end_date) + timedelta(days=1)) if end_date else None
         except ValueError:
             return Response(
                 {'error': 'Invalid date format. Use YYYY-MM-DD'}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        if range_start and range_end and range_start >= range_end:
+            return Response(
+                {'error': 'start_date must not be after end_date'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            serializer_class, fields = select_fields(request, CalendarEventDetailSerializer, CalendarEventCompactSerializer)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        events = CalendarEvent.objects.filter(user_id=user_id).overlapping(range_start, range_end)
+        if fields:
+            # Only read the columns that will be serialized (plus the pagination key)
+            events = events.only(*fields, 'start_time')
+
         # Order by start time
         events = events.order_by('start_time')
-        
-        serializer = CalendarEventDetailSerializer(events, many=True)
-        return Response(serializer.data)
\ No newline at end of file
+
+        paginator = KeysetPagination(ordering=('start_time', 'id'))
+        page = paginator.paginate_queryset(events, request, view=self)
+        if page is not None:
+            serializer = serializer_class(page, many=True, fields=fields)
+            return paginator.get_paginated_response(serializer.data)
+
+        serializer = serializer_class(events, many=True, fields=fields)
+        return Response(serializer.data)
+
+class ContextView(APIView):
+    permission_classes = [AllowAny]
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name='user_id', description='ID of the user', required=True, type=str),
+            OpenApiParameter(name='notes', description='Maximum number of the user\'s latest notes (system notes are always included)', required=False, type=int),
+            OpenApiParameter(name='conversations', description='Maximum number of recent conversations', required=False, type=int),
+            OpenApiParameter(name='events', description='Maximum number of recent and upcoming calendar events', required=False, type=int),
+        ],
+        responses={200: ContextSerializer},
+        description='Get notes, recent conversations, the latest CV summary and recent/upcoming calendar events for a user in a single request'
+    )
+    @cached_response(response_cache.NOTES, response_cache.CONVERSATIONS, response_cache.CV_ANALYSIS, response_cache.CALENDAR_EVENTS)
+    def get(self, request):
+        user_id = request.query_params.get('user_id')
+        if not user_id:
+            return Response({'error': 'user_id is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        limits = default_limits()
+        try:
+            for section in limits:
+                if section in request.query_params:
+                    limits[section] = int(request.query_params[section])
+        except ValueError:
+            return Response({'error': 'Limits must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+        limits = {section: max(0, min(limit, settings.MAX_PAGE_SIZE)) for section, limit in limits.items()}
+
+        serializer = ContextSerializer(build_context(user_id, limits))
+        return Response(serializer.data)
+
+class SearchView(APIView):
+    permission_classes = [AllowAny]
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name='user_id', description='ID of the user', required=True, type=str),
+            OpenApiParameter(name='q', description='Search query (web search syntax: "quoted phrases", -excluded, or)', required=True, type=str),
+            OpenApiParameter(name='types', description='Comma-separated subset of notes, conversations, cv', required=False, type=str),
+            OpenApiParameter(name='limit', description='Number of results per page', required=False, type=int),
+            OpenApiParameter(name='offset', description='Number of results to skip', required=False, type=int),
+        ],
+        responses={200: SearchResultSerializer(many=True)},
+        description='Full-text search over a user\'s notes, conversations and CV analyses, best matches first'
+    )
+    @cached_response(response_cache.NOTES, response_cache.CONVERSATIONS, response_cache.CV_ANALYSIS)
+    def get(self, request):
+        user_id = request.query_params.get('user_id')
+        text = request.query_params.get('q', '').strip()
+        if not user_id or not text:
+            return Response({'error': 'user_id and q are required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        types = [type_.strip() for type_ in request.query_params.get('types', ','.join(SOURCES)).split(',') if type_.strip()]
+        unknown = set(types) - set(SOURCES)
+        if unknown or not types:
+            return Response(
+                {'error': f"types must be a subset of {', '.join(SOURCES)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', api_settings.PAGE_SIZE)), settings.MAX_PAGE_SIZE))
+            offset = max(0, int(request.query_params.get('offset', 0)))
+        except ValueError:
+            return Response({'error': 'limit and offset must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+
+        hits, snippets, has_more = search(user_id, text, types, limit, offset)
+        results = [
+            {**hit._asdict(), 'snippet': snippets.get((hit.type, hit.id), '')}
+            for hit in hits
+        ]
+        next_link = None
+        if has_more:
+            next_link = replace_query_param(request.build_absolute_uri(), 'offset', offset + limit)
+
+        return Response({
+            'next': next_link,
+            'results': SearchResultSerializer(results, many=True).data
+        })
+
+class ContextSearchView(APIView):
+    permission_classes = [AllowAny]
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name='user_id', description='ID of the user', required=True, type=str),
+            OpenApiParameter(name='q', description='Text to find related notes and conversations for', required=True, type=str),
+            OpenApiParameter(name='k', description='Number of results', required=False, type=int),
+            OpenApiParameter(name='types', description='Comma-separated subset of notes, conversations', required=False, type=str),
+        ],
+        responses={200: SemanticSearchResultSerializer(many=True)},
+        description='Get the notes and conversations most similar in meaning to a text, for assembling prompt context'
+    )
+    def get(self, request):
+        user_id = request.query_params.get('user_id')
+        text = request.query_params.get('q', '').strip()
+        if not user_id or not text:
+            return Response({'error': 'user_id and q are required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        types = [type_.strip() for type_ in request.query_params.get('types', ','.join(embeddings.SOURCES)).split(',') if type_.strip()]
+        if not types or set(types) - set(embeddings.SOURCES):
+            return Response(
+                {'error': f"types must be a subset of {', '.join(embeddings.SOURCES)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            k = max(1, min(int(request.query_params.get('k', settings.EMBEDDING_TOP_K)), settings.MAX_PAGE_SIZE))
+        except ValueError:
+            return Response({'error': 'k must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = [
+            {'type': kind, 'id': obj.id, 'score': score, 'content': obj.content, 'created_at': obj.created_at}
+            for obj, kind, score in embeddings.search(user_id, text, k, set(types))
+        ]
+        return Response({'results': SemanticSearchResultSerializer(results, many=True).data})
+
+class WeeklySummaryView(APIView):
+    permission_classes = [AllowAny]
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name='user_id', description='ID of the user', required=True, type=str),
+            OpenApiParameter(name='week', description='Any date (YYYY-MM-DD) in the week to return; defaults to the latest weeks', required=False, type=str),
+        ],
+        responses={200: WeeklySummarySerializer(many=True)},
+        description='Get rolling weekly summaries of a user\'s conversations, newest week first'
+    )
+    def get(self, request):
+        user_id = request.query_params.get('user_id')
+        if not user_id:
+            return Response({'error': 'user_id is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        summaries = WeeklySummary.objects.filter(user_id=user_id).order_by('-week_start')
+        week = request.query_params.get('week')
+        if week:
+            try:
+                summaries = summaries.filter(week_start=compaction.week_start(date.fromisoformat(week)))
+            except ValueError:
+                return Response({'error': 'Invalid date format. Use YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = WeeklySummarySerializer(summaries[:api_settings.PAGE_SIZE], many=True)
+        return Response(serializer.data)